@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import assign_risk_response_st
+from utils import assign_risk_responses_many, get_versioned_df, show_register_st
 import pandas as pd
 
 
@@ -11,10 +11,13 @@ def main():
         This step helps Sarah communicate to stakeholders exactly how each AI risk will be handled, ensuring alignment with the bank's broader risk appetite and regulatory requirements.
     """)
 
-    controls_to_respond = st.session_state.ai_controls_df[
-        (st.session_state.ai_controls_df['effectiveness_score'].isna()) |
-        (st.session_state.ai_controls_df['risk_response'].isna())
+    controls_df = get_versioned_df('controls')
+    controls_to_respond = controls_df[
+        (controls_df['effectiveness_score'].isna()) |
+        (controls_df['risk_response'].isna())
     ].copy()
+    # Versions the form was first shown with, so a submit does not overwrite another session's responses
+    form_versions = st.session_state.setdefault('response_form_versions', {})
 
     risk_response_options = ["Mitigate", "Transfer", "Avoid", "Accept"]
 
@@ -25,6 +28,8 @@ def main():
         with st.form("assign_responses_form"):
             for index, control in controls_to_respond.iterrows():
                 control_id = int(control['control_id'])
+                form_versions.setdefault(
+                    control_id, int(control['row_version']))
                 st.markdown(f"**Control ID: {control_id}**")
                 st.write(f"Description: {control['control_description']}")
 
@@ -44,9 +49,15 @@ def main():
             submitted_responses = st.form_submit_button("Assign All Responses")
 
             if submitted_responses:
-                for response_data in responded_controls_data:
-                    assign_risk_response_st(
-                        response_data['control_id'], response_data['effectiveness'], response_data['risk_response'])
+                assign_risk_responses_many(
+                    [response_data['control_id']
+                        for response_data in responded_controls_data],
+                    [response_data['effectiveness']
+                        for response_data in responded_controls_data],
+                    [response_data['risk_response']
+                        for response_data in responded_controls_data],
+                    expected_versions=[form_versions[response_data['control_id']] for response_data in responded_controls_data])
+                del st.session_state['response_form_versions']
                 st.session_state.current_step = 7
                 st.rerun()
     else:
@@ -55,4 +66,4 @@ def main():
         st.session_state.current_step = 7
 
     st.markdown("\n**Updated AI Controls Register with risk responses:**")
-    st.dataframe(st.session_state.ai_controls_df)
+    show_register_st('controls', key='controls_view_10')
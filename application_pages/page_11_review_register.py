@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import get_full_risk_register_st
+from utils import get_full_risk_register_st, show_register_st, show_text_search_st, get_row_count
 import pandas as pd
 
 
@@ -15,9 +15,11 @@ def main():
         get_full_risk_register_st()
         st.rerun()
 
-    if 'full_risk_register_df' in st.session_state and not st.session_state.full_risk_register_df.empty:
+    if st.session_state.get('full_risk_register_generated', False) and get_row_count('full_register'):
         st.markdown("\n**Comprehensive AI Model Risk Register:**")
-        st.dataframe(st.session_state.full_risk_register_df)
+        show_register_st('full_register', key='full_register_view_11')
+        st.markdown("\n**Search Hazard, Control and Model Descriptions:**")
+        show_text_search_st(key='text_search_11')
         st.success(
             "✅ Comprehensive risk register generated! Proceed to Analyze Top Risks.")
         st.session_state.current_step = 7
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import identify_top_risks_st, get_full_risk_register_st
+from utils import identify_top_risks_st, get_full_risk_register_st, get_ai_models_df, get_residual_risk_summary_df, get_top_risks_df, get_row_count
 import pandas as pd
 
 
@@ -11,7 +11,7 @@ def main():
         This analysis helps Sarah focus on the "top risks" that pose the greatest potential harm to QuantFinance Bank, enabling proactive resource allocation and strategic risk mitigation.
     """)
 
-    if 'full_risk_register_df' not in st.session_state or st.session_state.full_risk_register_df.empty:
+    if not st.session_state.get('full_risk_register_generated', False) or get_row_count('full_register') == 0:
         st.warning(
             "Please generate the comprehensive risk register in Step 11 first to identify top risks.")
         return
@@ -19,17 +19,50 @@ def main():
     num_top_risks = st.number_input(
         "Number of Top Risks to Display", min_value=1, value=3, step=1, key="num_top_risks_12")
 
+    scope_options = {"Whole Register": None, "Model": "model",
+                     "Owner": "owner", "Broad Risk Category": "category"}
+    scope = st.selectbox("Rank Risks Within", list(
+        scope_options.keys()), key="top_risks_scope_12")
+    by = scope_options[scope]
+    value = None
+    ai_models_df = get_ai_models_df()
+    if by == "model":
+        model_names = dict(
+            zip(ai_models_df['model_name'], ai_models_df['model_id']))
+        value = model_names[st.selectbox(
+            "Model", list(model_names.keys()), key="top_risks_model_12")]
+    elif by == "owner":
+        value = st.selectbox("Owner", sorted(
+            ai_models_df['owner'].unique()), key="top_risks_owner_12")
+    elif by == "category":
+        value = st.selectbox("Broad Risk Category", list(
+            st.session_state.AI_RISK_TAXONOMY.keys()), key="top_risks_category_12")
+
+    score_options = {"Composite Score": "composite_risk_score",
+                     "Residual Score (after controls)": "residual_risk_score"}
+    score_label = st.radio("Rank By", list(score_options.keys()),
+                           horizontal=True, key="top_risks_score_12")
+
     if st.button("Identify Top Risks", key="identify_top_risks_btn"):
-        identify_top_risks_st(num_top_risks)
+        identify_top_risks_st(num_top_risks, by, value,
+                              score_options[score_label])
         st.session_state.current_step = 7
         st.rerun()
 
-    if 'top_risks_df' in st.session_state and not st.session_state.top_risks_df.empty:
-        st.markdown(f"\n**Top {num_top_risks} AI Risks by Composite Score:**")
-        st.dataframe(st.session_state.top_risks_df)
+    top_risks_df = get_top_risks_df()
+    if top_risks_df is not None and not top_risks_df.empty:
+        st.markdown(
+            f"\n**Top {num_top_risks} AI Risks by {score_label} ({scope}):**")
+        st.dataframe(top_risks_df)
         st.caption(
             "These are the most critical risks identified, requiring immediate attention.")
         st.success(
             "✅ Top risks identified! Proceed to Visualize Risk Distribution.")
     else:
         st.info("No top risks identified yet. Click 'Identify Top Risks' above.")
+
+    st.markdown("\n**Portfolio Residual Risk by Broad Category:**")
+    st.markdown("""
+        Controls reduce a risk according to their effectiveness and the chosen risk response: a fully effective control mitigates 80% of a risk, transfers 60% of it or avoids it entirely, while an accepted risk is not reduced. Several controls on one risk combine, so the residual score is what remains of the composite score after all of them.
+    """)
+    st.dataframe(get_residual_risk_summary_df())
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import plot_risk_distribution_by_type_st
+from utils import plot_risk_distribution_by_type_st, show_risk_cube_st
 import pandas as pd
 
 
@@ -24,3 +24,9 @@ def main():
             "✅ Risk distribution chart generated! Proceed to Simulate Operational Monitoring.")
         st.session_state.current_step = 8
         st.session_state.chart_generated = False  # Reset for next time
+
+    st.markdown("### Slice the Risk Portfolio")
+    st.markdown("""
+        Executives often ask about a slice of the portfolio, such as "Model Risk in production models owned by the Fraud Prevention Unit". Sarah picks the model statuses, owners, use cases and broad categories to keep and the dimensions to break the slice down by. The counts and scores come from a cube that is kept up to date as risks are added and rescored.
+    """)
+    show_risk_cube_st(key="risk_cube_13")
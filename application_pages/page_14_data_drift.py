@@ -1,5 +1,7 @@
+import io
+
 import streamlit as st
-from utils import simulate_data_drift_alert_st, add_ai_model_st
+from utils import ingest_drift_alerts_st, simulate_data_drift_alert_st, get_ai_models_df, get_model_risks_df, show_register_st
 import pandas as pd
 
 
@@ -15,19 +17,20 @@ def main():
     credit_score_predictor_model_id = None
     if 'credit_score_predictor_model_id' in st.session_state:
         credit_score_predictor_model_id = st.session_state.credit_score_predictor_model_id
-    elif 'Credit Score Predictor' in st.session_state.ai_models_df['model_name'].values:
-        credit_score_predictor_model_id = st.session_state.ai_models_df[
-            st.session_state.ai_models_df['model_name'] == 'Credit Score Predictor']['model_id'].iloc[0]
+    else:
+        ai_models_df = get_ai_models_df()
+        credit_score_models = ai_models_df[ai_models_df['model_name']
+                                           == 'Credit Score Predictor']
+        if not credit_score_models.empty:
+            credit_score_predictor_model_id = credit_score_models['model_id'].iloc[0]
 
     if credit_score_predictor_model_id:
         st.info(
             f"Simulating data drift alert for model: **Credit Score Predictor** (ID: {int(credit_score_predictor_model_id)})")
 
         # Check if Data Drift risk already exists
-        data_drift_risk_exists = st.session_state.ai_risks_df[
-            (st.session_state.ai_risks_df['model_id'] == credit_score_predictor_model_id) &
-            (st.session_state.ai_risks_df['risk_type'] == "Data Drift")
-        ].empty == False
+        data_drift_risk_exists = get_model_risks_df(
+            credit_score_predictor_model_id, "Data Drift").empty == False
 
         if not data_drift_risk_exists:
             with st.form("simulate_drift_form"):
@@ -56,10 +59,8 @@ def main():
                 "The 'Data Drift' risk for Credit Score Predictor has already been simulated and updated.")
 
         # Show success message if data drift risk exists
-        if data_drift_risk_exists or st.session_state.ai_risks_df[
-            (st.session_state.ai_risks_df['model_id'] == credit_score_predictor_model_id) &
-            (st.session_state.ai_risks_df['risk_type'] == "Data Drift")
-        ].empty == False:
+        if data_drift_risk_exists or get_model_risks_df(
+                credit_score_predictor_model_id, "Data Drift").empty == False:
             st.success(
                 "✅ Data drift simulated! Proceed to Update Risk Assessment...")
             st.session_state.current_step = 8
@@ -69,5 +70,31 @@ def main():
             "Credit Score Predictor model not found. Please ensure it is registered in Step 3.")
 
     st.markdown("\n**Updated AI Risks Register after data drift simulation:**")
-    st.dataframe(
-        st.session_state.ai_risks_df[st.session_state.ai_risks_df['model_id'] == credit_score_predictor_model_id])
+    show_register_st('risks', key='risks_view_14', equals={
+                     'model_id': [credit_score_predictor_model_id]})
+
+    st.markdown("---")
+    st.markdown("#### Streaming Monitoring Feed")
+    st.markdown("""
+        In production the monitoring system emits thousands of drift alerts per hour across the model inventory. Sarah can replay an alert feed (a JSONL file with one alert per line: `model_id`, `risk_type`, `likelihood`, `magnitude`, and optionally `timestamp` and `hazard_description`). Repeated alerts for the same model and risk type within the coalescing window become a single update carrying the highest scores seen, and updates are applied to the register in batches.
+    """)
+    with st.form("drift_feed_form"):
+        alert_file = st.file_uploader(
+            "Drift alert feed (JSONL)", type=["jsonl", "json", "txt"], key="drift_feed_file_14")
+        window_seconds = st.number_input(
+            "Coalescing window (seconds)", min_value=1, max_value=86400, value=60, key="drift_window_14")
+        ingest = st.form_submit_button("Ingest Alert Feed")
+        if ingest:
+            if alert_file is None:
+                st.warning("Upload an alert feed to ingest.")
+            else:
+                st.session_state.drift_ingest_stats = ingest_drift_alerts_st(
+                    io.TextIOWrapper(alert_file, encoding="utf-8"), float(window_seconds))
+
+    stats = st.session_state.get('drift_ingest_stats')
+    if stats is not None:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Alerts", stats.events)
+        col2.metric("Alerts / second", f"{stats.events_per_second:,.0f}")
+        col3.metric("Risks updated", stats.risks_updated)
+        col4.metric("Risks created", stats.risks_created)
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import update_risk_assessment_from_monitoring_st
+from utils import get_register_as_of, get_risk_score_trajectory_df, get_score_changes_df, update_risk_assessment_from_monitoring_st, update_risk_assessments_from_monitoring_many, detect_feature_drift_st, get_ai_models_df, get_model_risks_df, show_register_st
 import pandas as pd
 
 
@@ -11,12 +11,15 @@ def main():
         By continuously refining risk assessments based on real-time monitoring, Sarah ensures that the risk register remains a living document that accurately reflects the current state of AI risks at QuantFinance Bank, supporting agile risk management.
     """)
 
+    ai_models_df = get_ai_models_df()
     credit_score_predictor_model_id = None
     if 'credit_score_predictor_model_id' in st.session_state:
         credit_score_predictor_model_id = st.session_state.credit_score_predictor_model_id
-    elif 'Credit Score Predictor' in st.session_state.ai_models_df['model_name'].values:
-        credit_score_predictor_model_id = st.session_state.ai_models_df[
-            st.session_state.ai_models_df['model_name'] == 'Credit Score Predictor']['model_id'].iloc[0]
+    else:
+        credit_score_models = ai_models_df[ai_models_df['model_name']
+                                           == 'Credit Score Predictor']
+        if not credit_score_models.empty:
+            credit_score_predictor_model_id = credit_score_models['model_id'].iloc[0]
 
     if credit_score_predictor_model_id:
         st.info("The data drift event directly impacts the model's 'Performance Degradation' risk, requiring an update to its assessment.")
@@ -26,16 +29,16 @@ def main():
         updated_magnitude_val = 4
 
         # Get current scores for Performance Degradation
-        perf_degrad_risk = st.session_state.ai_risks_df[
-            (st.session_state.ai_risks_df['model_id'] == credit_score_predictor_model_id) &
-            (st.session_state.ai_risks_df['risk_type'] == target_risk_type)
-        ]
+        perf_degrad_risk = get_model_risks_df(
+            credit_score_predictor_model_id, target_risk_type)
 
         needs_update = True
         if not perf_degrad_risk.empty:
             current_likelihood = perf_degrad_risk['likelihood_score'].iloc[0]
             current_magnitude = perf_degrad_risk['magnitude_score'].iloc[0]
-            if current_likelihood == updated_likelihood_val and current_magnitude == updated_magnitude_val:
+            # Unscored risks hold pd.NA, which equals nothing
+            if pd.notna(current_likelihood) and pd.notna(current_magnitude) and \
+                    current_likelihood == updated_likelihood_val and current_magnitude == updated_magnitude_val:
                 needs_update = False
         else:
             st.warning(
@@ -62,8 +65,73 @@ def main():
 
         st.markdown(
             "\n**Updated AI Risks Register after monitoring feedback:**")
-        st.dataframe(
-            st.session_state.ai_risks_df[st.session_state.ai_risks_df['model_id'] == credit_score_predictor_model_id])
+        show_register_st('risks', key='risks_view_15', equals={
+                         'model_id': [credit_score_predictor_model_id]})
+
+        if not perf_degrad_risk.empty:
+            # The pre-drift assessment is kept in the score history
+            perf_degrad_risk_id = int(perf_degrad_risk['risk_id'].iloc[0])
+            st.markdown(
+                f"\n**Assessment history of '{target_risk_type}' (Risk ID: {perf_degrad_risk_id}):**")
+            st.dataframe(get_risk_score_trajectory_df(perf_degrad_risk_id))
 
     else:
         st.error("Credit Score Predictor model not found. Cannot update risk assessment. Please ensure it is registered in Step 3.")
+
+    if not ai_models_df.empty:
+        st.markdown("---")
+        st.markdown("#### Statistical Drift Check")
+        st.markdown("""
+            Instead of judging the new likelihood by hand, Sarah can let the monitoring data speak. Upload a reference sample (e.g. the training data) and a current sample of the model's input features (CSV or Parquet, one column per feature). Each numeric feature is binned on the reference sample and compared with the Population Stability Index (PSI), the Kolmogorov-Smirnov statistic and the Jensen-Shannon divergence; the most drifted feature sets the likelihood score (1-5). Samples are processed in chunks, so millions of rows per feature are fine.
+        """)
+        with st.form("drift_check_form"):
+            model_name = st.selectbox(
+                "Model", ai_models_df['model_name'].tolist(), key="drift_check_model_15")
+            reference_file = st.file_uploader(
+                "Reference sample", type=["csv", "parquet"], key="drift_reference_15")
+            current_file = st.file_uploader(
+                "Current sample", type=["csv", "parquet"], key="drift_current_15")
+            bins = st.number_input(
+                "Histogram bins", min_value=2, max_value=100, value=10, key="drift_bins_15")
+            check = st.form_submit_button("Compute Drift")
+            if check:
+                if reference_file is None or current_file is None:
+                    st.warning("Upload both a reference and a current sample.")
+                else:
+                    detector = detect_feature_drift_st(
+                        reference_file, current_file, bins=int(bins))
+                    if detector is not None:
+                        st.session_state.drift_check = {
+                            'model_id': int(ai_models_df.loc[ai_models_df['model_name'] == model_name, 'model_id'].iloc[0]),
+                            'model_name': model_name,
+                            'report': detector.report(),
+                            'likelihood': detector.likelihood(),
+                        }
+
+        drift_check = st.session_state.get('drift_check')
+        if drift_check is not None:
+            st.markdown(f"**Feature drift for {drift_check['model_name']}:**")
+            st.dataframe(drift_check['report'])
+            st.metric("Drift likelihood score", drift_check['likelihood'])
+            target_risk_types = st.multiselect("Risk types to re-assess", ["Data Drift", "Concept Drift", "Performance Degradation"],
+                                               default=["Data Drift", "Performance Degradation"], key="drift_targets_15")
+            if st.button("Apply Drift Likelihood", key="apply_drift_likelihood_btn") and target_risk_types:
+                # Likelihood comes from the drift check; the assessed magnitudes are kept
+                update_risk_assessments_from_monitoring_many(
+                    [drift_check['model_id']] *
+                    len(target_risk_types), target_risk_types,
+                    [drift_check['likelihood']] * len(target_risk_types))
+
+    changes = get_score_changes_df()
+    if not changes.empty:
+        st.markdown("---")
+        st.markdown("#### Register Time Travel")
+        st.markdown(
+            "Every score and response change is kept in an append-only history, so Sarah can review the risk register exactly as it stood at any earlier point, e.g. before the drift alert was processed.")
+        change_times = list(changes['timestamp'].drop_duplicates())
+        as_of = st.select_slider("Show the risk register as of", options=change_times,
+                                 value=change_times[-1], format_func=lambda t: t.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3], key="history_as_of_15")
+        show_register_st(get_register_as_of(as_of)[
+                         'risks'], key='as_of_view_15')
+        with st.expander("Change log"):
+            show_register_st(changes, key='changes_view_15')
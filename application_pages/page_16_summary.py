@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import get_full_risk_register_st, identify_top_risks_st, plot_risk_distribution_by_type_st, restart_workflow
+from utils import get_full_risk_register_st, get_top_risks_df, plot_risk_distribution_by_type_st, show_register_st, show_risk_cube_st, get_row_count
 import pandas as pd
 
 
@@ -18,21 +18,20 @@ def main():
         return
 
     # Check if required data exists
-    if 'ai_risks_df' not in st.session_state or st.session_state.ai_risks_df.empty:
+    if 'risk_register' not in st.session_state or get_row_count('risks') == 0:
         st.warning(
             "⚠️ No risks have been identified yet. Please complete the workflow starting from Step 1 to generate the risk register.")
         st.session_state.current_step = 1
         return
 
     st.markdown("### Final Comprehensive AI Model Risk Register")
-    if 'full_risk_register_df' not in st.session_state or st.session_state.full_risk_register_df.empty:
+    if not st.session_state.get('full_risk_register_generated', False) or get_row_count('full_register') == 0:
         get_full_risk_register_st()
-    st.dataframe(st.session_state.full_risk_register_df)
+    show_register_st('full_register', key='full_register_view_16')
 
     st.markdown("### Final Top Risks Overview")
-    if 'top_risks_df' not in st.session_state or st.session_state.top_risks_df.empty:
-        identify_top_risks_st(num_top_risks=3)  # Default 3 for summary
-    st.dataframe(st.session_state.top_risks_df)
+    # The last ranking from Step 12, re-run on the register as it is now; top 3 by default
+    st.dataframe(get_top_risks_df(num_top_risks=3))
     st.caption(
         "These represent the most critical AI risks for QuantFinance Bank, requiring ongoing attention.")
 
@@ -41,4 +40,7 @@ def main():
     st.caption(
         "This chart provides a strategic overview of risk concentrations across different categories.")
 
+    st.markdown("### Risk Portfolio by Status, Owner, Use Case and Category")
+    show_risk_cube_st(key="risk_cube_16")
+
     st.success("Sarah has established a robust AI risk management framework!")
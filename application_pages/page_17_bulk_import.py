@@ -0,0 +1,69 @@
+import streamlit as st
+from utils import import_register_files_st, restore_register_snapshot_st, save_register_snapshot_st, get_row_count
+from register_import import DEFAULT_CHUNK_SIZE
+
+
+def main():
+    st.subheader("17. Bulk Import of the Existing AI Inventory")
+    st.markdown("""
+        QuantFinance Bank already tracks thousands of AI models and tens of thousands of risks outside this system. Rather than re-entering them one form at a time, Sarah can load the existing inventory in bulk from CSV or Parquet files.
+
+        Every row is validated before it enters the register: risk types must belong to the AI risk taxonomy, scores must be on the 1-5 scale, and every risk and control must link to a registered model or risk. Rows that fail are reported back with the reason, so the source inventory can be corrected and re-imported.
+    """)
+
+    with st.expander("Expected file columns"):
+        st.markdown("""
+            - **Models**: `model_name` (required), `use_case`, `description`, `owner`, `status` (In Development, In Production or Retired), and optionally the inventory's own `model_id`.
+            - **Risks**: `model_id` (from the models file), `register_model_id` (a model already in the register) or `model_name`, `risk_type`, `hazard_description`, `likelihood_score`, `magnitude_score`, and optionally the inventory's own `risk_id`. Composite scores are calculated on import.
+            - **Controls**: `risk_id` (from the risks file) or `register_risk_id` (a risk already in the register), `control_description`, `effectiveness_score`, `risk_response` (Mitigate, Transfer, Avoid or Accept).
+        """)
+
+    with st.form("bulk_import_form"):
+        models_file = st.file_uploader(
+            "Models file", type=["csv", "parquet"], key="bulk_models_file")
+        risks_file = st.file_uploader(
+            "Risks file", type=["csv", "parquet"], key="bulk_risks_file")
+        controls_file = st.file_uploader(
+            "Controls file", type=["csv", "parquet"], key="bulk_controls_file")
+        chunk_size = st.number_input("Rows per chunk", min_value=1000, max_value=1000000,
+                                     value=DEFAULT_CHUNK_SIZE, step=1000, key="bulk_chunk_size")
+        submitted = st.form_submit_button("Import Inventory")
+
+        if submitted:
+            if models_file is None and risks_file is None and controls_file is None:
+                st.warning("Upload at least one file to import.")
+            else:
+                st.session_state.bulk_import_reports = import_register_files_st(
+                    models_file, risks_file, controls_file, int(chunk_size))
+
+    for report in st.session_state.get('bulk_import_reports', []):
+        st.markdown(f"**{report.table.capitalize()} import:**")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Rows read", report.rows_read)
+        col2.metric("Imported", report.rows_imported)
+        col3.metric("Rejected", report.rows_rejected)
+        col4.metric("Rows / second", f"{report.rows_per_second:,.0f}")
+        if report.rows_rejected:
+            st.dataframe(report.rejected)
+            st.download_button(f"Download rejected {report.table}", report.rejected.to_csv(index=False),
+                               file_name=f"rejected_{report.table}.csv", key=f"download_rejected_{report.table}")
+
+    st.markdown("\n**Register Snapshots:**")
+    st.markdown("""
+        Once the inventory is loaded, Sarah can save the whole register, with the risk taxonomy, as a snapshot and reopen it later in well under a second instead of importing the files again. Arrow snapshots are opened by memory-mapping; Parquet snapshots are smaller and suit archiving.
+    """)
+    snapshot_path = st.text_input(
+        "Snapshot directory", value="register_snapshot", key="snapshot_path_17")
+    snapshot_format = st.radio("Format", ["arrow", "parquet"], horizontal=True,
+                               key="snapshot_format_17")
+    col1, col2 = st.columns(2)
+    if col1.button("Save Snapshot", key="save_snapshot_btn"):
+        save_register_snapshot_st(snapshot_path, snapshot_format)
+    if col2.button("Restore Snapshot", key="restore_snapshot_btn"):
+        restore_register_snapshot_st(snapshot_path)
+
+    st.markdown("\n**Register Size:**")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Models", get_row_count('models'))
+    col2.metric("Risks", get_row_count('risks'))
+    col3.metric("Controls", get_row_count('controls'))
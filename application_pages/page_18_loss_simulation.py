@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils import simulate_portfolio_losses_st
+from risk_simulation import EVENTS_PER_YEAR, MEDIAN_LOSS
+
+
+def main():
+    st.subheader("18. Portfolio Loss Simulation")
+    st.markdown("""
+        Point scores rank risks, but capital planning and board reporting need a view of how much the AI portfolio could lose in a bad year. Sarah simulates many years of loss events across every scored risk and reads off the expected annual loss, the Value at Risk (the loss exceeded only in the worst years at the chosen confidence level) and the expected shortfall (the average loss in those worst years).
+
+        Each risk's likelihood score sets how often it causes a loss event and its magnitude score how large a typical loss is, with wide variation around it. With controls applied, each loss is reduced in line with the risk's residual score.
+    """)
+
+    with st.expander("Loss calibration"):
+        st.dataframe(pd.DataFrame({
+            'score': list(EVENTS_PER_YEAR),
+            'loss events per year (likelihood)': list(EVENTS_PER_YEAR.values()),
+            'median loss per event, USD (magnitude)': [MEDIAN_LOSS[score] for score in EVENTS_PER_YEAR],
+        }), hide_index=True)
+
+    group_options = {"Broad Risk Category": "category",
+                     "Model": "model", "Owner": "owner"}
+    with st.form("loss_simulation_form"):
+        col1, col2 = st.columns(2)
+        group_label = col1.selectbox("Aggregate Losses By", list(
+            group_options.keys()), key="simulation_group_18")
+        confidence = col2.select_slider("Confidence Level", options=[0.95, 0.99, 0.995], value=0.99,
+                                        format_func=lambda c: f"{c:.1%}", key="simulation_confidence_18")
+        max_trials = col1.number_input("Maximum Simulated Years", min_value=1000, max_value=1000000,
+                                       value=100000, step=10000, key="simulation_trials_18")
+        tolerance = col2.number_input("Stop When the VaR Confidence Interval Is Within (%)", min_value=0.5,
+                                      max_value=20.0, value=2.0, step=0.5, key="simulation_tolerance_18")
+        seed = col1.number_input("Random Seed", min_value=0, value=42,
+                                 step=1, key="simulation_seed_18")
+        workers = col2.number_input("Worker Processes", min_value=1, max_value=os.cpu_count() or 1,
+                                    value=min(4, os.cpu_count() or 1), step=1, key="simulation_workers_18")
+        use_controls = st.checkbox("Apply control effectiveness (simulate residual risk)", value=True,
+                                   key="simulation_controls_18")
+        submitted = st.form_submit_button("Run Simulation")
+
+        if submitted:
+            with st.spinner("Simulating portfolio losses..."):
+                simulate_portfolio_losses_st(group_options[group_label], int(max_trials), confidence,
+                                             tolerance / 100, int(seed), use_controls, int(workers))
+
+    result = st.session_state.get('loss_simulation')
+    if result is None:
+        st.info("Run the simulation to see the portfolio's loss distribution.")
+        return
+
+    level = f"{result.confidence:.1%}"
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Expected Annual Loss", f"${result.expected_loss:,.0f}")
+    col2.metric(f"VaR ({level})", f"${result.var:,.0f}")
+    col3.metric(f"Expected Shortfall ({level})",
+                f"${result.expected_shortfall:,.0f}")
+    low, high = result.interval
+    st.caption(f"{result.trials:,} simulated years in {result.seconds:.1f}s; "
+               f"95% confidence interval of the VaR: ${low:,.0f} to ${high:,.0f}"
+               + ("" if result.converged else " (trial limit reached before the interval narrowed to the target)")
+               + (f". {result.inputs.unscored} unscored risk(s) were left out." if result.inputs.unscored else "."))
+
+    st.markdown("\n**Distribution of Simulated Annual Portfolio Losses (USD):**")
+    counts, edges = np.histogram(result.losses, bins=50)
+    st.bar_chart(pd.DataFrame({'years': counts}, index=pd.Index(
+        np.round((edges[:-1] + edges[1:]) / 2, -3), name='annual loss')))
+
+    st.markdown(f"\n**Losses by {group_label}:**")
+    st.dataframe(result.summary().rename(columns={
+        'group': group_label, 'expected_loss': 'Expected Loss', 'var': f'VaR ({level})',
+        'expected_shortfall': f'Expected Shortfall ({level})'}), hide_index=True)
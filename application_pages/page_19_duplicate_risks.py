@@ -0,0 +1,29 @@
+import streamlit as st
+from utils import suggest_risk_merges_st, show_register_st
+
+
+def main():
+    st.subheader("19. Finding Duplicate Risks")
+    st.markdown("""
+        Risks reach the register from many places: initial identification, red-team findings, supply chain reviews and drift alerts. The same hazard is often registered again in different words, which inflates risk counts and splits controls across copies of one risk. Sarah looks for risks whose hazard descriptions share most of their words and reviews the suggested merges before acting on them.
+
+        Similarity is the share of distinct words (ignoring common words like "the" and "of") two descriptions have in common. It is estimated from compact signatures, so even a large register is checked in seconds. In each group, the first registered risk is suggested to be kept. Nothing is changed in the register.
+    """)
+
+    with st.form("duplicate_risks_form"):
+        col1, col2 = st.columns(2)
+        threshold = col1.slider("Minimum Similarity", min_value=0.3, max_value=1.0, value=0.6, step=0.05,
+                                key="duplicate_threshold_19")
+        same_model = col2.checkbox("Only compare risks of the same model",
+                                   key="duplicate_same_model_19")
+        submitted = st.form_submit_button("Find Duplicate Risks")
+        if submitted:
+            with st.spinner("Comparing hazard descriptions..."):
+                suggest_risk_merges_st(threshold, same_model)
+
+    suggestions = st.session_state.get('merge_suggestions')
+    if suggestions is None:
+        st.info("Search the register to see merge suggestions.")
+    elif not suggestions.empty:
+        st.markdown("\n**Suggested Merges:**")
+        show_register_st(suggestions, key='merge_suggestions_view_19')
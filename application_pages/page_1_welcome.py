@@ -1,5 +1,10 @@
 import streamlit as st
-from utils import initialize_risk_management_system_st
+from utils import initialize_risk_management_system_st, clear_register_allowed, clear_register_st, get_row_count, show_register_st
+
+
+def _clear_register():
+    clear_register_st()
+    st.session_state.confirm_clear_register = False
 
 
 def main():
@@ -27,6 +32,17 @@ def main():
         st.session_state.system_initialized = True
         st.rerun()
 
+    # Wiping the register affects every session, so it is a separate, confirmed action
+    if clear_register_allowed():
+        with st.expander("Administration: clear the register"):
+            st.warning(
+                "This deletes every model, risk and control, for all sessions sharing the register and in its database.")
+            confirmed = st.checkbox(
+                "I understand that the whole register will be deleted", key="confirm_clear_register")
+            # A callback: it runs before the page's navigation rerun could drop the click
+            st.button("Clear Register", key="clear_register_btn",
+                      disabled=not confirmed, on_click=_clear_register)
+
     # Only show registers after initialization
     if st.session_state.system_initialized:
         st.success("✅ AI Model Risk Register system initialized successfully!")
@@ -37,20 +53,20 @@ def main():
             "**Status:** ✅ System Initialized - Ready to register models and risks")
 
         st.markdown("### AI Models Register")
-        st.dataframe(st.session_state.ai_models_df, use_container_width=True)
-        if st.session_state.ai_models_df.empty:
+        show_register_st('models', key='models_view_1')
+        if get_row_count('models') == 0:
             st.caption(
                 "_No models registered yet. Models will be added in Step 3._")
 
         st.markdown("### AI Risks Register")
-        st.dataframe(st.session_state.ai_risks_df, use_container_width=True)
-        if st.session_state.ai_risks_df.empty:
+        show_register_st('risks', key='risks_view_1')
+        if get_row_count('risks') == 0:
             st.caption(
                 "_No risks identified yet. Risks will be added starting from Step 4._")
 
         st.markdown("### AI Controls Register")
-        st.dataframe(st.session_state.ai_controls_df, use_container_width=True)
-        if st.session_state.ai_controls_df.empty:
+        show_register_st('controls', key='controls_view_1')
+        if get_row_count('controls') == 0:
             st.caption(
                 "_No controls defined yet. Controls will be added in Step 9._")
 
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import add_ai_model_st
+from utils import add_ai_model_st, get_ai_models_df, show_register_st, get_row_count
 import pandas as pd
 
 
@@ -27,8 +27,9 @@ def main():
 
         if submitted:
             # Check if model already exists before adding
-            existing_model = st.session_state.ai_models_df[
-                st.session_state.ai_models_df['model_name'] == model_name]
+            ai_models_df = get_ai_models_df()
+            existing_model = ai_models_df[ai_models_df['model_name']
+                                          == model_name]
             if existing_model.empty:
                 new_model_id = add_ai_model_st(
                     model_name, use_case, description, owner, status)
@@ -44,9 +45,9 @@ def main():
                 st.rerun()  # Proceed even if already exists
 
     st.markdown("\n**Updated AI Models Register:**")
-    st.dataframe(st.session_state.ai_models_df)
+    show_register_st('models', key='models_view_3')
 
-    if not st.session_state.ai_models_df.empty:
+    if get_row_count('models'):
         st.success(
             "✅ Model registered! Proceed to Initial Risk Identification.")
         st.session_state.current_step = 3
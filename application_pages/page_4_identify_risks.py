@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import add_ai_risk_st
+from utils import add_ai_risk_st, get_ai_models_df, get_ai_risks_df, show_register_st
 import pandas as pd
 
 
@@ -15,9 +15,12 @@ def main():
     credit_score_predictor_model_id = None
     if 'credit_score_predictor_model_id' in st.session_state:
         credit_score_predictor_model_id = st.session_state.credit_score_predictor_model_id
-    elif 'Credit Score Predictor' in st.session_state.ai_models_df['model_name'].values:
-        credit_score_predictor_model_id = st.session_state.ai_models_df[
-            st.session_state.ai_models_df['model_name'] == 'Credit Score Predictor']['model_id'].iloc[0]
+    else:
+        ai_models_df = get_ai_models_df()
+        credit_score_models = ai_models_df[ai_models_df['model_name']
+                                           == 'Credit Score Predictor']
+        if not credit_score_models.empty:
+            credit_score_predictor_model_id = credit_score_models['model_id'].iloc[0]
 
     if credit_score_predictor_model_id:
         st.write(
@@ -34,8 +37,9 @@ def main():
         ]
 
         # Check if risks are already added to avoid duplicates in the UI
-        current_risks = st.session_state.ai_risks_df[st.session_state.ai_risks_df['model_id']
-                                                     == credit_score_predictor_model_id]['hazard_description'].tolist()
+        ai_risks_df = get_ai_risks_df()
+        current_risks = ai_risks_df[ai_risks_df['model_id']
+                                    == credit_score_predictor_model_id]['hazard_description'].tolist()
 
         # Use a form to add risks to ensure only one action per rerun if multiple buttons are clicked
         with st.form("initial_risk_identification_form"):
@@ -65,8 +69,8 @@ def main():
 
         st.markdown(
             "\n**Updated AI Risks Register (for Credit Score Predictor):**")
-        st.dataframe(
-            st.session_state.ai_risks_df[st.session_state.ai_risks_df['model_id'] == credit_score_predictor_model_id])
+        show_register_st('risks', key='risks_view_4', equals={
+                         'model_id': [credit_score_predictor_model_id]})
 
         # Only show success message if all risks have been added
         if all(risk['description'] in current_risks for risk in risks_to_add):
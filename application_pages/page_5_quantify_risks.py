@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import assign_risk_scores_st
+from utils import assign_risk_scores_many, get_versioned_df, show_register_st
 import pandas as pd
 
 
@@ -13,10 +13,13 @@ def main():
         where $P(\text{event})$ represents the likelihood of a risk event occurring, and $M(\text{consequence})$ represents the severity of the impact if the event occurs. These scores will typically be qualitative (e.g., Low, Medium, High) mapped to numerical scales (e.g., 1-5).
     """)
 
-    risks_to_score = st.session_state.ai_risks_df[
-        (st.session_state.ai_risks_df['likelihood_score'].isna()) |
-        (st.session_state.ai_risks_df['magnitude_score'].isna())
+    risks_df = get_versioned_df('risks')
+    risks_to_score = risks_df[
+        (risks_df['likelihood_score'].isna()) |
+        (risks_df['magnitude_score'].isna())
     ].copy()
+    # Versions the form was first shown with, so a submit does not overwrite another session's scores
+    form_versions = st.session_state.setdefault('score_form_versions', {})
 
     if not risks_to_score.empty:
         st.info("Sarah, use the sliders below to assign likelihood and magnitude scores for each risk. These scores are crucial for calculating the overall severity of each AI risk.")
@@ -25,6 +28,7 @@ def main():
         with st.form("assign_scores_form"):
             for index, risk in risks_to_score.iterrows():
                 risk_id = int(risk['risk_id'])
+                form_versions.setdefault(risk_id, int(risk['row_version']))
                 st.markdown(f"**Risk ID: {risk_id}**")
                 st.write(f"Type: {risk['risk_type']}")
                 st.write(f"Hazard: {risk['hazard_description']}")
@@ -41,9 +45,15 @@ def main():
             submitted_scores = st.form_submit_button("Assign All Scores")
 
             if submitted_scores:
-                for score_data in scored_risks_data:
-                    assign_risk_scores_st(
-                        score_data['risk_id'], score_data['likelihood'], score_data['magnitude'])
+                assign_risk_scores_many(
+                    [score_data['risk_id']
+                        for score_data in scored_risks_data],
+                    [score_data['likelihood']
+                        for score_data in scored_risks_data],
+                    [score_data['magnitude']
+                        for score_data in scored_risks_data],
+                    expected_versions=[form_versions[score_data['risk_id']] for score_data in scored_risks_data])
+                del st.session_state['score_form_versions']
                 st.session_state.current_step = 4
                 st.rerun()
     else:
@@ -53,4 +63,4 @@ def main():
 
     st.markdown(
         "\n**Updated AI Risks Register with Likelihood and Magnitude Scores:**")
-    st.dataframe(st.session_state.ai_risks_df)
+    show_register_st('risks', key='risks_view_5')
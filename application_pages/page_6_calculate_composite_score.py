@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import calculate_composite_risk_score_st
+from utils import calculate_composite_scores_all, get_ai_risks_df, show_register_st
 import pandas as pd
 
 
@@ -11,10 +11,11 @@ def main():
         By standardizing risk quantification, Sarah ensures that all stakeholders at QuantFinance Bank can understand and compare the severity of different AI risks, guiding resource allocation for risk mitigation.
     """)
 
-    uncalculated_risks = st.session_state.ai_risks_df[
-        st.session_state.ai_risks_df['composite_risk_score'].isna() &
-        st.session_state.ai_risks_df['likelihood_score'].notna() &
-        st.session_state.ai_risks_df['magnitude_score'].notna()
+    ai_risks_df = get_ai_risks_df()
+    uncalculated_risks = ai_risks_df[
+        ai_risks_df['composite_risk_score'].isna() &
+        ai_risks_df['likelihood_score'].notna() &
+        ai_risks_df['magnitude_score'].notna()
     ]
 
     if not uncalculated_risks.empty:
@@ -37,11 +38,10 @@ def main():
                     rf"\text{{Composite Risk Score}} = {risk['likelihood_score']} \times {risk['magnitude_score']} = {risk['likelihood_score'] * risk['magnitude_score']}")
 
         if st.button("Calculate All Composite Risk Scores", key="calculate_composite_btn"):
-            for risk_id in uncalculated_risks['risk_id']:
-                calculate_composite_risk_score_st(int(risk_id))
+            calculate_composite_scores_all()
             st.rerun()
 
-    if st.session_state.ai_risks_df['composite_risk_score'].notna().any():
+    if ai_risks_df['composite_risk_score'].notna().any():
         st.success(
             "✅ Composite scores calculated! Proceed to Integrating Adversarial Insights.")
         st.session_state.current_step = 5
@@ -51,5 +51,5 @@ def main():
         st.session_state.current_step = 5
 
     st.markdown("\n**Updated AI Risks Register with Composite Risk Scores:**")
-    st.dataframe(st.session_state.ai_risks_df)
+    show_register_st('risks', key='risks_view_6')
     st.caption("A higher composite score indicates a more critical risk, requiring greater attention and resource allocation for mitigation.")
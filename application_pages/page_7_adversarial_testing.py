@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import add_adversarial_risk_st
+from utils import add_adversarial_risk_st, get_ai_models_df, search_register_ids, show_register_st
 import pandas as pd
 
 
@@ -15,21 +15,20 @@ def main():
     credit_score_predictor_model_id = None
     if 'credit_score_predictor_model_id' in st.session_state:
         credit_score_predictor_model_id = st.session_state.credit_score_predictor_model_id
-    elif 'Credit Score Predictor' in st.session_state.ai_models_df['model_name'].values:
-        credit_score_predictor_model_id = st.session_state.ai_models_df[
-            st.session_state.ai_models_df['model_name'] == 'Credit Score Predictor']['model_id'].iloc[0]
+    else:
+        ai_models_df = get_ai_models_df()
+        credit_score_models = ai_models_df[ai_models_df['model_name']
+                                           == 'Credit Score Predictor']
+        if not credit_score_models.empty:
+            credit_score_predictor_model_id = credit_score_models['model_id'].iloc[0]
 
     if credit_score_predictor_model_id:
         st.write(
             f"Adding adversarial risk for model: **Credit Score Predictor** (ID: {int(credit_score_predictor_model_id)})")
 
         # Check if the adversarial risk is already added
-        adversarial_risk_exists = st.session_state.ai_risks_df[
-            (st.session_state.ai_risks_df['model_id'] == credit_score_predictor_model_id) &
-            (st.session_state.ai_risks_df['risk_type'] == "Model Risk") &
-            (st.session_state.ai_risks_df['hazard_description'].str.contains(
-                "Adversarial Attack", na=False))
-        ].empty == False
+        adversarial_risk_exists = bool(search_register_ids(
+            '"adversarial attack"', model_id=credit_score_predictor_model_id, risk_type="Model Risk"))
 
         if not adversarial_risk_exists:
             with st.form("add_adversarial_risk_form"):
@@ -59,4 +58,4 @@ def main():
             "Credit Score Predictor model not found. Please ensure it's registered in Step 3.")
 
     st.markdown("\n**Updated AI Risks Register with adversarial attack risk:**")
-    st.dataframe(st.session_state.ai_risks_df)
+    show_register_st('risks', key='risks_view_7')
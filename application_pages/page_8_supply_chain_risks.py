@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import add_ai_model_st, add_supply_chain_risk_st
+from utils import add_ai_model_st, add_supply_chain_risk_st, get_ai_models_df, search_register_ids, show_register_st
 import pandas as pd
 
 
@@ -13,8 +13,9 @@ def main():
 
     fraud_detection_model_name = "Fraud Detection System"
     fraud_model_id = None
-    existing_fraud_model = st.session_state.ai_models_df[
-        st.session_state.ai_models_df['model_name'] == fraud_detection_model_name]
+    ai_models_df = get_ai_models_df()
+    existing_fraud_model = ai_models_df[ai_models_df['model_name']
+                                        == fraud_detection_model_name]
 
     if existing_fraud_model.empty:
         st.info(
@@ -39,17 +40,11 @@ def main():
         st.markdown(
             f"Adding risks for model: **{fraud_detection_model_name}** (ID: {int(fraud_model_id)})")
 
-        data_provenance_risk_exists = st.session_state.ai_risks_df[
-            (st.session_state.ai_risks_df['model_id'] == fraud_model_id) &
-            (st.session_state.ai_risks_df['hazard_description'].str.contains(
-                "Data Provenance", na=False))
-        ].empty == False
+        data_provenance_risk_exists = bool(search_register_ids(
+            '"data provenance"', model_id=fraud_model_id))
 
-        third_party_risk_exists = st.session_state.ai_risks_df[
-            (st.session_state.ai_risks_df['model_id'] == fraud_model_id) &
-            (st.session_state.ai_risks_df['hazard_description'].str.contains(
-                "Third-Party Dependency", na=False))
-        ].empty == False
+        third_party_risk_exists = bool(search_register_ids(
+            'third-party', model_id=fraud_model_id))
 
         if not data_provenance_risk_exists:
             st.markdown(
@@ -73,7 +68,7 @@ def main():
                     st.rerun()
         else:
             st.info("Data Provenance Risk already added.")
-        
+
         # Display success message after rerun
         if st.session_state.get('show_dp_success', False):
             st.success(
@@ -102,7 +97,7 @@ def main():
                     st.rerun()
         else:
             st.info("Third-Party Dependency Risk already added.")
-        
+
         # Display success message after rerun
         if st.session_state.get('show_tpd_success', False):
             st.success(
@@ -116,6 +111,6 @@ def main():
             st.session_state.current_step = 9
 
     st.markdown("\n**Updated AI Models Register:**")
-    st.dataframe(st.session_state.ai_models_df)
+    show_register_st('models', key='models_view_8')
     st.markdown("\n**Updated AI Risks Register:**")
-    st.dataframe(st.session_state.ai_risks_df)
+    show_register_st('risks', key='risks_view_8')
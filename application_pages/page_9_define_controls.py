@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import add_ai_control_st
+from utils import add_ai_control_st, get_ai_risks_df, search_register_ids, show_register_st, show_text_search_st
 import pandas as pd
 
 
@@ -13,24 +13,24 @@ def main():
 
     # Identify relevant risk IDs for controls
     # Algorithmic Bias is stored in risk_type
-    algorithmic_bias_risk_id = st.session_state.ai_risks_df[st.session_state.ai_risks_df['risk_type'].str.contains(
-        'Algorithmic Bias', na=False)]['risk_id'].iloc[0] if not st.session_state.ai_risks_df[st.session_state.ai_risks_df['risk_type'].str.contains('Algorithmic Bias', na=False)].empty else None
+    ai_risks_df = get_ai_risks_df()
+    algorithmic_bias_risks = ai_risks_df[ai_risks_df['risk_type'].str.contains(
+        'Algorithmic Bias', na=False)]
+    algorithmic_bias_risk_id = None
+    if not algorithmic_bias_risks.empty:
+        algorithmic_bias_risk_id = algorithmic_bias_risks['risk_id'].iloc[0]
     # Adversarial Attack is stored in hazard_description (risk_type is "Model Risk")
-    adversarial_attack_risk_id = st.session_state.ai_risks_df[st.session_state.ai_risks_df['hazard_description'].str.contains(
-        'Adversarial Attack', na=False, case=False)]['risk_id'].iloc[0] if not st.session_state.ai_risks_df[st.session_state.ai_risks_df['hazard_description'].str.contains('Adversarial Attack', na=False, case=False)].empty else None
-    # Data Provenance is stored in hazard_description (risk_type is "Data Risk") - search for "provenance" in lowercase
-    data_provenance_risk_id = st.session_state.ai_risks_df[st.session_state.ai_risks_df['hazard_description'].str.contains(
-        'provenance', na=False, case=False)]['risk_id'].iloc[0] if not st.session_state.ai_risks_df[st.session_state.ai_risks_df['hazard_description'].str.contains('provenance', na=False, case=False)].empty else None
+    adversarial_attack_risk_id = next(
+        iter(search_register_ids('"adversarial attack"')), None)
+    # Data Provenance is stored in hazard_description (risk_type is "Data Risk")
+    data_provenance_risk_id = next(
+        iter(search_register_ids('provenance')), None)
 
     # Helper to check if a control for a given risk_id and description exists
     def control_exists(risk_id, control_desc_part):
         if risk_id is None:
             return False
-        return not st.session_state.ai_controls_df[
-            (st.session_state.ai_controls_df['risk_id'] == risk_id) &
-            (st.session_state.ai_controls_df['control_description'].str.contains(
-                control_desc_part, na=False))
-        ].empty
+        return bool(search_register_ids(f'"{control_desc_part}"', table='controls', risk_id=risk_id))
 
     st.markdown("Sarah, define controls for the following identified risks:")
 
@@ -85,7 +85,10 @@ def main():
             "Data Provenance risk not found. Please ensure it was added in previous steps.")
 
     st.markdown("\n**Updated AI Controls Register:**")
-    st.dataframe(st.session_state.ai_controls_df)
+    show_register_st('controls', key='controls_view_9')
+
+    st.markdown("\n**Search the Register:**")
+    show_text_search_st(key='text_search_9')
 
     if all_controls_added:  # Only show 'Proceed' button if all specific controls were added or existed
         st.success(
@@ -0,0 +1,157 @@
+"""Load test of the register HTTP API (register_api.py): throughput and p50/p99 latency.
+
+Starts the API on an in-memory register, loads it through /risks/bulk, then
+runs each workload from concurrent clients: reads by ID, single risk writes,
+top-K queries, writes of 50 risks as 50 requests, as one /risks/bulk and as
+one /batch, and ID reads with a new connection per request instead of a
+kept-alive one.
+
+Usage: python benchmarks/bench_register_api.py [--sizes 100000] [--clients 8] [--requests 2000]
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_register_memory import synthetic_risks  # noqa: E402
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _request(connection, method, path, body=None):
+    connection.request(method, path, body=None if body is None else json.dumps(body),
+                       headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    data = response.read()
+    if response.status >= 400:
+        raise RuntimeError(f"{method} {path}: {response.status} {data[:200]}")
+    return json.loads(data)
+
+
+def _connect(port, timeout=10.0):
+    # The server prints its banner before it binds the port
+    deadline = time.perf_counter() + timeout
+    while True:
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        try:
+            connection.connect()
+            return connection
+        except ConnectionRefusedError:
+            if time.perf_counter() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def _load(port, n):
+    connection = _connect(port)
+    _request(connection, "POST", "/models/bulk",
+             [{"model_name": f"Model {i}", "owner": f"Unit {i % 12}", "status": "In Production"}
+              for i in range(1, 501)])
+    columns = synthetic_risks(n)
+    for start in range(0, n, 20000):
+        rows = slice(start, start + 20000)
+        _request(connection, "POST", "/risks/bulk", [
+            {"model_id": int(m), "risk_type": t, "hazard_description": h,
+             "likelihood_score": None if np.isnan(likelihood) else int(likelihood),
+             "magnitude_score": int(magnitude)}
+            for m, t, h, likelihood, magnitude in zip(
+                columns["model_id"][rows].tolist(
+                ), columns["risk_type"][rows].tolist(),
+                columns["hazard_description"][rows].tolist(
+                ), columns["likelihood_score"][rows],
+                columns["magnitude_score"][rows])])
+    connection.close()
+
+
+def _workloads(n):
+    rng = np.random.default_rng(1)
+
+    def risk(i):
+        return {"model_id": int(rng.integers(1, 501)), "risk_type": "Data Drift",
+                "hazard_description": f"Load test hazard {i}", "likelihood_score": 3, "magnitude_score": 4}
+
+    return [
+        # (name, requests of operation i, risks written per operation, keep-alive)
+        ("GET /risks/ID",
+         lambda i: [("GET", f"/risks/{1 + i * 7919 % n}", None)], 0, True),
+        ("POST /risks", lambda i: [("POST", "/risks", risk(i))], 1, True),
+        ("GET /top-risks?k=10",
+         lambda i: [("GET", "/top-risks?k=10", None)], 0, True),
+        ("50 x POST /risks",
+         lambda i: [("POST", "/risks", risk(i))] * 50, 50, True),
+        ("POST /risks/bulk (50)",
+         lambda i: [("POST", "/risks/bulk", [risk(i)] * 50)], 50, True),
+        ("POST /batch (50)", lambda i: [("POST", "/batch", [{"method": "POST", "path": "/risks",
+                                                             "body": risk(i)}] * 50)], 50, True),
+        ("GET /risks/ID, no keep-alive",
+         lambda i: [("GET", f"/risks/{1 + i * 7919 % n}", None)], 0, False),
+    ]
+
+
+def run(port, make, total, clients, keep_alive):
+    """Latencies (s) of `total` operations spread over `clients` threads, and the elapsed time."""
+    latencies = [[] for _ in range(clients)]
+
+    def client(c):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        for i in range(c, total, clients):
+            start = time.perf_counter()
+            for method, path, body in make(i):
+                if not keep_alive:
+                    connection.close()
+                    connection = http.client.HTTPConnection("127.0.0.1", port)
+                _request(connection, method, path, body)
+            latencies[c].append(time.perf_counter() - start)
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(c,))
+               for c in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.concatenate([np.array(times) for times in latencies]), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100000")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="operations per workload (an operation may be several requests)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'risks':>8} {'workload':<30} {'ops/s':>8} {'risks/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, "register_api.py"), "--port", str(args.port)],
+                                  stdout=subprocess.PIPE, text=True)
+        try:
+            server.stdout.readline()
+            _load(args.port, n)
+            for name, make, written, keep_alive in _workloads(n):
+                # Operations writing 50 risks run a tenth as often
+                total = args.requests if written <= 1 else args.requests // 10
+                latencies, elapsed = run(args.port, make, max(
+                    total, args.clients), args.clients, keep_alive)
+                p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+                ops = len(latencies) / elapsed
+                print(
+                    f"{n:>8} {name:<30} {ops:>8.0f} {ops * written:>9.0f} {p50:>9.2f} {p99:>9.2f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
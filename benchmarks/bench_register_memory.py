@@ -0,0 +1,89 @@
+"""Bytes per risk of the register before and after the compact schema (register_schema).
+
+Before: int64 IDs, and a separate string object in every row of risk_type, as
+rows parsed from a file or form arrive. After: the risks table of the store,
+with int32 IDs and interned risk types, and its to_frame() with categorical
+and nullable small-integer columns. Buffers count the column arrays plus every
+distinct object they reference; frames count memory_usage(deep=True).
+
+Usage: python benchmarks/bench_register_memory.py [--sizes 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from register_store import RegisterStore  # noqa: E402
+from risk_taxonomy import AI_RISK_TAXONOMY  # noqa: E402
+
+
+RISK_TYPES = [t for types in AI_RISK_TAXONOMY.values() for t in types]
+
+
+def synthetic_risks(n, seed=0):
+    rng = np.random.default_rng(seed)
+    likelihood = rng.integers(1, 6, n).astype(np.float64)
+    magnitude = rng.integers(1, 6, n).astype(np.float64)
+    likelihood[rng.random(n) < 0.1] = np.nan
+    return {
+        "risk_id": np.arange(1, n + 1, dtype=np.int64),
+        "model_id": rng.integers(1, 501, n, dtype=np.int64),
+        # A fresh string object per row, like values parsed one row at a time
+        "risk_type": np.array([RISK_TYPES[i].encode().decode() for i in rng.integers(0, len(RISK_TYPES), n)],
+                              dtype=object),
+        "hazard_description": np.array([f"Synthetic hazard {i}" for i in range(n)], dtype=object),
+        "likelihood_score": likelihood,
+        "magnitude_score": magnitude,
+        "composite_risk_score": likelihood * magnitude,
+    }
+
+
+def buffer_bytes(columns):
+    total = 0
+    seen = set()
+    for values in columns.values():
+        total += values.nbytes
+        if values.dtype == object:
+            for value in values.tolist():
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    total += sys.getsizeof(value)
+    return total
+
+
+def frame_bytes(frame):
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def bench(n):
+    columns = synthetic_risks(n)
+    before = buffer_bytes(columns), frame_bytes(pd.DataFrame(columns))
+    risks = RegisterStore().risks
+    start = time.perf_counter()
+    risks.extend(columns)
+    written = time.perf_counter() - start
+    after = (buffer_bytes({c: risks.column(c) for c in risks.columns}),
+             frame_bytes(risks.to_frame()))
+    return before, after, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000000")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'buffers before':>15} {'buffers after':>14} {'frame before':>13} "
+          f"{'frame after':>12} {'validated write (s)':>20}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        before, after, written = bench(n)
+        print(f"{n:>10} {before[0] / n:>13.1f} B {after[0] / n:>12.1f} B {before[1] / n:>11.1f} B "
+              f"{after[1] / n:>10.1f} B {written:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Time to open a register from an Arrow snapshot, a Parquet snapshot and SQLite.
+
+Each size builds a register of 500 models and that many risks, saves it in
+every format, then times loading it into a fresh RegisterStore.
+
+Usage: python benchmarks/bench_register_snapshot.py [--sizes 100000,1000000] [--no-sqlite]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_register_memory import synthetic_risks  # noqa: E402
+from register_backend import SQLiteBackend  # noqa: E402
+from register_snapshot import restore_snapshot, save_snapshot  # noqa: E402
+from register_store import RegisterStore  # noqa: E402
+
+
+def _register(n):
+    register = RegisterStore()
+    register.models.extend({
+        "model_id": np.arange(1, 501),
+        "model_name": np.array([f"Model {i}" for i in range(1, 501)], dtype=object),
+        "owner": np.array([f"Unit {i % 12}" for i in range(500)], dtype=object),
+        "status": np.array(["In Production"] * 500, dtype=object),
+    })
+    register.risks.extend(synthetic_risks(n))
+    return register
+
+
+def _size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def _timed(load):
+    start = time.perf_counter()
+    register = load()
+    return time.perf_counter() - start, register
+
+
+def bench(n, directory, sqlite):
+    register = _register(n)
+    results = []
+    for format in ("arrow", "parquet"):
+        path = os.path.join(directory, f"snapshot_{format}_{n}")
+        start = time.perf_counter()
+        save_snapshot(register, path, format=format)
+        saved = time.perf_counter() - start
+        loaded, restored = _timed(lambda: _restored(path))
+        assert len(restored.risks) == n
+        results.append((format, saved, loaded, _size(path)))
+    if sqlite:
+        path = os.path.join(directory, f"register_{n}.db")
+        start = time.perf_counter()
+        backend = SQLiteBackend(path)
+        copy = RegisterStore(backend)
+        with copy.transaction():
+            for store in register.tables():
+                copy.table(store.name).extend(
+                    {c: store.column(c) for c in store.columns})
+        backend.close()
+        saved = time.perf_counter() - start
+        loaded, _ = _timed(lambda: RegisterStore(SQLiteBackend(path)))
+        results.append(("sqlite", saved, loaded, _size(path)))
+    return results
+
+
+def _restored(path):
+    register = RegisterStore()
+    restore_snapshot(register, path)
+    return register
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--no-sqlite", action="store_true",
+                        help="skip the SQLite comparison (its save is slow at 1M rows)")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="register_snapshot_")
+    try:
+        print(
+            f"{'risks':>10} {'format':>8} {'save (s)':>9} {'open (s)':>9} {'size (MB)':>10}")
+        for n in (int(s) for s in args.sizes.split(",")):
+            for format, saved, loaded, size in bench(n, directory, not args.no_sqlite):
+                print(
+                    f"{n:>10} {format:>8} {saved:>9.2f} {loaded:>9.2f} {size / 1e6:>10.1f}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compare per-row pd.concat inserts against the columnar register store.
+
+Usage: python benchmarks/bench_register_store.py [--sizes 10000,100000] [--concat-limit 100000]
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from register_store import RISK_COLUMNS, RegisterStore  # noqa: E402
+
+
+def _risk_row(i):
+    return {
+        "risk_id": i + 1,
+        "model_id": i % 50 + 1,
+        "risk_type": "Data Quality",
+        "hazard_description": f"Synthetic hazard {i}",
+        "likelihood_score": i % 5 + 1,
+        "magnitude_score": (i // 5) % 5 + 1,
+        "composite_risk_score": None,
+    }
+
+
+def bench_concat(n):
+    # The pre-store path used by add_ai_risk_st
+    df = pd.DataFrame(columns=RISK_COLUMNS)
+    # Concatenating onto the initially empty frame raises a FutureWarning per row
+    warnings.simplefilter("ignore", FutureWarning)
+    start = time.perf_counter()
+    for i in range(n):
+        df = pd.concat([df, pd.DataFrame([_risk_row(i)])], ignore_index=True)
+    return time.perf_counter() - start, len(df)
+
+
+def bench_store(n):
+    risks = RegisterStore().risks
+    start = time.perf_counter()
+    for i in range(n):
+        risks.append(_risk_row(i))
+    appended = time.perf_counter() - start
+    df = risks.to_frame()
+    return appended, time.perf_counter() - start, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--concat-limit", type=int, default=100000,
+                        help="skip the concat path above this many rows (it is quadratic)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'concat (s)':>12} {'store append (s)':>18} {'store + frame (s)':>18} {'speedup':>9}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        appended, total, rows = bench_store(n)
+        assert rows == n
+        if n <= args.concat_limit:
+            concat, rows = bench_concat(n)
+            assert rows == n
+            print(
+                f"{n:>10} {concat:>12.3f} {appended:>18.3f} {total:>18.3f} {concat / total:>8.0f}x")
+        else:
+            print(
+                f"{n:>10} {'skipped':>12} {appended:>18.3f} {total:>18.3f} {'-':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Time and peak memory of the utils.py register operations on synthetic registers.
+
+Each size builds a register of 500 models, that many risks and a control for
+every tenth risk, then runs every operation against it with st.session_state
+replaced by a plain attribute dict and Streamlit's messages silenced, so no
+app is needed. Time is the median of --repeat calls after one warm-up call;
+peak memory is the tracemalloc peak of one further call, measured apart from
+the timings because tracing slows the call down.
+
+Usage: python benchmarks/bench_utils.py [--sizes 1000,100000,1000000] [--repeat 5] [--only top_risks,plot]
+                                       [--json results.json] [--baseline results.json]
+
+With --baseline (the --json file of an earlier run on the same machine), exits
+with status 1 when an operation got slower than --time-tolerance or peaked
+higher than --memory-tolerance allows, so CI can catch regressions.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import utils  # noqa: E402
+from bench_register_memory import synthetic_risks  # noqa: E402
+from register_schema import RISK_RESPONSES  # noqa: E402
+from risk_register import build_register_store  # noqa: E402
+from risk_taxonomy import AI_RISK_TAXONOMY  # noqa: E402
+
+MODELS = 500
+# Differences below these are noise, whatever the tolerance
+MIN_TIME_CHANGE = 0.001
+MIN_MEMORY_CHANGE = 256 * 1024
+
+
+class SessionState(dict):
+    """Stand-in for st.session_state: a dict with attribute access."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __delattr__(self, name):
+        del self[name]
+
+
+def _quiet(*args, **kwargs):
+    return None
+
+
+def headless_streamlit(state):
+    """Patch utils' streamlit module: state as session_state and no-op messages and images."""
+    patches = [mock.patch.object(utils.st, "session_state", state)]
+    patches += [mock.patch.object(utils.st, name, _quiet)
+                for name in ("info", "success", "warning", "error", "image", "caption")]
+    return patches
+
+
+def synthetic_register(n, seed=0):
+    rng = np.random.default_rng(seed)
+    register = build_register_store()
+    controls = max(1, n // 10)
+    with register.transaction():
+        register.models.extend({
+            "model_id": np.arange(1, MODELS + 1),
+            "model_name": np.array([f"Model {i}" for i in range(1, MODELS + 1)], dtype=object),
+            "use_case": np.array(["Benchmark"] * MODELS, dtype=object),
+            "owner": np.array([f"Unit {i % 12}" for i in range(MODELS)], dtype=object),
+            "status": np.array(["In Production"] * MODELS, dtype=object),
+        })
+        register.risks.extend(synthetic_risks(n, seed))
+        register.controls.extend({
+            "control_id": np.arange(1, controls + 1),
+            "risk_id": rng.integers(1, n + 1, controls),
+            "control_description": np.array([f"Synthetic control {i}" for i in range(controls)], dtype=object),
+            "effectiveness_score": rng.integers(1, 6, controls).astype(np.float64),
+            "risk_response": np.array(RISK_RESPONSES, dtype=object)[rng.integers(0, len(RISK_RESPONSES), controls)],
+        })
+    return register
+
+
+def operations(register):
+    """(name, call(i)) of every benchmarked operation; i counts calls so each writes fresh values."""
+    rng = np.random.default_rng(1)
+    n = len(register.risks)
+    batch = min(n, 1000)
+    batch_ids = rng.choice(np.arange(1, n + 1), batch, replace=False).tolist()
+    # Monitoring updates and drift alerts address registered (model_id, risk_type) pairs
+    positions = register.risks.positions(batch_ids)
+    batch_models = register.risks.take('model_id', positions).tolist()
+    batch_types = register.risks.take('risk_type', positions).tolist()
+    alerts = [json.dumps({"model_id": m, "risk_type": t, "likelihood": int(s), "magnitude": 3,
+                          "timestamp": 1700000000 + k})
+              for k, (m, t, s) in enumerate(zip(batch_models, batch_types, rng.integers(1, 6, batch)))]
+
+    def score(i):
+        return i % 5 + 1
+
+    def plot_uncached(i):
+        utils._chart_cache.clear()
+        utils.plot_risk_distribution_by_type_st()
+
+    return [
+        ("add_ai_model_st", lambda i: utils.add_ai_model_st(
+            f"Benchmark model {i}", "Benchmark", "Synthetic", "Unit 0", "In Development")),
+        ("add_ai_risk_st", lambda i: utils.add_ai_risk_st(
+            i % MODELS + 1, "Data Drift", f"Benchmark hazard {i}", score(i), 3)),
+        ("assign_risk_scores_st", lambda i: utils.assign_risk_scores_st(
+            i * 7919 % n + 1, score(i), 4)),
+        ("calculate_composite_risk_score_st", lambda i: utils.calculate_composite_risk_score_st(
+            i * 7919 % n + 1)),
+        (f"assign_risk_scores_many ({batch})", lambda i: utils.assign_risk_scores_many(
+            batch_ids, [score(i)] * batch, [3] * batch)),
+        ("calculate_composite_scores_all",
+         lambda i: utils.calculate_composite_scores_all()),
+        ("get_full_risk_register_st + _df", lambda i: (utils.get_full_risk_register_st(),
+                                                       utils.get_full_risk_register_df())),
+        # The comprehensive register frame is cached until the next write
+        ("get_full_risk_register_df after a write", lambda i: (utils.assign_risk_scores_st(i * 7919 % n + 1, score(i), 4),
+                                                               utils.get_full_risk_register_df())),
+        ("identify_top_risks_st (10)", lambda i: utils.identify_top_risks_st(10)),
+        ("identify_top_risks_st (10, by category)", lambda i: utils.identify_top_risks_st(
+            10, by='category', value='Data Risk')),
+        ("plot_risk_distribution_by_type_st",
+         lambda i: utils.plot_risk_distribution_by_type_st()),
+        ("plot_risk_distribution_by_type_st (render)", plot_uncached),
+        ("simulate_data_drift_alert_st", lambda i: utils.simulate_data_drift_alert_st(
+            batch_models[i % batch], batch_types[i % batch], "Drift detected by benchmark", score(i), 4)),
+        ("update_risk_assessment_from_monitoring_st", lambda i: utils.update_risk_assessment_from_monitoring_st(
+            batch_models[i % batch], batch_types[i % batch], score(i), 2)),
+        (f"update_risk_assessments_from_monitoring_many ({batch})",
+         lambda i: utils.update_risk_assessments_from_monitoring_many(
+             batch_models, batch_types, [score(i)] * batch)),
+        (f"ingest_drift_alerts_st ({batch})",
+         lambda i: utils.ingest_drift_alerts_st(alerts)),
+    ]
+
+
+def measure(call, repeat, counter):
+    """(median seconds, tracemalloc peak bytes) of call."""
+    call(next(counter))
+    samples = []
+    for _ in range(repeat):
+        i = next(counter)
+        start = time.perf_counter()
+        call(i)
+        samples.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        call(next(counter))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return statistics.median(samples), peak
+
+
+def bench(n, repeat, only=None):
+    state = SessionState()
+    start = time.perf_counter()
+    state.risk_register = synthetic_register(n)
+    state.AI_RISK_TAXONOMY = {category: list(
+        types) for category, types in AI_RISK_TAXONOMY.items()}
+    built = time.perf_counter() - start
+    patches = headless_streamlit(state)
+    results = {}
+    counter = iter(range(10 ** 9))
+    for patch in patches:
+        patch.start()
+    try:
+        for name, call in operations(state.risk_register):
+            if only and not any(word in name for word in only):
+                continue
+            seconds, peak = measure(call, repeat, counter)
+            results[name] = {"seconds": seconds, "peak_bytes": peak}
+    finally:
+        for patch in patches:
+            patch.stop()
+    return built, results
+
+
+def regressions(results, baseline, time_tolerance, memory_tolerance):
+    failures = []
+    for size, operations_ in results.items():
+        for name, now in operations_.items():
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            if (now["seconds"] > before["seconds"] * (1 + time_tolerance)
+                    and now["seconds"] - before["seconds"] > MIN_TIME_CHANGE):
+                failures.append(f"{name} at {size} risks took {now['seconds'] * 1000:.2f} ms "
+                                f"(baseline {before['seconds'] * 1000:.2f} ms)")
+            if (now["peak_bytes"] > before["peak_bytes"] * (1 + memory_tolerance)
+                    and now["peak_bytes"] - before["peak_bytes"] > MIN_MEMORY_CHANGE):
+                failures.append(f"{name} at {size} risks peaked at {now['peak_bytes'] / 1e6:.1f} MB "
+                                f"(baseline {before['peak_bytes'] / 1e6:.1f} MB)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--only", help="comma-separated parts of operation names to run")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument(
+        "--baseline", help="results of an earlier run to compare against")
+    parser.add_argument("--time-tolerance", type=float, default=0.5,
+                        help="fail when an operation is this much slower than the baseline (0.5 = 50%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25,
+                        help="fail when an operation's peak memory grows this much over the baseline")
+    args = parser.parse_args()
+    # Deprecation notices from the plotting libraries would drown the table
+    warnings.simplefilter("ignore", FutureWarning)
+    only = args.only.split(",") if args.only else None
+
+    results = {}
+    print(f"{'risks':>9} {'operation':<55} {'median (ms)':>12} {'peak (MB)':>10}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        built, results[str(n)] = bench(n, args.repeat, only)
+        print(f"{n:>9} {'(build register)':<55} {built * 1000:>12.1f} {'':>10}")
+        for name, result in results[str(n)].items():
+            print(
+                f"{n:>9} {name:<55} {result['seconds'] * 1000:>12.2f} {result['peak_bytes'] / 1e6:>10.2f}")
+
+    report = {"python": sys.version.split(
+    )[0], "repeat": args.repeat, "results": results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    failures = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        failures = regressions(
+            results, baseline, args.time_tolerance, args.memory_tolerance)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,121 @@
+"""Cold-start import cost of the app modules and per-rerun latency of each page.
+
+Each module is imported in a fresh interpreter with `python -X importtime`, so
+the numbers are cold-start costs. With --reruns every page is also rendered
+through streamlit's AppTest and its steady-state rerun time is measured.
+
+Usage: python benchmarks/startup_report.py [--reruns 5] [--budget-ms 700] [--json report.json]
+
+Exits with status 1 when `import utils` exceeds --budget-ms or pulls in a
+module listed in --deferred, so CI can track both.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Modules that should only be imported once a chart is actually drawn
+DEFERRED = ["matplotlib", "seaborn"]
+
+
+def import_profile(module):
+    """{imported module: (self us, cumulative us, depth)} for a cold `import module`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        profile[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return profile
+
+
+def top_level_imports(profile, module, count):
+    # Direct children of the imported module, heaviest first
+    children = [(cumulative, name) for name, (_, cumulative, depth) in profile.items()
+                if depth == 1 and name != module]
+    return sorted(children, reverse=True)[:count]
+
+
+def rerun_latency(labels, reruns):
+    """Median seconds of a rerun of each page after navigating to it."""
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    at.run()
+    timings = {}
+    for label in labels:
+        at.sidebar.selectbox(key="navigation_selectbox").set_value(label).run()
+        samples = []
+        for _ in range(reruns):
+            start = time.perf_counter()
+            at.run()
+            samples.append(time.perf_counter() - start)
+        timings[label] = statistics.median(samples)
+        if at.exception:
+            raise RuntimeError(f"{label}: {at.exception[0].message}")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=8,
+                        help="heaviest imports to list for utils")
+    parser.add_argument("--reruns", type=int, default=0,
+                        help="reruns per page for rerun latency (0 to skip)")
+    parser.add_argument("--budget-ms", type=float,
+                        help="fail if `import utils` takes longer")
+    parser.add_argument("--deferred", default=",".join(DEFERRED),
+                        help="comma-separated modules `import utils` must not load")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "imports_ms": {}}
+    failures = []
+
+    profile = import_profile("utils")
+    utils_ms = profile["utils"][1] / 1000
+    report["imports_ms"]["utils"] = utils_ms
+    print(f"{'import utils':<60} {utils_ms:>9.1f} ms")
+    for cumulative, name in top_level_imports(profile, "utils", args.top):
+        print(f"  {name:<58} {cumulative / 1000:>9.1f} ms")
+    loaded = [m for m in args.deferred.split(",") if m and m in profile]
+    if loaded:
+        failures.append(
+            f"import utils loads deferred modules: {', '.join(loaded)}")
+    if args.budget_ms is not None and utils_ms > args.budget_ms:
+        failures.append(
+            f"import utils took {utils_ms:.1f} ms (budget {args.budget_ms:.1f} ms)")
+
+    from page_registry import PAGES
+    for module in (f"application_pages.{page}" for page in PAGES.values()):
+        ms = import_profile(module)[module][1] / 1000
+        report["imports_ms"][module] = ms
+        print(f"{'import ' + module:<60} {ms:>9.1f} ms")
+
+    if args.reruns:
+        timings = rerun_latency(list(PAGES), args.reruns)
+        report["rerun_ms"] = {label: seconds *
+                              1000 for label, seconds in timings.items()}
+        print("\nRerun latency (median of %d):" % args.reruns)
+        for label, seconds in timings.items():
+            print(f"  {label:<58} {seconds * 1000:>9.1f} ms")
+
+    report["failures"] = failures
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
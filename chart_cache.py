@@ -0,0 +1,45 @@
+import collections
+import hashlib
+import json
+import threading
+
+
+class FigureCache:
+    """Process-wide LRU cache of rendered chart images keyed by a hash of their inputs."""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._images = collections.OrderedDict()
+        # Streamlit sessions render on separate threads
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(*parts):
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get_or_render(self, key, render):
+        """Cached image bytes for key, calling render() to produce them on a miss."""
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return self._images[key]
+        # Render outside the lock so one slow figure does not block other sessions
+        image = render()
+        with self._lock:
+            self.misses += 1
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.maxsize:
+                self._images.popitem(last=False)
+        return image
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+
+    def __len__(self):
+        return len(self._images)
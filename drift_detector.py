@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+
+# Severity thresholds per metric; a value above the i-th threshold adds one
+# likelihood point to the base score of 1, so each metric maps onto 1-5
+LIKELIHOOD_THRESHOLDS = {
+    # PSI < 0.1 is conventionally stable and > 0.25 a significant shift
+    'psi': (0.1, 0.25, 0.5, 1.0),
+    'ks': (0.05, 0.1, 0.2, 0.3),
+    'js': (0.01, 0.05, 0.1, 0.2),
+}
+_EPSILON = 1e-6
+
+
+def _as_matrix(chunk, features):
+    if isinstance(chunk, pd.DataFrame):
+        chunk = chunk[features].to_numpy(dtype=np.float64, na_value=np.nan)
+    chunk = np.asarray(chunk, dtype=np.float64)
+    return chunk.reshape(-1, 1) if chunk.ndim == 1 else chunk
+
+
+def drift_metrics(reference_counts, current_counts):
+    """PSI, KS and Jensen-Shannon divergence per row of two (features, bins) count matrices.
+
+    A feature with no values in either sample has no measurable drift; its
+    metrics are NaN rather than the maximal drift an empty histogram implies.
+    """
+    p = reference_counts / \
+        np.maximum(reference_counts.sum(axis=1, keepdims=True), 1)
+    q = current_counts / \
+        np.maximum(current_counts.sum(axis=1, keepdims=True), 1)
+    # Smooth empty bins so the log ratios stay finite
+    ps = (p + _EPSILON) / (1 + _EPSILON * p.shape[1])
+    qs = (q + _EPSILON) / (1 + _EPSILON * q.shape[1])
+    psi = np.sum((qs - ps) * np.log(qs / ps), axis=1)
+    ks = np.max(np.abs(np.cumsum(p, axis=1) - np.cumsum(q, axis=1)), axis=1)
+    m = (ps + qs) / 2
+    js = 0.5 * np.sum(ps * np.log2(ps / m), axis=1) + \
+        0.5 * np.sum(qs * np.log2(qs / m), axis=1)
+    empty = (reference_counts.sum(axis=1) == 0) | (
+        current_counts.sum(axis=1) == 0)
+    for metric in (psi, ks, js):
+        metric[empty] = np.nan
+    return psi, ks, js
+
+
+def likelihood_from_drift(psi, ks, js):
+    """Likelihood score (1-5) per feature: the most severe reading of the three metrics.
+
+    NaN for features whose drift could not be measured.
+    """
+    levels = [np.searchsorted(LIKELIHOOD_THRESHOLDS[name], values, side='right')
+              for name, values in (('psi', psi), ('ks', ks), ('js', js))]
+    return np.where(np.isnan(psi), np.nan, 1 + np.max(levels, axis=0))
+
+
+class DriftDetector:
+    """Binned feature histograms of a reference and a current sample, built chunk by chunk.
+
+    Every feature gets `bins` bins whose inner edges are the quantiles of the
+    first reference chunk, with open outer bins, so later chunks only add
+    counts and memory stays at two (features, bins) matrices however many
+    rows stream through. All features of a chunk are binned in one pass.
+    """
+
+    def __init__(self, features, bins=10):
+        self.features = list(features)
+        self.bins = bins
+        self.edges = None
+        shape = (len(self.features), bins)
+        self.reference_counts = np.zeros(shape, dtype=np.int64)
+        self.current_counts = np.zeros(shape, dtype=np.int64)
+        self.missing = {'reference': np.zeros(len(self.features), dtype=np.int64),
+                        'current': np.zeros(len(self.features), dtype=np.int64)}
+
+    def _fit_edges(self, values):
+        quantiles = np.linspace(0, 1, self.bins + 1)[1:-1]
+        with np.errstate(all='ignore'):
+            edges = np.nanquantile(values, quantiles, axis=0).T
+        # Features with no values in the chunk get a single populated bin
+        edges = np.nan_to_num(edges, nan=0.0)
+        self.edges = np.maximum.accumulate(edges, axis=1)
+
+    def _count(self, values):
+        valid = ~np.isnan(values)
+        # Bin index = number of inner edges at or below the value, per feature
+        index = (values[:, :, None] >= self.edges[None, :, :]).sum(axis=2)
+        flat = index + np.arange(len(self.features)) * self.bins
+        counts = np.bincount(flat[valid], minlength=len(
+            self.features) * self.bins)
+        return counts.reshape(len(self.features), self.bins), (~valid).sum(axis=0)
+
+    def update(self, chunk, sample='current'):
+        """Add a chunk (DataFrame with the feature columns, or 2-D array) to one sample."""
+        values = _as_matrix(chunk, self.features)
+        if self.edges is None:
+            if sample != 'reference':
+                raise ValueError(
+                    "The reference sample must be added before the current sample.")
+            self._fit_edges(values)
+        counts, missing = self._count(values)
+        if sample == 'reference':
+            self.reference_counts += counts
+        else:
+            self.current_counts += counts
+        self.missing[sample] += missing
+
+    def update_many(self, chunks, sample='current'):
+        for chunk in chunks:
+            self.update(chunk, sample)
+        return self
+
+    def report(self):
+        """Drift metrics and the implied likelihood score per feature."""
+        psi, ks, js = drift_metrics(self.reference_counts, self.current_counts)
+        return pd.DataFrame({
+            'feature': self.features, 'psi': psi, 'ks': ks, 'js': js,
+            'likelihood_score': pd.array(likelihood_from_drift(psi, ks, js), dtype="Int8"),
+            'reference_rows': self.reference_counts.sum(axis=1),
+            'current_rows': self.current_counts.sum(axis=1),
+        })
+
+    def unmeasured(self):
+        """Features without values in the reference or the current sample."""
+        empty = (self.reference_counts.sum(axis=1) == 0) | (
+            self.current_counts.sum(axis=1) == 0)
+        return [f for f, e in zip(self.features, empty.tolist()) if e]
+
+    def likelihood(self):
+        """Likelihood score of the whole sample: that of its most drifted feature.
+
+        None if no feature could be measured.
+        """
+        scores = self.report()['likelihood_score']
+        return None if scores.isna().all() else int(scores.max())
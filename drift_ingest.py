@@ -0,0 +1,335 @@
+"""Streaming ingestion of drift alerts from the model monitoring system.
+
+Alerts are JSON objects, one per line, read from a JSONL file (optionally
+followed like `tail -f`) or from a local TCP socket standing in for the
+monitoring bus:
+
+    {"model_id": 1, "risk_type": "Data Drift", "likelihood": 4, "magnitude": 4,
+     "timestamp": "2025-01-31T09:30:00", "hazard_description": "..."}
+
+Repeated alerts for the same (model_id, risk_type) within a time window are
+coalesced into one score update, and updates are applied to the register in
+batches. Usage as a command line tool:
+
+    python drift_ingest.py --db risk_register.db --jsonl alerts.jsonl [--follow]
+    python drift_ingest.py --db risk_register.db --port 8765
+"""
+import argparse
+import collections
+import datetime
+import json
+import queue
+import socket
+import threading
+import time
+
+import numpy as np
+
+from register_schema import SCORE_RANGE
+from register_store import RegisterStore
+from risk_taxonomy import AI_RISK_TAXONOMY, TaxonomyIndex, compile_taxonomy
+
+
+DEFAULT_HAZARD = "Drift detected by operational model monitoring."
+_END = object()
+
+
+def jsonl_lines(path, follow=False, poll_interval=0.2, stop=None):
+    """Yield the lines of a JSONL file; with follow, keep waiting for appended lines."""
+    with open(path, encoding="utf-8") as f:
+        partial = ""
+        while stop is None or not stop.is_set():
+            line = f.readline()
+            if line:
+                if not line.endswith("\n") and follow:
+                    # The writer is mid-line; wait for the rest of it
+                    partial += line
+                    continue
+                yield partial + line
+                partial = ""
+            elif follow:
+                time.sleep(poll_interval)
+            else:
+                if partial:
+                    yield partial
+                return
+
+
+def socket_lines(host="127.0.0.1", port=8765, stop=None, timeout=0.5):
+    """Yield newline-delimited alerts sent by clients of a local TCP socket."""
+    with socket.create_server((host, port)) as server:
+        server.settimeout(timeout)
+        while stop is None or not stop.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            with conn, conn.makefile("r", encoding="utf-8") as stream:
+                yield from stream
+
+
+def apply_score_updates(register, model_ids, risk_types, likelihoods, magnitudes, hazard_descriptions=None):
+    """Set likelihood, magnitude and composite score of many (model_id, risk_type) risks at once.
+
+    The first risk of each pair is updated, as in simulate_data_drift_alert_st.
+    With magnitudes None the risks keep their magnitude. Pairs without a risk
+    get a new one when hazard_descriptions is given and are skipped otherwise.
+    Returns the number of risks updated and created.
+    """
+    risks = register.risks
+    likelihoods = np.asarray(likelihoods, dtype=np.float64)
+    # Lookups and writes share one write lock, so concurrent sessions see either none or all of it
+    with register.transaction():
+        positions = np.array([(risks.lookup("model_risk_type", key) or [-1])[0]
+                              for key in zip(model_ids, risk_types)], dtype=np.int64)
+        found = positions >= 0
+        if magnitudes is None:
+            magnitudes = np.full(len(positions), np.nan)
+            magnitudes[found] = risks.column(
+                'magnitude_score')[positions[found]]
+        magnitudes = np.asarray(magnitudes, dtype=np.float64)
+        missing = np.flatnonzero(~found)
+        created = len(missing) if hazard_descriptions is not None else 0
+        if created:
+            # The in-memory tables cannot be rolled back, so the new risks are
+            # checked before the existing ones are updated
+            start = register.next_id("risks")
+            new_risks = risks.validate_rows({
+                'risk_id': np.arange(start, start + created, dtype=np.int64),
+                'model_id': np.asarray(model_ids, dtype=np.int64)[missing],
+                'risk_type': np.asarray(risk_types, dtype=object)[missing],
+                'hazard_description': np.asarray(hazard_descriptions, dtype=object)[missing],
+                'likelihood_score': likelihoods[missing],
+                'magnitude_score': magnitudes[missing],
+                'composite_risk_score': likelihoods[missing] * magnitudes[missing]})
+        risks.set_many(positions[found], {
+            'likelihood_score': likelihoods[found],
+            'magnitude_score': magnitudes[found],
+            'composite_risk_score': likelihoods[found] * magnitudes[found]})
+        if created:
+            risks.extend(new_risks)
+    return int(found.sum()), created
+
+
+def _timestamp(value):
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.datetime.fromisoformat(str(value)).timestamp()
+
+
+class IngestStats:
+    """Throughput and outcome counters of one ingestion run."""
+
+    def __init__(self):
+        self.events = 0
+        self.rejected = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.risks_updated = 0
+        self.risks_created = 0
+        # Times the reader found the queue full and had to wait for the applier
+        self.backpressure_waits = 0
+        self.max_queue_depth = 0
+        self.seconds = 0.0
+        self.rejections = collections.Counter()
+
+    @property
+    def events_per_second(self):
+        return self.events / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        return (f"{self.events} alerts in {self.seconds:.2f}s ({self.events_per_second:,.0f}/s): "
+                f"{self.coalesced} coalesced, {self.rejected} rejected, {self.batches} batch(es) updated "
+                f"{self.risks_updated} and created {self.risks_created} risk(s)")
+
+
+class DriftIngestor:
+    """Coalesces drift alerts per (model_id, risk_type) and applies them in batches.
+
+    A reader thread feeds lines into a bounded queue; when the register falls
+    behind, the queue fills up and the reader blocks, which in turn stops it
+    from reading the file or socket. Within a window of window_seconds (event
+    time) the alerts for one pair are folded into one update carrying the
+    highest likelihood and magnitude seen. A pair's update is applied once its
+    window has closed, when max_batch updates are pending, when the stream
+    goes idle for idle_seconds, or at the end of the stream.
+    """
+
+    def __init__(self, register, taxonomy=None, window_seconds=60.0, max_batch=5000,
+                 max_pending=50000, idle_seconds=1.0, create_missing=True):
+        self.register = register
+        if taxonomy is None:
+            taxonomy = AI_RISK_TAXONOMY
+        self.taxonomy = taxonomy if isinstance(
+            taxonomy, TaxonomyIndex) else compile_taxonomy(taxonomy)
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.idle_seconds = idle_seconds
+        self.create_missing = create_missing
+        self.stats = IngestStats()
+        # (model_id, risk_type) -> [window start, likelihood, magnitude, hazard]
+        self._pending = collections.OrderedDict()
+        self._watermark = float("-inf")
+
+    def _reject(self, reason):
+        self.stats.rejected += 1
+        self.stats.rejections[reason] += 1
+
+    def _add(self, line):
+        self.stats.events += 1
+        try:
+            alert = json.loads(line)
+            key = (int(alert["model_id"]), str(alert["risk_type"]))
+            likelihood = float(alert["likelihood"])
+            magnitude = float(alert["magnitude"])
+            event_time = _timestamp(alert.get("timestamp"))
+        except (ValueError, TypeError, KeyError):
+            self._reject("malformed alert")
+            return
+        low, high = SCORE_RANGE
+        if not (low <= likelihood <= high and low <= magnitude <= high):
+            self._reject("score out of range")
+            return
+        if likelihood != int(likelihood) or magnitude != int(magnitude):
+            self._reject("score must be a whole number")
+            return
+        if self.register.models.position(key[0]) is None:
+            self._reject("unknown model")
+            return
+        if self.taxonomy.category_of(key[1]) is None:
+            self._reject("risk_type is not in the AI risk taxonomy")
+            return
+        hazard = alert.get("hazard_description") or DEFAULT_HAZARD
+        if not isinstance(hazard, str):
+            self._reject("malformed alert")
+            return
+        self._watermark = max(self._watermark, event_time)
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = [event_time, likelihood, magnitude, hazard]
+        else:
+            self.stats.coalesced += 1
+            pending[1] = max(pending[1], likelihood)
+            pending[2] = max(pending[2], magnitude)
+
+    def _closed_keys(self):
+        # Pending pairs are in order of their window start
+        cutoff = self._watermark - self.window_seconds
+        keys = []
+        for key, (start, _, _, _) in self._pending.items():
+            if start > cutoff:
+                break
+            keys.append(key)
+        return keys
+
+    def flush(self, keys=None):
+        """Apply the pending updates of the given pairs (all by default) as one batch."""
+        if keys is None:
+            keys = list(self._pending)
+        if not keys:
+            return
+        updates = [self._pending.pop(key) for key in keys]
+        updated, created = apply_score_updates(
+            self.register, [m for m, _ in keys], [t for _, t in keys],
+            [u[1] for u in updates], [u[2] for u in updates],
+            [u[3] for u in updates] if self.create_missing else None)
+        self.stats.batches += 1
+        self.stats.risks_updated += updated
+        self.stats.risks_created += created
+
+    def run(self, lines, stop=None):
+        """Ingest an iterable of alert lines until it ends (or stop is set); returns the stats."""
+        started = time.perf_counter()
+        buffer = queue.Queue(maxsize=self.max_pending)
+
+        def read():
+            for line in lines:
+                if buffer.full():
+                    self.stats.backpressure_waits += 1
+                buffer.put(line)
+                if stop is not None and stop.is_set():
+                    break
+            buffer.put(_END)
+
+        reader = threading.Thread(
+            target=read, name="drift-ingest-reader", daemon=True)
+        reader.start()
+        done = False
+        try:
+            while not done:
+                try:
+                    line = buffer.get(timeout=self.idle_seconds)
+                except queue.Empty:
+                    # Nothing new: close every open window rather than hold updates back
+                    self.flush()
+                    continue
+                self.stats.max_queue_depth = max(
+                    self.stats.max_queue_depth, buffer.qsize() + 1)
+                # Drain what has already arrived, up to one batch
+                batch = [line]
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(buffer.get_nowait())
+                    except queue.Empty:
+                        break
+                for line in batch:
+                    if line is _END:
+                        done = True
+                        break
+                    if line.strip():
+                        self._add(line)
+                if len(self._pending) >= self.max_batch:
+                    self.flush()
+                else:
+                    self.flush(self._closed_keys())
+            self.flush()
+            reader.join()
+        finally:
+            self.stats.seconds = time.perf_counter() - started
+        return self.stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Apply a stream of drift alerts to the AI risk register.")
+    parser.add_argument(
+        "--db", help="SQLite register to update (see QULAB_REGISTER_DB)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--jsonl", help="JSONL file of alerts")
+    source.add_argument("--port", type=int,
+                        help="listen for alerts on this local TCP port")
+    parser.add_argument("--follow", action="store_true",
+                        help="keep reading lines appended to --jsonl")
+    parser.add_argument("--window", type=float, default=60.0,
+                        help="coalescing window in seconds")
+    parser.add_argument("--max-batch", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    backend = None
+    if args.db:
+        from register_backend import SQLiteBackend
+        backend = SQLiteBackend(args.db)
+    register = RegisterStore(backend)
+    ingestor = DriftIngestor(
+        register, window_seconds=args.window, max_batch=args.max_batch)
+    if args.jsonl:
+        lines = jsonl_lines(args.jsonl, follow=args.follow)
+    else:
+        lines = socket_lines(port=args.port)
+    try:
+        ingestor.run(lines)
+    except KeyboardInterrupt:
+        ingestor.flush()
+    print(ingestor.stats.summary())
+    for reason, count in ingestor.stats.rejections.most_common():
+        print(f"  rejected ({reason}): {count}")
+    if backend is not None:
+        backend.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
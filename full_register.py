@@ -0,0 +1,291 @@
+import numpy as np
+import pandas as pd
+
+from register_schema import SCHEMA
+from register_store import ColumnStore
+
+
+FULL_REGISTER_COLUMNS = [
+    'model_name', 'use_case', 'model_description', 'owner', 'status',
+    'risk_type', 'hazard_description', 'likelihood_score', 'magnitude_score', 'composite_risk_score',
+    'residual_risk_score', 'control_description', 'effectiveness_score', 'risk_response'
+]
+
+# Source column -> register column, per base table
+_MODEL_COLUMNS = {'model_name': 'model_name', 'use_case': 'use_case', 'description': 'model_description',
+                  'owner': 'owner', 'status': 'status'}
+_RISK_COLUMNS = {'risk_type': 'risk_type', 'hazard_description': 'hazard_description',
+                 'likelihood_score': 'likelihood_score', 'magnitude_score': 'magnitude_score',
+                 'composite_risk_score': 'composite_risk_score'}
+# Per risk, from ResidualRisk.scores (aligned with the risks table)
+_RESIDUAL_COLUMNS = {'residual_risk_score': 'residual_risk_score'}
+_CONTROL_COLUMNS = {'control_description': 'control_description', 'effectiveness_score': 'effectiveness_score',
+                    'risk_response': 'risk_response'}
+# Schema field of each register column taken from a base table, for its DataFrame dtype
+_FIELDS = {jc: SCHEMA[table][c] for table, mapping in (('models', _MODEL_COLUMNS), ('risks', _RISK_COLUMNS),
+                                                       ('controls', _CONTROL_COLUMNS))
+           for c, jc in mapping.items()}
+
+# Hidden key columns: positions of the joined model, risk and control rows (-1 for none)
+_KEY_COLUMNS = ['model_pos', 'risk_pos', 'control_pos']
+_DTYPES = {'likelihood_score': np.float64, 'magnitude_score': np.float64,
+           'composite_risk_score': np.float64, 'residual_risk_score': np.float64,
+           'effectiveness_score': np.float64,
+           'model_pos': np.int64, 'risk_pos': np.int64, 'control_pos': np.int64}
+
+
+class FullRegisterView:
+    """models LEFT JOIN risks LEFT JOIN controls, patched in place as the base tables change.
+
+    Produces the same rows as the two pd.merge calls it replaces: one row per
+    (model, risk, control), with a single all-empty row for a model without
+    risks or a risk without controls. Risks and controls whose parent is not
+    registered are left out, as the left joins drop them, and are joined in
+    when the parent is registered. With a ResidualRisk, each row also
+    carries its risk's residual score.
+    """
+
+    def __init__(self, register, residual=None):
+        self.register = register
+        self.residual = residual
+        self.rows = ColumnStore(
+            "full_register", FULL_REGISTER_COLUMNS + _KEY_COLUMNS, _DTYPES)
+        self._reset()
+        self.rebuild()
+        register.models.subscribe(self._on_models)
+        register.risks.subscribe(self._on_risks)
+        register.controls.subscribe(self._on_controls)
+        if residual is not None:
+            residual.scores.subscribe(self._on_residual)
+
+    columns = FULL_REGISTER_COLUMNS
+
+    @property
+    def version(self):
+        return self.rows.version
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _reset(self):
+        self.rows.clear()
+        self._model_rows = {}
+        self._risk_rows = {}
+        self._control_rows = {}
+        # Rows that still have no risk (per model) or no control (per risk)
+        self._model_placeholder = {}
+        self._risk_placeholder = {}
+        # Positions of risks (per model ID) and controls (per risk ID) waiting for their parent
+        self._orphan_risks = {}
+        self._orphan_controls = {}
+        self._last_key = (-1, -1, -1)
+        self._sorted = True
+        self._frame = None
+        self._frame_version = -1
+        self._order_positions = None
+        self._order_version = -1
+
+    def rebuild(self):
+        self._reset()
+        for table, handler in ((self.register.models, self._on_models),
+                               (self.register.risks, self._on_risks),
+                               (self.register.controls, self._on_controls)):
+            if len(table):
+                handler(table, "insert", np.arange(len(table)), None)
+
+    def _append(self, columns, keys):
+        start = len(self.rows)
+        model_pos, risk_pos, control_pos = keys
+        columns.update(model_pos=model_pos, risk_pos=risk_pos,
+                       control_pos=control_pos)
+        self.rows.extend(columns)
+        new_rows = list(range(start, start + len(model_pos)))
+        first = (int(model_pos[0]), int(risk_pos[0]), int(control_pos[0]))
+        ordered = np.lexsort((control_pos, risk_pos, model_pos))
+        if first < self._last_key or np.any(ordered != np.arange(len(model_pos))):
+            self._sorted = False
+        last = len(model_pos) - 1
+        self._last_key = max(self._last_key, (int(model_pos[last]), int(
+            risk_pos[last]), int(control_pos[last])))
+        return new_rows
+
+    def _on_models(self, table, kind, positions, columns):
+        if kind == "clear":
+            self.rebuild()
+        elif kind == "insert":
+            n = len(positions)
+            values = {jc: table.column(c)[positions]
+                      for c, jc in _MODEL_COLUMNS.items()}
+            new_rows = self._append(
+                values, (positions, np.full(n, -1), np.full(n, -1)))
+            for mp, j in zip(positions.tolist(), new_rows):
+                self._model_rows[mp] = [j]
+                self._model_placeholder[mp] = j
+            if self._orphan_risks:
+                # Risks registered before their model now find it
+                self._adopt(self._orphan_risks, table.column('model_id')[positions],
+                            self.register.risks, self._on_risks)
+        else:
+            self._patch(table, positions, columns,
+                        _MODEL_COLUMNS, self._model_rows)
+
+    def _risk_values(self, table, positions):
+        values = {jc: table.column(c)[positions]
+                  for c, jc in _RISK_COLUMNS.items()}
+        if self.residual is not None:
+            values.update({jc: self.residual.scores.column(c)[positions]
+                           for c, jc in _RESIDUAL_COLUMNS.items()})
+        return values
+
+    def _on_risks(self, table, kind, positions, columns):
+        if kind == "clear":
+            self.rebuild()
+        elif kind == "insert":
+            models = self.register.models
+            model_positions = models.positions(
+                table.column('model_id')[positions])
+            fill_risks, fill_rows, new_risks, new_parents = [], [], [], []
+            for rp, mp in zip(positions.tolist(), model_positions.tolist()):
+                if mp < 0:
+                    self._orphan_risks.setdefault(
+                        int(table.get(rp, 'model_id')), []).append(rp)
+                    continue
+                j = self._model_placeholder.pop(mp, None)
+                if j is not None:
+                    fill_risks.append(rp)
+                    fill_rows.append(j)
+                else:
+                    new_risks.append(rp)
+                    new_parents.append(mp)
+            if fill_rows:
+                values = self._risk_values(table, fill_risks)
+                values['risk_pos'] = fill_risks
+                self.rows.set_many(fill_rows, values)
+            new_rows = []
+            if new_risks:
+                values = {jc: models.column(c)[new_parents]
+                          for c, jc in _MODEL_COLUMNS.items()}
+                values.update(self._risk_values(table, new_risks))
+                new_rows = self._append(values, (np.array(new_parents), np.array(new_risks),
+                                                 np.full(len(new_risks), -1)))
+                for mp, j in zip(new_parents, new_rows):
+                    self._model_rows[mp].append(j)
+            for rp, j in zip(fill_risks + new_risks, fill_rows + new_rows):
+                self._risk_rows[rp] = [j]
+                self._risk_placeholder[rp] = j
+            if self._orphan_controls and (fill_risks or new_risks):
+                self._adopt(self._orphan_controls, table.column('risk_id')[fill_risks + new_risks],
+                            self.register.controls, self._on_controls)
+        else:
+            self._patch(table, positions, columns,
+                        _RISK_COLUMNS, self._risk_rows)
+
+    def _on_controls(self, table, kind, positions, columns):
+        if kind == "clear":
+            self.rebuild()
+        elif kind == "insert":
+            risk_positions = self.register.risks.positions(
+                table.column('risk_id')[positions])
+            fill_controls, fill_rows, new_controls, new_sources = [], [], [], []
+            for cp, rp in zip(positions.tolist(), risk_positions.tolist()):
+                if rp not in self._risk_rows:
+                    # The risk is not registered, or is itself waiting for its model
+                    self._orphan_controls.setdefault(
+                        int(table.get(cp, 'risk_id')), []).append(cp)
+                    continue
+                j = self._risk_placeholder.pop(rp, None)
+                if j is not None:
+                    fill_controls.append(cp)
+                    fill_rows.append(j)
+                else:
+                    new_controls.append(cp)
+                    # Any existing row of the risk carries its model and risk values
+                    new_sources.append(self._risk_rows[rp][0])
+            if fill_rows:
+                values = {jc: table.column(c)[fill_controls]
+                          for c, jc in _CONTROL_COLUMNS.items()}
+                values['control_pos'] = fill_controls
+                self.rows.set_many(fill_rows, values)
+            new_rows = []
+            if new_controls:
+                copied = list(_MODEL_COLUMNS.values()) + \
+                    list(_RISK_COLUMNS.values()) + \
+                    list(_RESIDUAL_COLUMNS.values())
+                values = {jc: self.rows.column(
+                    jc)[new_sources] for jc in copied}
+                values.update(
+                    {jc: table.column(c)[new_controls] for c, jc in _CONTROL_COLUMNS.items()})
+                new_rows = self._append(values, (self.rows.column('model_pos')[new_sources],
+                                                 self.rows.column('risk_pos')[
+                    new_sources],
+                    np.array(new_controls)))
+                for source, j in zip(new_sources, new_rows):
+                    rp = int(self.rows.get(source, 'risk_pos'))
+                    self._risk_rows[rp].append(j)
+                    self._model_rows[int(self.rows.get(
+                        source, 'model_pos'))].append(j)
+            for cp, j in zip(fill_controls + new_controls, fill_rows + new_rows):
+                self._control_rows[cp] = [j]
+        else:
+            self._patch(table, positions, columns,
+                        _CONTROL_COLUMNS, self._control_rows)
+
+    def _adopt(self, orphans, parent_ids, table, handler):
+        # Join in the waiting children of newly registered parents
+        adopted = [pos for key in parent_ids.tolist()
+                   for pos in orphans.pop(key, ())]
+        if adopted:
+            handler(table, "insert", np.array(
+                sorted(adopted), dtype=np.int64), None)
+
+    def _on_residual(self, scores, kind, positions, columns):
+        # Residual rows are created and cleared with the risks; only their values matter here
+        if kind != "clear":
+            self._patch(scores, positions, columns or _RESIDUAL_COLUMNS,
+                        _RESIDUAL_COLUMNS, self._risk_rows)
+
+    def _patch(self, table, positions, columns, mapping, rows_by_position):
+        mapped = [c for c in columns if c in mapping]
+        if not mapped:
+            return
+        targets, sources = [], []
+        for pos in positions.tolist():
+            for j in rows_by_position.get(pos, ()):
+                targets.append(j)
+                sources.append(pos)
+        if targets:
+            self.rows.set_many(
+                targets, {mapping[c]: table.column(c)[sources] for c in mapped})
+
+    def _order(self):
+        # Display order: by model, then risk, then control, as the merges produced
+        if self._sorted:
+            return slice(None)
+        if self._order_version != self.rows.version:
+            self._order_positions = np.lexsort((self.rows.column('control_pos'), self.rows.column('risk_pos'),
+                                                self.rows.column('model_pos')))
+            self._order_version = self.rows.version
+        return self._order_positions
+
+    def column(self, name):
+        """A register column in display order, for views that page through the register."""
+        return self.rows.column(name)[self._order()]
+
+    def take(self, name, positions):
+        """Values of a register column at the given display positions."""
+        order = self._order()
+        return self.rows.take(name, positions if isinstance(order, slice) else order[positions])
+
+    def frame_values(self, name, values):
+        """Values of a register column (a copy) in the DataFrame dtype of its base table's column."""
+        field = _FIELDS.get(name)
+        return values.copy() if field is None else field.frame_values(values)
+
+    def to_frame(self):
+        """The full register as a DataFrame, cached until the next patch."""
+        if self._frame_version != self.rows.version:
+            order = self._order()
+            self._frame = pd.DataFrame({c: self.frame_values(c, self.rows.column(c)[order]) for c in FULL_REGISTER_COLUMNS},
+                                       columns=FULL_REGISTER_COLUMNS)
+            self._frame_version = self.rows.version
+        return self._frame
@@ -0,0 +1,30 @@
+import importlib
+
+
+# Sidebar label -> module in application_pages, in workflow order
+PAGES = {
+    "Welcome & System Initialization": "page_1_welcome",
+    "AI Risk Taxonomy Definition": "page_2_taxonomy",
+    "Register a New AI Model": "page_3_register_model",
+    "Initial Risk Identification": "page_4_identify_risks",
+    "Quantifying Risk Assessment": "page_5_quantify_risks",
+    "Calculate Composite Risk Score": "page_6_calculate_composite_score",
+    "Adversarial Testing Insights": "page_7_adversarial_testing",
+    "Supply Chain & Data Provenance Risks": "page_8_supply_chain_risks",
+    "Define Controls & Mitigation": "page_9_define_controls",
+    "Assign Risk Response Options": "page_10_assign_responses",
+    "Review Comprehensive Register": "page_11_review_register",
+    "Analyze & Prioritize Top Risks": "page_12_prioritize_risks",
+    "Visualize Risk Distribution": "page_13_visualize_risks",
+    "Simulate Data Drift": "page_14_data_drift",
+    "Update Risk Assessment": "page_15_update_assessment",
+    "Workflow Summary": "page_16_summary",
+    "Bulk Import Inventory": "page_17_bulk_import",
+    "Portfolio Loss Simulation": "page_18_loss_simulation",
+    "Find Duplicate Risks": "page_19_duplicate_risks"
+}
+
+
+def load_page(label):
+    """The page module for a sidebar label, imported on first use."""
+    return importlib.import_module(f"application_pages.{PAGES[label]}")
@@ -0,0 +1,499 @@
+"""HTTP/JSON API over the risk register, for monitoring, CI and ticketing systems.
+
+An asyncio HTTP/1.1 server (standard library only) in front of one
+RiskRegister. Connections are kept alive between requests, so a client pays
+for TCP setup once, and POST /batch runs many requests in one round trip and
+one register transaction. Requests are handled one at a time on the event
+loop, which owns the register; no request waits on a lock. Usage as a
+command line tool:
+
+    python register_api.py --db risk_register.db --port 8000
+
+Endpoints (bodies and responses are JSON; TABLE is models, risks or controls):
+
+    GET   /TABLE?offset=0&limit=100      rows in register order, plus the total
+    GET   /TABLE/ID                      one row
+    POST  /TABLE                         add a row; returns its ID
+    POST  /TABLE/bulk                    add a list of rows in one transaction; returns their IDs
+    PATCH /risks/ID                      {"likelihood_score", "magnitude_score"}; recalculates the composite
+    PATCH /risks                         the same for a list of {"risk_id", ...}
+    PATCH /controls/ID                   {"effectiveness_score", "risk_response"}
+    PATCH /controls                      the same for a list of {"control_id", ...}
+    GET   /top-risks?k=5&by=&value=&score=composite_risk_score
+    GET   /categories                    composite and residual score per broad risk category
+    GET   /cube?by=status,category       risk counts and scores per slice
+    GET   /search?q=...&table=risks      IDs matching a full-text query
+    POST  /batch                         [{"method", "path", "body"}, ...] -> [{"status", "body"}, ...]
+
+Rows cannot be deleted: the register's derived views only grow or update.
+"""
+import argparse
+import asyncio
+import json
+import time
+import urllib.parse
+
+import numpy as np
+import pandas as pd
+
+from register_import import registered_ids, unknown_risk_types
+from risk_register import RiskRegister
+from risk_taxonomy import compile_taxonomy
+
+
+TABLES = ("models", "risks", "controls")
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 10000
+MAX_BODY = 64 * 1024 * 1024
+IDLE_TIMEOUT = 30.0
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           408: "Request Timeout", 411: "Length Required", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    # numpy scalars and pandas' missing value, as they come out of register frames
+    if value is pd.NA:
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _records(frame):
+    values = frame.astype(object)
+    return values.where(frame.notna(), None).to_dict("records")
+
+
+def _rows(store, positions):
+    # Column by column, so a page of rows costs one take() per column
+    columns = {}
+    for column in store.columns:
+        values = store.take(column, positions)
+        if values.dtype.kind == 'f':
+            missing = np.isnan(values)
+            # Scores are whole numbers (see register_schema), sent as JSON integers
+            values = np.where(missing, None, np.where(
+                missing, 0, values).astype(np.int64).astype(object))
+        columns[column] = values.tolist()
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def _int(query, name, default):
+    try:
+        return int(query.get(name, default))
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer.") from None
+
+
+def _columns(rows, names):
+    """List of JSON objects -> dict of column lists, for the columns any row has."""
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ApiError(400, "Expected a list of JSON objects.")
+    unknown = {k for row in rows for k in row} - set(names)
+    if unknown:
+        raise ApiError(
+            400, f"Unknown column(s): {', '.join(sorted(unknown))}.")
+    present = [n for n in names if any(n in row for row in rows)]
+    return {n: [row.get(n) for row in rows] for n in present}
+
+
+def _scores(values, *names):
+    # Scores arrive as JSON numbers or null; the schema checks their range
+    try:
+        return [np.asarray([np.nan if v is None else v for v in values[n]], dtype=np.float64) for n in names]
+    except (TypeError, ValueError):
+        raise ApiError(
+            400, f"{' and '.join(names)} must be numbers.") from None
+
+
+def _reject_rows(rows, bad, column, message):
+    # Name the first offending value as the client sent it, not as numpy holds it
+    if bad.any():
+        i = int(np.flatnonzero(bad)[0])
+        where = f" (row {i + 1})" if len(rows) > 1 else ""
+        raise ApiError(
+            400, f"{message}: {column} {json.dumps(rows[i].get(column))}{where}.")
+
+
+class RegisterApi:
+    """Routes API requests to a RiskRegister; handle() maps (method, path, query, body) to (status, body)."""
+
+    def __init__(self, register):
+        self.register = register
+        self.store = register.store
+        self._warnings = None
+        register.subscribe(self._on_event)
+
+    def _on_event(self, level, event, message, details):
+        # Warnings of the request being handled go back to the client with its response
+        if self._warnings is not None and level in ("warning", "error"):
+            self._warnings.append(message)
+
+    def handle(self, method, path, query, body):
+        self._warnings = []
+        try:
+            status, result = self._route(
+                method, path.strip("/").split("/"), query, body)
+        except ApiError as e:
+            status, result = e.status, {"error": str(e)}
+        except (ValueError, KeyError) as e:
+            # Schema violations and duplicate keys, raised before anything is written
+            status, result = 400, {"error": str(e).strip("'\"")}
+        if self._warnings and isinstance(result, dict):
+            result["warnings"] = self._warnings
+        self._warnings = None
+        return status, result
+
+    def _route(self, method, parts, query, body):
+        head = parts[0]
+        if method == "POST" and head == "batch" and len(parts) == 1:
+            return self._batch(body)
+        if head in TABLES:
+            if method == "DELETE":
+                raise ApiError(
+                    405, "Rows cannot be deleted from the register.")
+            if len(parts) == 1:
+                if method == "GET":
+                    return self._list(head, query)
+                if method == "POST":
+                    if not isinstance(body, dict):
+                        raise ApiError(400, "Expected a JSON object.")
+                    return self._add(head, [body], single=True)
+                if method == "PATCH":
+                    return self._update(head, body)
+            elif len(parts) == 2 and parts[1] == "bulk" and method == "POST":
+                return self._add(head, body)
+            elif len(parts) == 2:
+                try:
+                    key = int(parts[1])
+                except ValueError:
+                    raise ApiError(
+                        404, f"No such {head} ID: {parts[1]}.") from None
+                if method == "GET":
+                    return self._get(head, key)
+                if method == "PATCH":
+                    if not isinstance(body, dict):
+                        raise ApiError(400, "Expected a JSON object.")
+                    return self._update(head, [{**body, self.store.table(head).primary_key: key}], single=True)
+            raise ApiError(
+                405, f"{method} is not supported on /{'/'.join(parts)}.")
+        if method != "GET" or len(parts) != 1:
+            raise ApiError(
+                404, f"No such endpoint: {method} /{'/'.join(parts)}.")
+        if head == "top-risks":
+            return self._top_risks(query)
+        if head == "categories":
+            return 200, _records(self.register.residual_summary())
+        if head == "cube":
+            by = [d for d in query.get("by", "category").split(",") if d]
+            try:
+                return 200, _records(self.register.cube_frame(by if len(by) > 1 else by[0]))
+            except (KeyError, IndexError):
+                raise ApiError(
+                    400, f"Cannot break down by {query.get('by')!r}.") from None
+        if head == "search":
+            table = query.get("table", "risks")
+            if table not in TABLES:
+                raise ApiError(
+                    400, f"table must be one of {', '.join(TABLES)}.")
+            return 200, {"ids": self.register.search_ids(query.get("q", ""), table)}
+        if head == "health":
+            return 200, {"models": len(self.store.models), "risks": len(self.store.risks),
+                         "controls": len(self.store.controls)}
+        raise ApiError(404, f"No such endpoint: GET /{head}.")
+
+    def _list(self, table, query):
+        store = self.store.table(table)
+        offset = max(0, _int(query, "offset", 0))
+        limit = min(max(0, _int(query, "limit", DEFAULT_LIMIT)), MAX_LIMIT)
+        with self.store.read():
+            total = len(store)
+            rows = _rows(store, np.arange(
+                min(offset, total), min(offset + limit, total)))
+        return 200, {"total": total, "offset": offset, "rows": rows}
+
+    def _get(self, table, key):
+        store = self.store.table(table)
+        with self.store.read():
+            pos = store.position(key)
+            if pos is None:
+                raise ApiError(404, f"No such {table[:-1]} ID: {key}.")
+            return 200, _rows(store, np.array([pos]))[0]
+
+    def _add(self, table, rows, single=False):
+        store = self.store.table(table)
+        columns = _columns(
+            rows, [c for c in store.columns if c != store.primary_key])
+        missing = [None] * len(rows)
+        # The importer's checks: parents must be registered and risk types in the taxonomy
+        if table == "risks":
+            _reject_rows(rows, registered_ids(self.store.models, columns.get("model_id", missing)) == 0,
+                         "model_id", "No such model")
+            _reject_rows(rows, unknown_risk_types(compile_taxonomy(self.register.taxonomy),
+                                                  columns.get("risk_type", missing)),
+                         "risk_type", "Not in the AI risk taxonomy")
+        elif table == "controls":
+            _reject_rows(rows, registered_ids(self.store.risks, columns.get("risk_id", missing)) == 0,
+                         "risk_id", "No such risk")
+        if table == "risks":
+            likelihood, magnitude = _scores(
+                {"likelihood_score": columns.get("likelihood_score", missing),
+                 "magnitude_score": columns.get("magnitude_score", missing)},
+                "likelihood_score", "magnitude_score")
+            # New scored risks get their composite score, as on the assessment pages
+            columns.update(likelihood_score=likelihood, magnitude_score=magnitude,
+                           composite_risk_score=likelihood * magnitude)
+        ids = self.register.add_rows(table, columns)
+        if single:
+            return 201, {store.primary_key: ids[0]}
+        return 201, {"ids": ids}
+
+    def _update(self, table, rows, single=False):
+        if table == "models":
+            raise ApiError(405, "Models cannot be updated through the API.")
+        store = self.store.table(table)
+        names = [store.primary_key] + (["likelihood_score", "magnitude_score"] if table == "risks"
+                                       else ["effectiveness_score", "risk_response"])
+        columns = _columns(rows, names)
+        if set(columns) != set(names):
+            raise ApiError(400, f"Every row needs {', '.join(names)}.")
+        ids = columns[store.primary_key]
+        if single:
+            with self.store.read():
+                if store.position(ids[0]) is None:
+                    raise ApiError(404, f"No such {table[:-1]} ID: {ids[0]}.")
+        with self.store.transaction():
+            if table == "risks":
+                updated = self.register.assign_risk_scores_many(
+                    ids, *_scores(columns, "likelihood_score", "magnitude_score"))
+                self.register.calculate_composite_scores_all(ids)
+            else:
+                effectiveness, = _scores(columns, "effectiveness_score")
+                updated = self.register.assign_risk_responses_many(
+                    ids, effectiveness, columns["risk_response"])
+        return 200, {"updated": updated}
+
+    def _top_risks(self, query):
+        by = query.get("by") or None
+        value = query.get("value")
+        if by == "model":
+            value = _int(query, "value", 0)
+        k = _int(query, "k", 5)
+        if k < 1:
+            raise ApiError(400, "k must be at least 1.")
+        frame = self.register.top_risks_frame(min(k, MAX_LIMIT), by, value,
+                                              query.get("score", "composite_risk_score"))
+        return 200, [] if frame is None else _records(frame)
+
+    def add_each(self, table, bodies):
+        """(status, body) of adding each row, written to the register at once when all are valid.
+
+        Each write notifies every derived view once, so one write of many rows
+        costs little more than a write of one. If the rows are rejected
+        together, they are added one by one so each gets its own response.
+        """
+        pk = self.store.table(table).primary_key
+        try:
+            ids = self._add(table, bodies)[1]["ids"]
+        except (ApiError, ValueError, KeyError):
+            return [self.handle("POST", f"/{table}", {}, body) for body in bodies]
+        return [(201, {pk: key}) for key in ids]
+
+    def _batch(self, requests):
+        if not isinstance(requests, list):
+            raise ApiError(400, "Expected a list of requests.")
+        parsed = []
+        for request in requests:
+            if not isinstance(request, dict) or "path" not in request:
+                parsed.append((400, {"error": "Each request needs a path."}))
+                continue
+            url = urllib.parse.urlsplit(request["path"])
+            method = str(request.get("method", "GET")).upper()
+            if method == "POST" and url.path.strip("/") == "batch":
+                parsed.append((400, {"error": "Batches cannot be nested."}))
+                continue
+            parsed.append((method, url.path, dict(
+                urllib.parse.parse_qsl(url.query)), request.get("body")))
+        responses = []
+        # One transaction, so a SQLite-backed register commits the whole batch once
+        with self.store.transaction():
+            i = 0
+            while i < len(parsed):
+                table = _single_add(parsed[i])
+                if table is not None:
+                    # A run of rows added to one table becomes one write
+                    end = i + 1
+                    while end < len(parsed) and _single_add(parsed[end]) == table:
+                        end += 1
+                    results = self.add_each(
+                        table, [request[3] for request in parsed[i:end]])
+                    i = end
+                elif len(parsed[i]) == 2:
+                    results = [parsed[i]]
+                    i += 1
+                else:
+                    warnings, self._warnings = self._warnings, []
+                    results = [self.handle(*parsed[i])]
+                    self._warnings = warnings
+                    i += 1
+                responses.extend({"status": status, "body": body}
+                                 for status, body in results)
+        return 200, responses
+
+
+def _single_add(request):
+    """The table a request adds one row to (POST /models, /risks or /controls), else None."""
+    if len(request) == 4 and request[0] == "POST" and not request[2]:
+        table = request[1].strip("/")
+        if table in TABLES:
+            return table
+    return None
+
+
+async def _read_request(reader):
+    """(method, target, version, headers, body) of the next request, or None at end of stream."""
+    line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise ApiError(400, "Malformed request line.") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise ApiError(411, "Send the body with a Content-Length.")
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise ApiError(400, "Content-Length must be a number.") from None
+    if length < 0:
+        raise ApiError(400, "Content-Length must not be negative.")
+    if length > MAX_BODY:
+        raise ApiError(413, f"Request bodies are limited to {MAX_BODY} bytes.")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, version, headers, body
+
+
+def _response(status, result, keep_alive):
+    payload = json.dumps(result, default=_json_default,
+                         allow_nan=False).encode()
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + payload
+
+
+async def serve(api, host="127.0.0.1", port=8000):
+    """Serve the API until cancelled; returns after the server is closed."""
+    loop = asyncio.get_running_loop()
+    pending = {}
+
+    def flush():
+        # Rows posted by every connection since the last flush, one register write per table
+        batches = list(pending.items())
+        pending.clear()
+        for table, requests in batches:
+            try:
+                results = api.add_each(table, [body for body, _ in requests])
+            except Exception as e:  # noqa: BLE001
+                results = [
+                    (500, {"error": f"{type(e).__name__}: {e}"})] * len(requests)
+            for (_, future), result in zip(requests, results):
+                future.set_result(result)
+
+    def add(table, body):
+        # Single-row POSTs wait for the end of the current pass of the event loop,
+        # so those sent concurrently by different clients are written together
+        if not pending:
+            loop.call_soon(flush)
+        future = loop.create_future()
+        pending.setdefault(table, []).append((body, future))
+        return future
+
+    async def connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ApiError as e:
+                    writer.write(_response(e.status, {"error": str(e)}, False))
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                method, target, version, headers, raw = request
+                connection_header = headers.get("connection", "").lower()
+                keep_alive = connection_header != "close" and (
+                    version != "HTTP/1.0" or connection_header == "keep-alive")
+                url = urllib.parse.urlsplit(target)
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    status, result = 400, {
+                        "error": "Request body is not valid JSON."}
+                else:
+                    request = (method, url.path, dict(
+                        urllib.parse.parse_qsl(url.query)), body)
+                    try:
+                        table = _single_add(request)
+                        if table is None:
+                            status, result = api.handle(*request)
+                        else:
+                            status, result = await add(table, body)
+                    except Exception as e:  # noqa: BLE001 - one bad request must not stop the server
+                        status, result = 500, {
+                            "error": f"{type(e).__name__}: {e}"}
+                writer.write(_response(status, result, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(connection, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serve the AI risk register as an HTTP/JSON API.")
+    parser.add_argument(
+        "--db", help="SQLite register (see QULAB_REGISTER_DB); in memory without one")
+    parser.add_argument(
+        "--snapshot", help="snapshot directory to open an empty register from")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    register = RiskRegister.open(args.db, args.snapshot)
+    store = register.store
+    print(f"Loaded {len(store.models)} models, {len(store.risks)} risks and {len(store.controls)} controls "
+          f"in {time.perf_counter() - start:.2f}s; serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(RegisterApi(register), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    register.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,144 @@
+import contextlib
+import sqlite3
+import threading
+
+from register_store import CONTROL_COLUMNS, MODEL_COLUMNS, RISK_COLUMNS
+
+
+class RegisterBackend:
+    """Storage behind a RegisterStore. Subclasses persist the register tables.
+
+    load() fills an empty RegisterStore and on_write() receives every change
+    the store makes (see ColumnStore.subscribe). Pages of a table are served
+    from the store itself (ColumnStore.page), which holds every row.
+    """
+
+    def load(self, register):
+        pass
+
+    def on_write(self, store, kind, positions, columns):
+        pass
+
+    def transaction(self):
+        return contextlib.nullcontext()
+
+    def max_key(self, table):
+        """Largest primary key stored for a table, including other processes' rows."""
+        return 0
+
+
+_SCHEMA = {
+    "models": ("model_id", {
+        "model_id": "INTEGER PRIMARY KEY", "model_name": "TEXT", "use_case": "TEXT",
+        "description": "TEXT", "owner": "TEXT", "status": "TEXT"}),
+    "risks": ("risk_id", {
+        "risk_id": "INTEGER PRIMARY KEY", "model_id": "INTEGER", "risk_type": "TEXT",
+        "hazard_description": "TEXT", "likelihood_score": "REAL",
+        "magnitude_score": "REAL", "composite_risk_score": "REAL"}),
+    "controls": ("control_id", {
+        "control_id": "INTEGER PRIMARY KEY", "risk_id": "INTEGER",
+        "control_description": "TEXT", "effectiveness_score": "REAL",
+        "risk_response": "TEXT"}),
+}
+_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_risks_model_type ON risks (model_id, risk_type)",
+    "CREATE INDEX IF NOT EXISTS idx_controls_risk ON controls (risk_id)",
+    "CREATE INDEX IF NOT EXISTS idx_models_name ON models (model_name)",
+]
+_COLUMNS = {"models": MODEL_COLUMNS,
+            "risks": RISK_COLUMNS, "controls": CONTROL_COLUMNS}
+
+
+def _sql_values(array):
+    # numpy scalars -> Python values, NaN -> NULL
+    return [None if isinstance(v, float) and v != v else v for v in array.tolist()]
+
+
+class SQLiteBackend(RegisterBackend):
+    """Local SQLite file in WAL mode; each store write is one batched transaction."""
+
+    def __init__(self, path, chunk_size=10000):
+        self.path = path
+        self.chunk_size = chunk_size
+        # Autocommit mode: transactions are opened explicitly in transaction()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Sessions run on separate script threads but share this connection
+        self._lock = threading.RLock()
+        self._depth = 0
+        with self._lock:
+            for table, (_, columns) in _SCHEMA.items():
+                definition = ", ".join(
+                    f"{name} {sql_type}" for name, sql_type in columns.items())
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ({definition})")
+            for statement in _INDEXES:
+                self._conn.execute(statement)
+
+    def close(self):
+        self._conn.close()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._depth == 0:
+                # Take the write lock up front: other processes writing this file wait
+                # until COMMIT, so IDs read from max_key() stay free until then
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("COMMIT")
+
+    def max_key(self, table):
+        key, _ = _SCHEMA[table]
+        with self._lock:
+            return self._conn.execute(f"SELECT COALESCE(MAX({key}), 0) FROM {table}").fetchone()[0]
+
+    def iter_chunks(self, table):
+        """Yield the rows of a table as dicts of column lists, chunk_size rows at a time."""
+        key, _ = _SCHEMA[table]
+        columns = _COLUMNS[table]
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT {', '.join(columns)} FROM {table} ORDER BY {key}")
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                yield dict(zip(columns, (list(values) for values in zip(*rows))))
+
+    def load(self, register):
+        for store in register.tables():
+            for chunk in self.iter_chunks(store.name):
+                store.extend(chunk)
+
+    def on_write(self, store, kind, positions, columns):
+        key, _ = _SCHEMA[store.name]
+        with self.transaction():
+            if kind == "insert":
+                names = store.columns
+                values = zip(*(_sql_values(store.column(c)[positions])
+                               for c in names))
+                # A plain INSERT: a key taken by another process fails the
+                # transaction instead of overwriting that process's row
+                self._conn.executemany(
+                    f"INSERT INTO {store.name} ({', '.join(names)}) "
+                    f"VALUES ({', '.join('?' * len(names))})", values)
+            elif kind == "update":
+                assignments = ", ".join(f"{c} = ?" for c in columns)
+                values = zip(*(_sql_values(store.column(c)[positions])
+                               for c in list(columns) + [key]))
+                self._conn.executemany(
+                    f"UPDATE {store.name} SET {assignments} WHERE {key} = ?", values)
+            elif kind == "clear":
+                self._conn.execute(f"DELETE FROM {store.name}")
@@ -0,0 +1,370 @@
+"""Bulk import of an existing model, risk and control inventory into the register.
+
+Files are read in chunks (CSV, or Parquet when pyarrow is installed), validated
+a whole chunk at a time and appended to the register store in one write per
+chunk. Usage as a command line tool:
+
+    python register_import.py --db risk_register.db --models models.csv --risks risks.csv --controls controls.csv
+
+Without --db the files are only validated against an empty in-memory register.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from register_schema import MODEL_STATUSES, RISK_RESPONSES, SCORE_RANGE
+from register_store import RegisterStore
+from risk_taxonomy import AI_RISK_TAXONOMY, TaxonomyIndex, compile_taxonomy
+
+
+DEFAULT_CHUNK_SIZE = 50000
+# Free text and label columns of each file, kept as text however they look
+TEXT_COLUMNS = {
+    "models": ["model_name", "use_case", "description", "owner", "status"],
+    "risks": ["model_name", "risk_type", "hazard_description"],
+    "controls": ["control_description", "risk_response"],
+}
+
+
+def _source_format(source):
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(
+        source, "name", "")
+    return "parquet" if str(name).lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def read_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE, fmt=None, text_columns=None):
+    """Yield a file (path or file object) as DataFrames of at most chunk_size rows.
+
+    CSV columns named in text_columns are read as written, so codes such as
+    101 or 0101 stay text.
+    """
+    fmt = fmt or _source_format(source)
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError(
+                "Reading Parquet files requires pyarrow (pip install pyarrow).") from exc
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif fmt == "csv":
+        dtype = {column: str for column in text_columns or ()}
+        yield from pd.read_csv(source, chunksize=chunk_size, dtype=dtype)
+    else:
+        raise ValueError(f"Unsupported import format '{fmt}'.")
+
+
+def _as_text(value):
+    if isinstance(value, str):
+        return value.strip()
+    # Numbers from Parquet; a column with blanks holds whole numbers as floats
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _text(chunk, column):
+    # Blank cells and missing columns both count as missing text
+    if column not in chunk:
+        return pd.Series(None, index=chunk.index, dtype=object)
+    values = chunk[column].astype(object).where(chunk[column].notna(), None)
+    values = values.map(lambda v: None if v is None else _as_text(v))
+    return values.where(values != "", None)
+
+
+def _scores(chunk, column, reasons):
+    """Numeric scores of a column (NaN where blank); out-of-range values are rejected."""
+    if column not in chunk:
+        return np.full(len(chunk), np.nan)
+    raw = chunk[column]
+    scores = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=np.float64)
+    low, high = SCORE_RANGE
+    present = ~np.isnan(scores)
+    out_of_range = present & ((scores < low) | (scores > high)
+                              | (scores != np.round(scores)))
+    invalid = (raw.notna().to_numpy() & ~present) | out_of_range
+    _reject(reasons, invalid,
+            f"{column} must be a whole number from {low} to {high}")
+    return scores
+
+
+def _reject(reasons, mask, reason):
+    # Keep the first reason a row fails on
+    mask = np.asarray(mask, dtype=bool) & reasons.isna().to_numpy()
+    reasons[mask] = reason
+
+
+def registered_ids(table, values):
+    """Each value as the ID of a row of table; 0 where it is blank, not a whole number or not registered."""
+    ids = pd.to_numeric(pd.Series(values, dtype=object),
+                        errors="coerce").to_numpy(dtype=np.float64)
+    usable = ~np.isnan(ids) & (ids == np.round(ids)) & (np.abs(ids) < 2 ** 62)
+    resolved = np.zeros(len(ids), dtype=np.int64)
+    candidates = ids[usable].astype(np.int64)
+    resolved[usable] = np.where(
+        table.positions(candidates) >= 0, candidates, 0)
+    return resolved
+
+
+def unknown_risk_types(taxonomy, risk_types):
+    """Mask of the risk types (blank ones included) that are not in a compiled taxonomy."""
+    return taxonomy.category_codes(risk_types) < 0
+
+
+class ImportReport:
+    """Counts, timing and rejected rows of importing one file."""
+
+    def __init__(self, table):
+        self.table = table
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.seconds = 0.0
+        self._rejected = []
+
+    @property
+    def rows_rejected(self):
+        return self.rows_read - self.rows_imported
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+    @property
+    def rejected(self):
+        """Rejected source rows with their 1-based row number and the reason."""
+        if not self._rejected:
+            return pd.DataFrame(columns=["row", "reason"])
+        return pd.concat(self._rejected, ignore_index=True)
+
+    def add_rejected(self, chunk, reasons):
+        rejected = reasons.notna().to_numpy()
+        if rejected.any():
+            frame = chunk[rejected].copy()
+            frame.insert(0, "reason", reasons[rejected].to_numpy())
+            frame.insert(0, "row", chunk.index[rejected] + 1)
+            self._rejected.append(frame)
+
+    def summary(self):
+        return (f"{self.table}: {self.rows_imported} of {self.rows_read} rows imported, "
+                f"{self.rows_rejected} rejected in {self.seconds:.2f}s "
+                f"({self.rows_per_second:,.0f} rows/s)")
+
+
+class RegisterImporter:
+    """Validates inventory files chunk by chunk and appends them to a RegisterStore.
+
+    Files may carry their own model_id / risk_id columns. Those IDs are kept
+    only to link the files of one import to each other: risks refer to models
+    by source model_id and controls to risks by source risk_id. Rows already
+    in the register are referred to by register_model_id (or model_name) and
+    register_risk_id. A row whose source parent was rejected is rejected too.
+    Imported rows always get fresh register IDs, allocated a chunk at a time.
+    """
+
+    def __init__(self, register, taxonomy=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.register = register
+        if taxonomy is None:
+            taxonomy = AI_RISK_TAXONOMY
+        self.taxonomy = taxonomy if isinstance(
+            taxonomy, TaxonomyIndex) else compile_taxonomy(taxonomy)
+        self.chunk_size = chunk_size
+        # Source ID -> register ID of the rows imported so far
+        self.model_ids = {}
+        self.risk_ids = {}
+        # Source IDs of the rejected rows, so their children are rejected too
+        self.rejected_model_ids = set()
+        self.rejected_risk_ids = set()
+
+    def _allocate_ids(self, table, n):
+        start = self.register.max_id(table) + 1
+        return np.arange(start, start + n, dtype=np.int64)
+
+    def _run(self, table, source, fmt, validate):
+        report = ImportReport(table)
+        store = self.register.table(table)
+        start = time.perf_counter()
+        row_offset = 0
+        for chunk in read_chunks(source, self.chunk_size, fmt, TEXT_COLUMNS[table]):
+            # Number rows by their position in the file for the rejection report
+            chunk.index = pd.RangeIndex(row_offset, row_offset + len(chunk))
+            row_offset += len(chunk)
+            reasons = pd.Series(None, index=chunk.index, dtype=object)
+            columns, source_ids = validate(chunk, reasons)
+            accepted = reasons.isna().to_numpy()
+            n = int(accepted.sum())
+            if n:
+                values = {c: np.asarray(v)[accepted]
+                          for c, v in columns.items()}
+                # Other sessions may register rows between chunks, so IDs are taken under the lock
+                with self.register.transaction():
+                    ids = self._allocate_ids(table, n)
+                    values[store.primary_key] = ids
+                    store.extend(values)
+                if source_ids is not None:
+                    mapping = self.model_ids if table == "models" else self.risk_ids
+                    linked = accepted & ~np.isnan(source_ids)
+                    mapping.update(
+                        zip(source_ids[linked].tolist(), ids[linked[accepted]].tolist()))
+            if source_ids is not None and n < len(chunk):
+                rejected = self.rejected_model_ids if table == "models" else self.rejected_risk_ids
+                dropped = ~accepted & ~np.isnan(source_ids)
+                rejected.update(source_ids[dropped].tolist())
+            report.rows_read += len(chunk)
+            report.rows_imported += n
+            report.add_rejected(chunk, reasons)
+        report.seconds = time.perf_counter() - start
+        return report
+
+    @staticmethod
+    def _source_ids(chunk, column):
+        if column not in chunk:
+            return None
+        return pd.to_numeric(chunk[column], errors="coerce").to_numpy(dtype=np.float64)
+
+    def _resolve(self, chunk, parent, mapping, rejected, table, reasons):
+        """Register IDs of each row's parent; 0 where unknown.
+
+        The source <parent> column is resolved only through this import's
+        mapping; register_<parent> names a row already in the register.
+        """
+        resolved = np.zeros(len(chunk), dtype=np.int64)
+        source = pd.to_numeric(chunk[parent], errors="coerce") if parent in chunk \
+            else pd.Series(np.nan, index=chunk.index)
+        has_source = source.notna().to_numpy()
+        resolved[has_source] = source[has_source].map(
+            mapping).fillna(0).to_numpy(dtype=np.int64)
+        kind = parent[:-3]
+        _reject(reasons, source.isin(rejected).to_numpy() & (resolved == 0),
+                f"{kind} was rejected in this import")
+        column = f"register_{parent}"
+        if column in chunk:
+            use = ~has_source & chunk[column].notna().to_numpy()
+            if use.any():
+                resolved[use] = registered_ids(table, chunk[column][use])
+        return resolved
+
+    def import_models(self, source, fmt=None):
+        models = self.register.models
+
+        def validate(chunk, reasons):
+            names = _text(chunk, "model_name")
+            _reject(reasons, names.isna(), "missing model_name")
+            registered = np.array([bool(models.lookup("model_name", (name,)))
+                                   for name in names.tolist()], dtype=bool)
+            _reject(reasons, registered, "model_name is already registered")
+            _reject(reasons, names.notna() & names.duplicated(),
+                    "duplicate model_name in file")
+            status = _text(chunk, "status").fillna("In Development")
+            _reject(reasons, ~status.isin(MODEL_STATUSES),
+                    f"status must be one of {', '.join(MODEL_STATUSES)}")
+            columns = {"model_name": names, "use_case": _text(chunk, "use_case"),
+                       "description": _text(chunk, "description"),
+                       "owner": _text(chunk, "owner"), "status": status}
+            return columns, self._source_ids(chunk, "model_id")
+        return self._run("models", source, fmt, validate)
+
+    def import_risks(self, source, fmt=None):
+        models = self.register.models
+
+        def validate(chunk, reasons):
+            if not {"model_id", "register_model_id", "model_name"} & set(chunk.columns):
+                raise ValueError(
+                    "Risk files need a model_id, register_model_id or model_name column.")
+            model_ids = self._resolve(chunk, "model_id", self.model_ids,
+                                      self.rejected_model_ids, models, reasons)
+            if "model_name" in chunk:
+                # Rows without a model ID name a registered model instead
+                unnamed = np.ones(len(chunk), dtype=bool)
+                for column in ("model_id", "register_model_id"):
+                    if column in chunk:
+                        unnamed &= chunk[column].isna().to_numpy()
+                for i, name in zip(np.flatnonzero(unnamed), _text(chunk, "model_name")[unnamed].tolist()):
+                    positions = models.lookup("model_name", (name,))
+                    if positions:
+                        model_ids[i] = int(models.get(
+                            positions[0], "model_id"))
+            _reject(reasons, model_ids == 0, "unknown model")
+            risk_types = _text(chunk, "risk_type")
+            _reject(reasons, unknown_risk_types(self.taxonomy, risk_types),
+                    "risk_type is not in the AI risk taxonomy")
+            hazards = _text(chunk, "hazard_description")
+            _reject(reasons, hazards.isna(), "missing hazard_description")
+            likelihood = _scores(chunk, "likelihood_score", reasons)
+            magnitude = _scores(chunk, "magnitude_score", reasons)
+            columns = {"model_id": model_ids, "risk_type": risk_types, "hazard_description": hazards,
+                       "likelihood_score": likelihood, "magnitude_score": magnitude,
+                       # NaN wherever either score is missing
+                       "composite_risk_score": likelihood * magnitude}
+            return columns, self._source_ids(chunk, "risk_id")
+        return self._run("risks", source, fmt, validate)
+
+    def import_controls(self, source, fmt=None):
+        def validate(chunk, reasons):
+            if not {"risk_id", "register_risk_id"} & set(chunk.columns):
+                raise ValueError(
+                    "Control files need a risk_id or register_risk_id column.")
+            risk_ids = self._resolve(chunk, "risk_id", self.risk_ids,
+                                     self.rejected_risk_ids, self.register.risks, reasons)
+            _reject(reasons, risk_ids == 0, "unknown risk")
+            descriptions = _text(chunk, "control_description")
+            _reject(reasons, descriptions.isna(),
+                    "missing control_description")
+            effectiveness = _scores(chunk, "effectiveness_score", reasons)
+            responses = _text(chunk, "risk_response")
+            _reject(reasons, responses.notna() & ~responses.isin(RISK_RESPONSES),
+                    f"risk_response must be one of {', '.join(RISK_RESPONSES)}")
+            columns = {"risk_id": risk_ids, "control_description": descriptions,
+                       "effectiveness_score": effectiveness, "risk_response": responses}
+            return columns, None
+        return self._run("controls", source, fmt, validate)
+
+    def import_files(self, models=None, risks=None, controls=None):
+        """Import whichever files are given, parents first; returns one report per file."""
+        reports = []
+        if models is not None:
+            reports.append(self.import_models(models))
+        if risks is not None:
+            reports.append(self.import_risks(risks))
+        if controls is not None:
+            reports.append(self.import_controls(controls))
+        return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Bulk import models, risks and controls into the AI risk register.")
+    parser.add_argument(
+        "--db", help="SQLite register to import into (see QULAB_REGISTER_DB)")
+    parser.add_argument("--models", help="CSV or Parquet file of models")
+    parser.add_argument("--risks", help="CSV or Parquet file of risks")
+    parser.add_argument("--controls", help="CSV or Parquet file of controls")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--rejected", help="write rejected rows to <REJECTED>_<table>.csv")
+    args = parser.parse_args(argv)
+    if not (args.models or args.risks or args.controls):
+        parser.error("nothing to import: give --models, --risks or --controls")
+
+    backend = None
+    if args.db:
+        from register_backend import SQLiteBackend
+        backend = SQLiteBackend(args.db)
+    register = RegisterStore(backend)
+    importer = RegisterImporter(register, chunk_size=args.chunk_size)
+    reports = importer.import_files(args.models, args.risks, args.controls)
+    for report in reports:
+        print(report.summary())
+        if args.rejected and report.rows_rejected:
+            path = f"{args.rejected}_{report.table}.csv"
+            report.rejected.to_csv(path, index=False)
+            print(f"  rejected rows written to {path}")
+    if backend is not None:
+        backend.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
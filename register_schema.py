@@ -0,0 +1,107 @@
+"""Column schema of the register tables: storage dtypes, DataFrame dtypes and write validation.
+
+IDs are stored as int32. Scores stay float buffers in the store (NaN is
+missing, and every score consumer computes in floats), but only whole
+numbers in range are accepted, so materialized DataFrames carry them as
+nullable Int8 (likelihood, magnitude, effectiveness) and UInt8 (composite).
+Labels from a small set of values (risk type, owner, status, risk response)
+are interned on write, so every row holding a label shares one string, and
+become categoricals in DataFrames. Free text is stored as is.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+MODEL_STATUSES = ["In Development", "In Production", "Retired"]
+RISK_RESPONSES = ["Mitigate", "Transfer", "Avoid", "Accept"]
+SCORE_RANGE = (1, 5)
+# Composite scores are likelihood x magnitude
+COMPOSITE_RANGE = (SCORE_RANGE[0] ** 2, SCORE_RANGE[1] ** 2)
+ID_RANGE = (0, int(np.iinfo(np.int32).max))
+
+
+def _missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+class Field:
+    """One column: how it is stored, how it is materialized and what may be written to it."""
+
+    def __init__(self, kind, dtype=object, frame_dtype=None, value_range=None, categories=None):
+        self.kind = kind
+        self.dtype = np.dtype(dtype)
+        self.frame_dtype = frame_dtype
+        self.value_range = value_range
+        self.categories = categories
+
+    def coerce(self, values):
+        """Values as they are stored; labels are interned and missing labels are None."""
+        if self.kind != 'category':
+            return values
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        # factorize marks missing values with -1, i.e. the trailing None
+        interned = np.array([sys.intern(str(v)) if isinstance(v, str) else v for v in uniques.tolist()] + [None],
+                            dtype=object)
+        return interned[codes]
+
+    def validate(self, values, table, column):
+        """Raise ValueError if any of the values (as stored) may not be written to the column."""
+        if self.value_range is not None:
+            low, high = self.value_range
+            values = np.asarray(values, dtype=np.float64)
+            present = values[~np.isnan(values)]
+            if ((present < low) | (present > high) | (present != np.round(present))).any():
+                raise ValueError(
+                    f"{column} must be a whole number from {low} to {high} in {table}.")
+        elif self.dtype == object:
+            if self.categories is not None:
+                allowed = set(self.categories)
+                bad = [v for v in pd.unique(np.asarray(values, dtype=object))
+                       if not _missing(v) and v not in allowed]
+                if bad:
+                    raise ValueError(f"{column} must be one of {', '.join(self.categories)} in {table}, "
+                                     f"not '{bad[0]}'.")
+            elif pd.api.types.infer_dtype(values, skipna=True) not in ('string', 'empty'):
+                raise ValueError(f"{column} must be text in {table}.")
+
+    def frame_values(self, values):
+        """Values of a stored column in its compact DataFrame dtype."""
+        if self.kind == 'category':
+            return pd.Categorical(values, categories=self.categories)
+        if self.frame_dtype is not None:
+            return pd.array(values, dtype=self.frame_dtype)
+        return values.copy()
+
+
+def _id():
+    return Field('id', np.int32, value_range=ID_RANGE)
+
+
+def _score():
+    return Field('score', np.float64, "Int8", value_range=SCORE_RANGE)
+
+
+TEXT = Field('text')
+
+SCHEMA = {
+    'models': {
+        'model_id': _id(), 'model_name': TEXT, 'use_case': TEXT, 'description': TEXT,
+        'owner': Field('category'), 'status': Field('category', categories=MODEL_STATUSES),
+    },
+    'risks': {
+        'risk_id': _id(), 'model_id': _id(), 'risk_type': Field('category'),
+        'hazard_description': TEXT, 'likelihood_score': _score(), 'magnitude_score': _score(),
+        'composite_risk_score': Field('composite', np.float64, "UInt8", value_range=COMPOSITE_RANGE),
+    },
+    'controls': {
+        'control_id': _id(), 'risk_id': _id(), 'control_description': TEXT,
+        'effectiveness_score': _score(), 'risk_response': Field('category', categories=RISK_RESPONSES),
+    },
+}
+
+
+def storage_dtypes(table):
+    """Non-object buffer dtypes of a register table, as ColumnStore dtypes."""
+    return {c: f.dtype for c, f in SCHEMA[table].items() if f.dtype != object}
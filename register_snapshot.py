@@ -0,0 +1,219 @@
+"""Snapshots of the register as a bundle of columnar files, restored by memory-mapping.
+
+A snapshot is a directory with one uncompressed Arrow IPC file per table
+(models.arrow, risks.arrow, controls.arrow) and manifest.json holding the row
+counts and next IDs of each table and the AI risk taxonomy. Restoring maps the
+files into memory instead of reading them: numeric columns are used in place
+from the OS page cache, which every process opening the same snapshot shares,
+and labels are stored dictionary-encoded, so each distinct label becomes one
+Python string. With --format parquet the tables are written compressed
+instead, for archiving or exchange; they are read, not mapped. Usage as a
+command line tool:
+
+    python register_snapshot.py save --db risk_register.db --out register_snapshot
+    python register_snapshot.py restore --db risk_register.db --snapshot register_snapshot
+    python register_snapshot.py info register_snapshot
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from register_schema import SCHEMA
+
+
+SNAPSHOT_VERSION = 1
+MANIFEST = "manifest.json"
+FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError(
+            "Register snapshots require pyarrow (pip install pyarrow).") from exc
+    return pa
+
+
+def _arrow_table(store):
+    pa = _pyarrow()
+    arrays = {}
+    for column in store.columns:
+        values = store.column(column)
+        field = SCHEMA[store.name].get(column)
+        if values.dtype != object:
+            arrays[column] = pa.array(values)
+        elif field is not None and field.kind == 'category':
+            arrays[column] = pa.array(
+                values, type=pa.string(), from_pandas=True).dictionary_encode()
+        else:
+            arrays[column] = pa.array(
+                values, type=pa.large_string(), from_pandas=True)
+    return pa.table(arrays)
+
+
+def save_snapshot(register, path, taxonomy=None, format="arrow"):
+    """Write the register (and the taxonomy, if given) to a snapshot directory; returns the manifest.
+
+    The bundle is written next to path and moved into place when complete,
+    so a reader never sees half a snapshot.
+    """
+    if format not in FORMATS:
+        raise ValueError(
+            f"Snapshot format must be one of {', '.join(FORMATS)}.")
+    pa = _pyarrow()
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    path = os.path.abspath(path)
+    staging = f"{path}.partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    with register.read():
+        tables = {}
+        for store in register.tables():
+            table = _arrow_table(store)
+            target = os.path.join(staging, store.name + FORMATS[format])
+            if format == "arrow":
+                # Uncompressed and in one record batch, so restores can map the columns directly
+                feather.write_feather(table, target, compression="uncompressed",
+                                      chunksize=max(len(store), 1))
+            else:
+                pq.write_table(table, target)
+            tables[store.name] = {"rows": len(store), "next_id": register.next_id(store.name),
+                                  "columns": store.columns}
+    manifest = {"version": SNAPSHOT_VERSION, "format": format, "pyarrow": pa.__version__,
+                "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                "tables": tables, "taxonomy": taxonomy}
+    with open(os.path.join(staging, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    if os.path.exists(path):
+        replaced = f"{path}.replaced"
+        shutil.rmtree(replaced, ignore_errors=True)
+        os.rename(path, replaced)
+        os.rename(staging, path)
+        shutil.rmtree(replaced)
+    else:
+        os.rename(staging, path)
+    return manifest
+
+
+def read_manifest(path):
+    with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Unsupported register snapshot version {manifest.get('version')}.")
+    return manifest
+
+
+class Snapshot:
+    """An opened snapshot: its manifest and the tables, memory-mapped when stored as Arrow."""
+
+    def __init__(self, path):
+        pa = _pyarrow()
+        self.path = path
+        self.manifest = read_manifest(path)
+        self.tables = {}
+        for name in self.manifest["tables"]:
+            target = os.path.join(
+                path, name + FORMATS[self.manifest["format"]])
+            if self.manifest["format"] == "arrow":
+                # The tables' buffers point into the mapping, which stays open with the snapshot
+                self.tables[name] = pa.ipc.open_file(
+                    pa.memory_map(target)).read_all()
+            else:
+                import pyarrow.parquet as pq
+                self.tables[name] = pq.read_table(target)
+
+    @property
+    def taxonomy(self):
+        return self.manifest.get("taxonomy")
+
+    def column(self, table, name):
+        """A column as a numpy array: a read-only view of the mapped file for numeric columns."""
+        types = _pyarrow().types
+        values = self.tables[table].column(name)
+        chunk = values.chunk(
+            0) if values.num_chunks == 1 else values.combine_chunks()
+        if types.is_dictionary(chunk.type):
+            labels = np.array(chunk.dictionary.to_pylist() +
+                              [None], dtype=object)
+            # Missing labels have index -1, i.e. the trailing None
+            return labels[chunk.indices.fill_null(-1).to_numpy()]
+        if types.is_string(chunk.type) or types.is_large_string(chunk.type):
+            return chunk.to_numpy(zero_copy_only=False)
+        return chunk.to_numpy(zero_copy_only=chunk.null_count == 0)
+
+    def columns(self, table):
+        return {name: self.column(table, name) for name in self.tables[table].column_names}
+
+
+def restore_snapshot(register, path):
+    """Replace the register's rows with a snapshot's, in one transaction; returns the Snapshot."""
+    snapshot = Snapshot(path)
+    for store in register.tables():
+        info = snapshot.manifest["tables"].get(store.name)
+        if info is None or info["columns"] != store.columns:
+            raise ValueError(
+                f"Snapshot {path} does not match the register's {store.name} columns.")
+    with register.transaction():
+        for store in register.tables():
+            store.clear()
+        for store in register.tables():
+            if snapshot.manifest["tables"][store.name]["rows"]:
+                store.extend(snapshot.columns(store.name))
+    return snapshot
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Save, restore or describe register snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    save = commands.add_parser("save", help="snapshot a SQLite register")
+    save.add_argument("--db", required=True,
+                      help="SQLite register (see QULAB_REGISTER_DB)")
+    save.add_argument("--out", required=True, help="snapshot directory")
+    save.add_argument("--format", choices=list(FORMATS), default="arrow")
+    restore = commands.add_parser(
+        "restore", help="replace a SQLite register's rows with a snapshot's")
+    restore.add_argument("--db", required=True,
+                         help="SQLite register (see QULAB_REGISTER_DB)")
+    restore.add_argument("--snapshot", required=True,
+                         help="snapshot directory")
+    info = commands.add_parser("info", help="describe a snapshot")
+    info.add_argument("snapshot", help="snapshot directory")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        manifest = read_manifest(args.snapshot)
+        print(f"{manifest['format']} snapshot created {manifest['created']}")
+        for name, table in manifest["tables"].items():
+            print(
+                f"{name}: {table['rows']} rows, next id {table['next_id']}")
+        return 0
+
+    from register_backend import SQLiteBackend
+    from register_store import RegisterStore
+    register = RegisterStore()
+    backend = SQLiteBackend(args.db)
+    register.attach_backend(backend)
+    start = time.perf_counter()
+    if args.command == "save":
+        save_snapshot(register, args.out, format=args.format)
+        verb = "Saved"
+    else:
+        restore_snapshot(register, args.snapshot)
+        verb = "Restored"
+    print(f"{verb} {len(register.models)} models, {len(register.risks)} risks and "
+          f"{len(register.controls)} controls in {time.perf_counter() - start:.2f}s.")
+    backend.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
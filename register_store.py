@@ -0,0 +1,494 @@
+import bisect
+import contextlib
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+
+from register_schema import SCHEMA, storage_dtypes
+
+
+MODEL_COLUMNS = ["model_id", "model_name", "use_case",
+                 "description", "owner", "status"]
+RISK_COLUMNS = ["risk_id", "model_id", "risk_type", "hazard_description",
+                "likelihood_score", "magnitude_score", "composite_risk_score"]
+CONTROL_COLUMNS = ["control_id", "risk_id", "control_description",
+                   "effectiveness_score", "risk_response"]
+
+# Buffer dtypes per column (see register_schema). IDs are int32 and scores are
+# floats so a missing score is NaN; every other column holds Python objects.
+MODEL_DTYPES = storage_dtypes("models")
+RISK_DTYPES = storage_dtypes("risks")
+CONTROL_DTYPES = storage_dtypes("controls")
+
+
+def _key(value):
+    # Index keys are plain Python scalars so np.int64(3), 3 and 3.0 all match
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _missing_value(dtype):
+    if dtype.kind == 'f':
+        return np.nan
+    if dtype.kind in 'iu':
+        return 0
+    return None
+
+
+def _group_positions(key_columns, start=0):
+    # (key tuple, ascending positions) per distinct combination of the key columns,
+    # grouped in one vectorized pass instead of a dictionary update per row
+    n = len(key_columns[0])
+    if n == 0:
+        return []
+    combined = np.zeros(n, dtype=np.int64)
+    for values in key_columns:
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        combined = combined * max(len(uniques), 1) + codes
+    groups, uniques = pd.factorize(combined)
+    # Stable sorts of 16-bit codes are radix sorts
+    order = np.argsort(groups.astype(
+        np.min_scalar_type(len(uniques))), kind='stable')
+    bounds = np.flatnonzero(np.diff(groups[order])) + 1
+    firsts = order[np.r_[0, bounds]]
+    keys = zip(*(values[firsts].tolist() for values in key_columns))
+    return zip(keys, (part.tolist() for part in np.split(order + start, bounds)))
+
+
+class RWLock:
+    """Many concurrent readers or one writer; waiting writers go before new readers.
+
+    The writer may re-enter write() and read(), and readers may nest read(),
+    but a reader cannot upgrade to writer.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def read(self):
+        me = threading.get_ident()
+        depth = getattr(self._local, 'read_depth', 0)
+        if self._writer == me or depth:
+            # Already inside a read or write section on this thread
+            self._local.read_depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.read_depth = depth
+            return
+        with self._cond:
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        self._local.read_depth = 1
+        try:
+            yield
+        finally:
+            self._local.read_depth = 0
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+            else:
+                if getattr(self._local, 'read_depth', 0):
+                    raise RuntimeError(
+                        "Cannot take the write lock while holding a read lock.")
+                self._waiting_writers += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._cond.wait()
+                finally:
+                    self._waiting_writers -= 1
+                self._writer = me
+                self._write_depth = 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._writer = None
+                    self._cond.notify_all()
+
+
+class ColumnStore:
+    """Append-optimized table kept as one preallocated numpy buffer per column."""
+
+    def __init__(self, name, columns, dtypes=None, primary_key=None, capacity=256, schema=None):
+        self.name = name
+        self.columns = list(columns)
+        self.primary_key = primary_key
+        # Fields (register_schema.Field) of the columns validated on write
+        self.schema = schema or {}
+        dtypes = dtypes or {}
+        self.dtypes = {c: np.dtype(dtypes.get(c, object))
+                       for c in self.columns}
+        self._capacity = max(int(capacity), 1)
+        self._size = 0
+        self._data = {c: np.empty(self._capacity, dtype=self.dtypes[c])
+                      for c in self.columns}
+        # Bumped on every write so materialized frames know when they are stale
+        self.version = 0
+        # Store version of each row's last write, for optimistic concurrency checks
+        self._row_versions = np.zeros(self._capacity, dtype=np.int64)
+        self._frame = None
+        self._frame_version = -1
+        # Hash indexes: primary key -> position, and named secondary indexes
+        # mapping a tuple of column values -> positions in insertion order
+        self._pk_index = {}
+        # Largest primary key so far, so allocating the next ID is O(1)
+        self._max_key = 0
+        self._secondary = {}
+        self._listeners = []
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def empty(self):
+        return self._size == 0
+
+    def _reserve(self, n):
+        needed = self._size + n
+        if needed <= self._capacity:
+            return
+        # Geometric growth keeps appends amortized O(1)
+        new_capacity = max(self._capacity * 2, needed)
+        for c in self.columns:
+            buffer = np.empty(new_capacity, dtype=self.dtypes[c])
+            buffer[:self._size] = self._data[c][:self._size]
+            self._data[c] = buffer
+        row_versions = np.zeros(new_capacity, dtype=np.int64)
+        row_versions[:self._size] = self._row_versions[:self._size]
+        self._row_versions = row_versions
+        self._capacity = new_capacity
+
+    def _coerce(self, column, value):
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            return _missing_value(self.dtypes[column])
+        return value
+
+    def _checked(self, column, values):
+        # Values as stored, after the column's schema field has accepted them
+        field = self.schema.get(column)
+        if field is None:
+            return values
+        values = field.coerce(values)
+        field.validate(values, self.name, column)
+        return values
+
+    def _index_key(self, pos, columns):
+        return tuple(_key(self._data[c][pos]) for c in columns)
+
+    def _index_rows(self, start, stop):
+        if self.primary_key is not None:
+            ids = self._data[self.primary_key][start:stop]
+            keys = ids.tolist()
+            if len(pd.unique(ids)) != len(keys) or not self._pk_index.keys().isdisjoint(keys):
+                seen = set(self._pk_index)
+                duplicate = next(k for k in keys if k in seen or seen.add(k))
+                raise KeyError(
+                    f"Duplicate {self.primary_key} {duplicate} in {self.name}.")
+            self._pk_index.update(zip(keys, range(start, stop)))
+            if keys:
+                self._max_key = max(self._max_key, max(keys))
+        for columns, index in self._secondary.values():
+            for key, positions in _group_positions([self._data[c][start:stop] for c in columns], start):
+                index.setdefault(key, []).extend(positions)
+
+    def add_index(self, name, columns):
+        """Maintain a secondary hash index over the given columns."""
+        self._secondary[name] = (tuple(columns), {})
+        self._rebuild_secondary(name)
+
+    def _rebuild_secondary(self, name):
+        columns, index = self._secondary[name]
+        index.clear()
+        index.update(_group_positions(
+            [self._data[c][:self._size] for c in columns]))
+
+    def rebuild_indexes(self):
+        self._pk_index.clear()
+        self._max_key = 0
+        if self.primary_key is not None:
+            keys = self._data[self.primary_key][:self._size].tolist()
+            self._pk_index.update(zip(keys, range(self._size)))
+            self._max_key = max(keys, default=0)
+        for name in self._secondary:
+            self._rebuild_secondary(name)
+
+    def max_key(self):
+        """The largest primary key registered, or 0 for an empty table."""
+        return self._max_key
+
+    def position(self, key):
+        """Row position of a primary key, or None if it is not registered."""
+        return self._pk_index.get(_key(key))
+
+    def positions(self, keys):
+        """Row positions of many primary keys; unknown keys map to -1."""
+        # tolist() already yields the plain Python scalars the index is keyed by
+        keys = keys.tolist() if isinstance(
+            keys, np.ndarray) else [_key(k) for k in keys]
+        return np.fromiter(map(self._pk_index.get, keys, itertools.repeat(-1, len(keys))),
+                           dtype=np.int64, count=len(keys))
+
+    def lookup(self, name, key):
+        """Positions matching a key tuple in a secondary index."""
+        _, index = self._secondary[name]
+        return index.get(tuple(_key(k) for k in key), [])
+
+    def validate_row(self, row):
+        """The row's values as they would be stored; raises ValueError without writing if any is rejected."""
+        return {c: self._checked(c, [self._coerce(c, row.get(c))])[0]
+                for c in self.columns}
+
+    def append(self, row):
+        """Append one row (a dict keyed by column name) and return its position."""
+        values = self.validate_row(row)
+        self._reserve(1)
+        pos = self._size
+        for c in self.columns:
+            self._data[c][pos] = values[c]
+        self._size += 1
+        try:
+            self._index_rows(pos, pos + 1)
+        except KeyError:
+            self._size -= 1
+            raise
+        self.version += 1
+        self._row_versions[pos] = self.version
+        self._emit("insert", np.array([pos], dtype=np.int64), None)
+        return pos
+
+    def validate_rows(self, columns):
+        """The columns of many rows as they would be stored; raises ValueError without writing if any is rejected."""
+        checked = {}
+        for c in self.columns:
+            if c in columns:
+                values = np.asarray(columns[c])
+                if values.dtype == object and self.dtypes[c] != object:
+                    values = np.array([self._coerce(c, v)
+                                      for v in values], dtype=self.dtypes[c])
+                checked[c] = self._checked(c, values)
+        return checked
+
+    def extend(self, columns):
+        """Append many rows given as a dict of equal-length column arrays."""
+        n = len(next(iter(columns.values()))) if columns else 0
+        if n == 0:
+            return np.arange(self._size, self._size)
+        # Every column is checked before any is written, so a rejected batch leaves no rows
+        checked = self.validate_rows(columns)
+        self._reserve(n)
+        start = self._size
+        for c in self.columns:
+            target = self._data[c][start:start + n]
+            if c in checked:
+                target[:] = checked[c]
+            else:
+                target[:] = _missing_value(self.dtypes[c])
+        self._size += n
+        try:
+            self._index_rows(start, start + n)
+        except KeyError:
+            self._size = start
+            self.rebuild_indexes()
+            raise
+        self.version += 1
+        self._row_versions[start:start + n] = self.version
+        positions = np.arange(start, start + n)
+        self._emit("insert", positions, None)
+        return positions
+
+    def column(self, name):
+        """Read-only view of the populated part of a column buffer."""
+        view = self._data[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def take(self, name, positions):
+        """Values of a column at the given positions (a copy)."""
+        return self._data[name][:self._size][positions]
+
+    def get(self, pos, column):
+        return self._data[column][pos]
+
+    def _assign(self, pos, column, value):
+        if column == self.primary_key:
+            raise ValueError(
+                f"{self.primary_key} is the primary key of {self.name} and cannot be updated.")
+        value = self._checked(column, [self._coerce(column, value)])[0]
+        indexed = [name for name, (columns, _) in self._secondary.items()
+                   if column in columns]
+        for name in indexed:
+            columns, index = self._secondary[name]
+            index[self._index_key(pos, columns)].remove(pos)
+        self._data[column][pos] = value
+        for name in indexed:
+            columns, index = self._secondary[name]
+            # Keep each bucket in insertion order so lookups match a table scan
+            bucket = index.setdefault(self._index_key(pos, columns), [])
+            bucket.insert(bisect.bisect_left(bucket, pos), pos)
+
+    def set(self, pos, column, value):
+        self._assign(pos, column, value)
+        self.version += 1
+        self._row_versions[pos] = self.version
+        self._emit("update", np.array([pos], dtype=np.int64), [column])
+
+    def set_many(self, positions, values):
+        """Vectorized update of several columns at the given row positions."""
+        positions = np.asarray(positions, dtype=np.int64)
+        if len(positions) == 0:
+            return
+        values = {column: column_values if column == self.primary_key else
+                  self._checked(column, np.broadcast_to(
+                      column_values, positions.shape))
+                  for column, column_values in values.items()}
+        for column, column_values in values.items():
+            if column == self.primary_key or any(
+                    column in columns for columns, _ in self._secondary.values()):
+                # Indexed columns go row by row so their indexes stay in step
+                for pos, value in zip(positions.tolist(), np.broadcast_to(column_values, positions.shape)):
+                    self._assign(pos, column, value)
+                continue
+            self._data[column][positions] = column_values
+        self.version += 1
+        self._row_versions[positions] = self.version
+        self._emit("update", positions, list(values))
+
+    def row_versions(self, positions):
+        """Store version of the last write to each row; compare later to detect concurrent edits."""
+        return self._row_versions[:self._size][np.asarray(positions, dtype=np.int64)].copy()
+
+    def row(self, pos):
+        return {c: self._data[c][pos] for c in self.columns}
+
+    def clear(self):
+        self._size = 0
+        self.rebuild_indexes()
+        self.version += 1
+        self._emit("clear", np.arange(0), None)
+
+    def subscribe(self, listener):
+        """Call listener(store, kind, positions, columns) after every write.
+
+        kind is "insert", "update" or "clear"; columns lists the updated
+        columns for "update" and is None otherwise.
+        """
+        self._listeners.append(listener)
+
+    def _emit(self, kind, positions, columns):
+        for listener in self._listeners:
+            listener(self, kind, positions, columns)
+
+    def page(self, offset, limit, columns=None):
+        """DataFrame of rows [offset, offset + limit) without materializing the table."""
+        columns = list(columns or self.columns)
+        stop = min(offset + limit, self._size)
+        offset = min(offset, stop)
+        return pd.DataFrame({c: self.frame_values(c, self._data[c][offset:stop]) for c in columns},
+                            columns=columns, index=pd.RangeIndex(offset, stop))
+
+    def frame_values(self, column, values):
+        """Values of a column (a copy) in the DataFrame dtype of its schema field."""
+        field = self.schema.get(column)
+        return values.copy() if field is None else field.frame_values(values)
+
+    def to_frame(self):
+        """Materialize the table as a DataFrame, cached until the next write.
+
+        Columns with a schema field get its compact dtype: categoricals,
+        nullable small integers.
+        """
+        if self._frame_version != self.version:
+            self._frame = pd.DataFrame(
+                {c: self.frame_values(
+                    c, self._data[c][:self._size]) for c in self.columns},
+                columns=self.columns)
+            self._frame_version = self.version
+        return self._frame
+
+
+class RegisterStore:
+    """The three register tables (models, risks and controls) of one workflow."""
+
+    def __init__(self, backend=None):
+        self.models = ColumnStore(
+            "models", MODEL_COLUMNS, MODEL_DTYPES, primary_key="model_id", schema=SCHEMA["models"])
+        self.risks = ColumnStore(
+            "risks", RISK_COLUMNS, RISK_DTYPES, primary_key="risk_id", schema=SCHEMA["risks"])
+        self.controls = ColumnStore(
+            "controls", CONTROL_COLUMNS, CONTROL_DTYPES, primary_key="control_id", schema=SCHEMA["controls"])
+        # Serves the drift helpers, which address risks by model and risk type
+        self.risks.add_index("model_risk_type", ["model_id", "risk_type"])
+        # Model names are unique; imports link risks to models by name
+        self.models.add_index("model_name", ["model_name"])
+        # Sessions sharing this register read concurrently and write one at a time
+        self.lock = RWLock()
+        self.backend = None
+        if backend is not None:
+            self.attach_backend(backend)
+
+    def tables(self):
+        return (self.models, self.risks, self.controls)
+
+    def table(self, name):
+        return getattr(self, name)
+
+    def attach_backend(self, backend):
+        """Load the persisted register, then write every later change through."""
+        with self.lock.write():
+            self.backend = backend
+            backend.load(self)
+            for table in self.tables():
+                table.subscribe(backend.on_write)
+
+    def read(self):
+        """Shared access for reads that must not see a write half done."""
+        return self.lock.read()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Exclusive access for a group of writes, committed as one backend transaction.
+
+        A failure rolls the backend back, but the tables keep the rows already
+        written, so a group of writes checks all of them before the first.
+        """
+        with self.lock.write():
+            if self.backend is None:
+                yield
+            else:
+                with self.backend.transaction():
+                    yield
+
+    def max_id(self, name):
+        key = self.table(name).max_key()
+        if self.backend is not None:
+            # Other processes on the same database add rows this store has not loaded
+            key = max(key, self.backend.max_key(name))
+        return key
+
+    def next_id(self, name):
+        """The next free primary key of a table; call inside transaction()."""
+        return self.max_id(name) + 1
+
+    def clear(self):
+        with self.transaction():
+            for table in self.tables():
+                table.clear()
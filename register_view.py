@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_PAGE_SIZE = 50
+PAGE_SIZES = [25, 50, 100, 500]
+# Text columns with at most this many distinct values are filtered by value, others by substring
+MAX_DISTINCT_VALUES = 200
+
+
+class FrameSource:
+    """Adapts a DataFrame (an as-of snapshot, a change log, ...) to the table interface."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.columns = list(frame.columns)
+        # A new frame is a new source, so cached queries never outlive it
+        self.version = None
+
+    def __len__(self):
+        return len(self.frame)
+
+    def column(self, name):
+        return self.frame[name].to_numpy()
+
+    def take(self, name, positions):
+        return self.column(name)[positions]
+
+    def frame_values(self, name, values):
+        # The frame's columns already have their display dtypes
+        return values
+
+
+def _is_numeric(values):
+    return values.dtype.kind in 'iuf'
+
+
+def _contains(values, text):
+    return pd.Series(values, dtype=object).str.contains(
+        text, case=False, regex=False, na=False).to_numpy(dtype=bool)
+
+
+def _text_key(values):
+    # Text sorts case-insensitively, with missing values last
+    return values.astype(str).str.lower().where(values.notna())
+
+
+class RegisterView:
+    """A filtered, sorted and projected window onto one register table.
+
+    The source is a ColumnStore, the FullRegisterView or a FrameSource: any
+    object with `columns`, `column(name)`, `take(name, positions)`,
+    `frame_values(name, values)`, `version` and `len()`. Filters and sort run on the column buffers and produce an
+    array of matching row positions, cached until the query or the source
+    version changes, so paging through the result only copies the rows of
+    one page.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._query = None
+        self._version = None
+        self._positions = None
+        self._distinct = {}
+
+    @property
+    def columns(self):
+        return list(self.source.columns)
+
+    def is_numeric(self, column):
+        return _is_numeric(self.source.column(column))
+
+    def distinct(self, column, limit=MAX_DISTINCT_VALUES):
+        """Sorted distinct values of a text column, or None when it has more than limit."""
+        version = self.source.version
+        cached = self._distinct.get(column)
+        if cached is None or version is None or cached[0] != version:
+            values = pd.unique(self.source.column(column))
+            values = [v for v in values if v is not None and not pd.isna(v)]
+            values = sorted(values, key=str) if len(values) <= limit else None
+            self._distinct[column] = cached = (version, values)
+        return cached[1]
+
+    def query(self, search=None, equals=None, contains=None, ranges=None, sort_by=None, ascending=True,
+              search_columns=None):
+        """Row positions matching every filter, in display order.
+
+        search is a case-insensitive substring looked for in any text column
+        (of search_columns, or of all columns); equals maps columns to the
+        values they may take, contains maps text columns to a substring they
+        must contain and ranges maps numeric columns to (low, high) bounds.
+        """
+        key = (search or None, tuple(sorted((c, tuple(v)) for c, v in (equals or {}).items())),
+               tuple(sorted((contains or {}).items())), tuple(
+                   sorted((ranges or {}).items())),
+               sort_by, ascending, tuple(search_columns) if search_columns else None)
+        version = self.source.version
+        if self._positions is not None and key == self._query and version is not None and version == self._version:
+            return self._positions
+        mask = np.ones(len(self.source), dtype=bool)
+        for column, values in (equals or {}).items():
+            mask &= pd.Series(self.source.column(column)).isin(
+                list(values)).to_numpy()
+        for column, (low, high) in (ranges or {}).items():
+            values = self.source.column(column)
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        positions = np.flatnonzero(mask)
+        # Substring tests only look at the rows left by the cheaper filters
+        for column, text in (contains or {}).items():
+            if text:
+                positions = positions[_contains(
+                    self.source.column(column)[positions], text)]
+        if search:
+            found = np.zeros(len(positions), dtype=bool)
+            for column in search_columns or self.columns:
+                values = self.source.column(column)
+                if not _is_numeric(values):
+                    found |= _contains(values[positions], search)
+            positions = positions[found]
+        if sort_by is not None and len(positions):
+            values = pd.Series(self.source.column(sort_by)[positions])
+            order = values.sort_values(ascending=ascending, kind='stable', na_position='last',
+                                       key=None if _is_numeric(values.to_numpy()) else _text_key).index
+            positions = positions[order.to_numpy()]
+        self._query, self._version, self._positions = key, version, positions
+        return positions
+
+    def page(self, positions, number, size, columns=None):
+        """DataFrame of page `number` (from 0) of the matching rows, with only the given columns."""
+        columns = list(columns or self.columns)
+        window = positions[number * size:(number + 1) * size]
+        return pd.DataFrame({c: self.source.frame_values(c, self.source.take(c, window)) for c in columns},
+                            columns=columns, index=pd.Index(window))
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+from register_store import ColumnStore
+
+
+# Share of a risk's composite score a control removes at full effectiveness,
+# by risk response. A control of effectiveness e (1-5) removes
+# MAX_REDUCTION * (e - 1) / 4: an ineffective control removes nothing and an
+# avoided risk with a fully effective control is eliminated.
+MAX_REDUCTION = {'Mitigate': 0.8, 'Transfer': 0.6, 'Avoid': 1.0, 'Accept': 0.0}
+SCORE_DECIMALS = 2
+
+_RISK_COLUMNS = ['residual_risk_score', 'log_factor', 'eliminated']
+_RISK_DTYPES = {'residual_risk_score': np.float64,
+                'log_factor': np.float64, 'eliminated': np.int64}
+_CONTROL_COLUMNS = ['risk_pos', 'log_factor', 'eliminates']
+_CONTROL_DTYPES = {'risk_pos': np.int64,
+                   'log_factor': np.float64, 'eliminates': np.int64}
+
+
+def control_reduction(effectiveness_scores, risk_responses):
+    """Share of the risk each control removes; 0 for controls not yet assessed."""
+    effectiveness = np.asarray(effectiveness_scores, dtype=np.float64)
+    maximum = pd.Series(risk_responses, dtype=object).map(
+        MAX_REDUCTION).to_numpy(dtype=np.float64, na_value=0.0)
+    reduction = maximum * np.clip((effectiveness - 1) / 4, 0, 1)
+    return np.nan_to_num(reduction, nan=0.0)
+
+
+def _contributions(reduction):
+    # Controls combine multiplicatively, so a risk's factor is a sum of logs;
+    # eliminating controls are counted instead, as log(0) cannot be undone
+    eliminates = reduction >= 1
+    with np.errstate(divide='ignore'):
+        log_factor = np.where(eliminates, 0.0, np.log1p(-reduction))
+    return log_factor, eliminates.astype(np.int64)
+
+
+class ResidualRisk:
+    """Residual score of every risk after its controls, kept current as risks and controls change.
+
+    residual = composite score x the product over the risk's controls of
+    (1 - reduction), with each control's reduction set by its effectiveness
+    and risk response (see MAX_REDUCTION). `scores` is a ColumnStore aligned
+    with the risks table; each risk keeps the sum of its controls' log
+    factors, so a control write is a vectorized group-by of the changed
+    controls only, however many controls the portfolio holds. Controls of a
+    risk that is not registered are ignored, as in the full register, until
+    the risk is registered.
+    """
+
+    def __init__(self, register):
+        self.register = register
+        self.scores = ColumnStore(
+            "residual_risks", _RISK_COLUMNS, _RISK_DTYPES)
+        self._controls = ColumnStore(
+            "residual_controls", _CONTROL_COLUMNS, _CONTROL_DTYPES)
+        self.rebuild()
+        register.risks.subscribe(self._on_risks)
+        register.controls.subscribe(self._on_controls)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def rebuild(self):
+        """Recompute every residual score from the risks and controls tables."""
+        risks, controls = self.register.risks, self.register.controls
+        self.scores.clear()
+        self._controls.clear()
+        # Positions of controls waiting for their risk, per risk ID
+        self._orphans = {}
+        if len(risks):
+            self.scores.extend({'residual_risk_score': risks.column('composite_risk_score'),
+                                'log_factor': np.zeros(len(risks)),
+                                'eliminated': np.zeros(len(risks), dtype=np.int64)})
+        if len(controls):
+            self._on_controls(controls, "insert",
+                              np.arange(len(controls)), None)
+
+    def _residual(self, positions, log_factor=None, eliminated=None):
+        if log_factor is None:
+            log_factor = self.scores.column('log_factor')[positions]
+            eliminated = self.scores.column('eliminated')[positions]
+        composite = self.register.risks.column(
+            'composite_risk_score')[positions]
+        factor = np.where(eliminated > 0, 0.0, np.exp(log_factor))
+        return np.round(composite * factor, SCORE_DECIMALS)
+
+    def _on_risks(self, table, kind, positions, columns):
+        if kind == "clear":
+            self.rebuild()
+        elif kind == "insert":
+            n = len(positions)
+            self.scores.extend({'residual_risk_score': table.column('composite_risk_score')[positions],
+                                'log_factor': np.zeros(n), 'eliminated': np.zeros(n, dtype=np.int64)})
+            if self._orphans:
+                self._adopt(table.column('risk_id')[positions])
+        elif 'composite_risk_score' in columns:
+            self.scores.set_many(
+                positions, {'residual_risk_score': self._residual(positions)})
+
+    def _control_values(self, table, positions):
+        risk_pos = self.register.risks.positions(
+            table.column('risk_id')[positions])
+        log_factor, eliminates = _contributions(control_reduction(
+            table.column('effectiveness_score')[positions], table.column('risk_response')[positions]))
+        return {'risk_pos': risk_pos, 'log_factor': log_factor, 'eliminates': eliminates}
+
+    def _track_orphans(self, table, positions, risk_pos):
+        for cp in positions[risk_pos < 0].tolist():
+            self._orphans.setdefault(
+                int(table.get(cp, 'risk_id')), []).append(cp)
+
+    def _adopt(self, risk_ids):
+        # Controls registered before their risk now count towards it
+        controls = self.register.controls
+        adopted = np.array(sorted(cp for key in risk_ids.tolist()
+                                  for cp in self._orphans.pop(key, ())), dtype=np.int64)
+        # A control moved to another risk since is no longer waiting
+        adopted = adopted[self._controls.column('risk_pos')[adopted] < 0]
+        if not len(adopted):
+            return
+        new = self._control_values(controls, adopted)
+        self._controls.set_many(adopted, new)
+        self._apply(new['risk_pos'], new['log_factor'], new['eliminates'])
+
+    def _apply(self, risk_pos, log_factor, eliminates):
+        # Group the changes by risk: one update per affected risk
+        linked = risk_pos >= 0
+        risks, group = np.unique(risk_pos[linked], return_inverse=True)
+        if not len(risks):
+            return
+        log_sum = self.scores.column('log_factor')[risks] + np.bincount(
+            group, weights=log_factor[linked], minlength=len(risks))
+        eliminated = self.scores.column('eliminated')[risks] + np.bincount(
+            group, weights=eliminates[linked], minlength=len(risks)).astype(np.int64)
+        self.scores.set_many(risks, {'log_factor': log_sum, 'eliminated': eliminated,
+                                     'residual_risk_score': self._residual(risks, log_sum, eliminated)})
+
+    def _on_controls(self, table, kind, positions, columns):
+        if kind == "clear":
+            self.rebuild()
+            return
+        if kind == "insert":
+            new = self._control_values(table, positions)
+            self._controls.extend(new)
+            self._track_orphans(table, positions, new['risk_pos'])
+            self._apply(new['risk_pos'], new['log_factor'], new['eliminates'])
+            return
+        if not {'risk_id', 'effectiveness_score', 'risk_response'} & set(columns):
+            return
+        old = {c: self._controls.column(c)[positions].copy()
+               for c in _CONTROL_COLUMNS}
+        new = self._control_values(table, positions)
+        self._controls.set_many(positions, new)
+        self._track_orphans(table, positions, new['risk_pos'])
+        # Take out the old contributions and add the new ones in one pass
+        self._apply(np.concatenate([old['risk_pos'], new['risk_pos']]),
+                    np.concatenate([-old['log_factor'], new['log_factor']]),
+                    np.concatenate([-old['eliminates'], new['eliminates']]))
+
+    def residual(self, positions=None):
+        """Residual scores of the risks at the given positions (all by default)."""
+        column = self.scores.column('residual_risk_score')
+        return column.copy() if positions is None else column[positions]
+
+    def portfolio_summary(self, taxonomy=None):
+        """Risk count, total composite and residual score and reduction, per broad category.
+
+        Without a taxonomy the summary has one row for the whole portfolio.
+        """
+        composite = self.register.risks.column('composite_risk_score')
+        residual = self.scores.column('residual_risk_score')
+        if taxonomy is None:
+            labels = np.array(["All risks"], dtype=object)
+            codes = np.zeros(len(composite), dtype=np.int64)
+        else:
+            labels = np.array(list(taxonomy.categories) +
+                              ["Uncategorized"], dtype=object)
+            codes = taxonomy.category_codes(
+                self.register.risks.column('risk_type'))
+            codes = np.where(codes < 0, len(labels) - 1, codes)
+        scored = ~np.isnan(composite)
+        count = np.bincount(codes, minlength=len(labels))
+        total_composite = np.bincount(codes[scored], weights=composite[scored],
+                                      minlength=len(labels))
+        total_residual = np.bincount(codes[scored], weights=residual[scored],
+                                     minlength=len(labels))
+        present = count > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            reduction = np.where(total_composite > 0,
+                                 1 - total_residual / total_composite, 0.0)
+        return pd.DataFrame({
+            'category': labels[present], 'risks': count[present],
+            'total_composite_score': total_composite[present],
+            'total_residual_score': np.round(total_residual[present], SCORE_DECIMALS),
+            'reduction_pct': np.round(100 * reduction[present], 1),
+        })
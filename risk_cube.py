@@ -0,0 +1,270 @@
+import numpy as np
+import pandas as pd
+
+from register_store import ColumnStore
+
+
+# Cube dimensions, in key order: three model attributes and the broad risk category
+MODEL_DIMENSIONS = ['status', 'owner', 'use_case']
+DIMENSIONS = MODEL_DIMENSIONS + ['category']
+MEASURES = ['risks', 'scored_risks', 'total_score', 'mean_score', 'max_score']
+UNSPECIFIED = "Unspecified"
+UNCATEGORIZED = "Uncategorized"
+
+_RISK_COLUMNS = ['model_pos', 'cell', 'value']
+_MODEL_DTYPES = {d: np.int64 for d in MODEL_DIMENSIONS}
+
+
+class RiskCube:
+    """Risk counts and composite score totals and maxima over model status, owner, use case and broad category.
+
+    Every combination of the four dimensions present in the register is a
+    cell, and each cell keeps a histogram of its risks' composite scores
+    (slot 0 counts unscored risks). Composite scores are products of two 1-5
+    scores, so the histograms are narrow, and counts, sums and maxima all
+    follow from them; unlike a running maximum, a histogram can take a score
+    back out. Adds, score changes and model edits move the affected risks
+    between histogram slots, and slices and drill-downs aggregate cells
+    only, never risk rows.
+    """
+
+    def __init__(self, register, taxonomy=None):
+        self.register = register
+        self.taxonomy = taxonomy
+        self._models = ColumnStore(
+            "cube_models", MODEL_DIMENSIONS, _MODEL_DTYPES)
+        self._risks = ColumnStore("cube_risks", _RISK_COLUMNS,
+                                  {c: np.int64 for c in _RISK_COLUMNS})
+        # Bumped on every change, so callers can cache what they render
+        self.version = 0
+        self.rebuild()
+        register.models.subscribe(self._on_models)
+        register.risks.subscribe(self._on_risks)
+
+    def set_taxonomy(self, taxonomy):
+        """Group risks into broad categories with a compiled TaxonomyIndex."""
+        if taxonomy is not self.taxonomy:
+            self.taxonomy = taxonomy
+            self.rebuild()
+
+    def rebuild(self):
+        """Recompute every cell from the models and risks tables."""
+        self._labels = {d: [] for d in DIMENSIONS}
+        self._codes = {d: {} for d in DIMENSIONS}
+        for category in (self.taxonomy.categories if self.taxonomy else []):
+            self._code('category', category)
+        self._cells = {}
+        self._cell_codes = np.zeros((0, len(DIMENSIONS)), dtype=np.int64)
+        self._values = [np.nan]
+        self._value_codes = {}
+        self._hist = np.zeros((16, 8), dtype=np.int64)
+        self._unresolved = 0
+        self._models.clear()
+        self._risks.clear()
+        models, risks = self.register.models, self.register.risks
+        if len(models):
+            self._models.extend(self._model_codes(np.arange(len(models))))
+        if len(risks):
+            self._insert_risks(np.arange(len(risks)))
+        self.version += 1
+
+    def _code(self, dimension, label):
+        codes = self._codes[dimension]
+        if label not in codes:
+            codes[label] = len(self._labels[dimension])
+            self._labels[dimension].append(label)
+        return codes[label]
+
+    def _encode(self, dimension, values):
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        mapped = np.array([self._code(dimension, label) for label in uniques.tolist()] +
+                          [self._code(dimension, UNSPECIFIED)], dtype=np.int64)
+        # factorize marks missing values with -1, i.e. the last (UNSPECIFIED) entry
+        return mapped[codes]
+
+    def _model_codes(self, positions):
+        models = self.register.models
+        return {d: self._encode(d, models.column(d)[positions]) for d in MODEL_DIMENSIONS}
+
+    def _cell_ids(self, codes):
+        # Pack each row of codes into one integer so combinations hash in a single pass
+        radix = np.array([len(self._labels[d])
+                         for d in DIMENSIONS], dtype=np.int64)
+        packed = np.zeros(len(codes), dtype=np.int64)
+        for i in range(len(DIMENSIONS)):
+            packed = packed * radix[i] + codes[:, i]
+        inverse, uniques = pd.factorize(packed)
+        combos = np.empty((len(uniques), len(DIMENSIONS)), dtype=np.int64)
+        for i in reversed(range(len(DIMENSIONS))):
+            uniques, combos[:, i] = np.divmod(uniques, radix[i])
+        ids = np.empty(len(combos), dtype=np.int64)
+        for i, combo in enumerate(map(tuple, combos.tolist())):
+            cell = self._cells.get(combo)
+            if cell is None:
+                cell = self._cells[combo] = len(self._cells)
+            ids[i] = cell
+        if len(self._cells) > len(self._cell_codes):
+            self._cell_codes = np.array(list(self._cells), dtype=np.int64)
+        return ids[inverse]
+
+    def _value_ids(self, scores):
+        ids = np.zeros(len(scores), dtype=np.int64)
+        scored = ~np.isnan(scores)
+        inverse, uniques = pd.factorize(scores[scored])
+        mapped = np.empty(len(uniques), dtype=np.int64)
+        for i, value in enumerate(uniques.tolist()):
+            code = self._value_codes.get(value)
+            if code is None:
+                code = self._value_codes[value] = len(self._values)
+                self._values.append(value)
+            mapped[i] = code
+        ids[scored] = mapped[inverse]
+        return ids
+
+    def _risk_state(self, positions):
+        risks = self.register.risks
+        model_pos = self.register.models.positions(
+            risks.column('model_id')[positions])
+        codes = np.empty((len(positions), len(DIMENSIONS)), dtype=np.int64)
+        registered = model_pos >= 0
+        for i, dimension in enumerate(MODEL_DIMENSIONS):
+            codes[:, i] = self._code(dimension, UNSPECIFIED)
+            codes[registered, i] = self._models.column(
+                dimension)[model_pos[registered]]
+        risk_types = risks.column('risk_type')[positions]
+        if self.taxonomy is None:
+            codes[:, -1] = self._code('category', UNCATEGORIZED)
+        else:
+            category = self.taxonomy.category_codes(risk_types)
+            codes[:, -1] = np.where(
+                category >= 0, category, self._code('category', UNCATEGORIZED))
+        return {'model_pos': model_pos, 'cell': self._cell_ids(codes),
+                'value': self._value_ids(risks.column('composite_risk_score')[positions])}
+
+    def _add(self, cells, values, count):
+        rows, columns = self._hist.shape
+        if len(self._cells) > rows or len(self._values) > columns:
+            grown = np.zeros((max(len(self._cells), 2 * rows), max(len(self._values), 2 * columns)),
+                             dtype=np.int64)
+            grown[:rows, :columns] = self._hist
+            self._hist = grown
+        np.add.at(self._hist, (cells, values), count)
+
+    def _insert_risks(self, positions):
+        state = self._risk_state(positions)
+        self._risks.extend(state)
+        self._add(state['cell'], state['value'], 1)
+        self._unresolved += int((state['model_pos'] < 0).sum())
+
+    def _move_risks(self, positions):
+        if not len(positions):
+            return
+        old_cells = self._risks.column('cell')[positions].copy()
+        old_values = self._risks.column('value')[positions].copy()
+        unresolved = int(
+            (self._risks.column('model_pos')[positions] < 0).sum())
+        state = self._risk_state(positions)
+        self._risks.set_many(positions, state)
+        self._add(old_cells, old_values, -1)
+        self._add(state['cell'], state['value'], 1)
+        self._unresolved += int((state['model_pos'] < 0).sum()) - unresolved
+        self.version += 1
+
+    def _on_models(self, table, kind, positions, columns):
+        if kind == "clear":
+            self.rebuild()
+            return
+        if kind == "insert":
+            self._models.extend(self._model_codes(positions))
+            if self._unresolved:
+                # Risks registered before their model now find it
+                self._move_risks(np.flatnonzero(
+                    self._risks.column('model_pos') < 0))
+            return
+        changed = [d for d in MODEL_DIMENSIONS if d in columns]
+        if 'model_id' in columns:
+            self.rebuild()
+        elif changed:
+            codes = self._model_codes(positions)
+            self._models.set_many(positions, {d: codes[d] for d in changed})
+            # Model edits are rare; finding the model's risks is one vectorized scan
+            self._move_risks(np.flatnonzero(
+                np.isin(self._risks.column('model_pos'), positions)))
+
+    def _on_risks(self, table, kind, positions, columns):
+        if kind == "clear":
+            self.rebuild()
+        elif kind == "insert":
+            self._insert_risks(positions)
+            self.version += 1
+        elif {'model_id', 'risk_type', 'composite_risk_score'} & set(columns):
+            self._move_risks(positions)
+
+    def labels(self, dimension):
+        """Sorted values of a dimension that have at least one risk."""
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown cube dimension '{dimension}'.")
+        populated = self._hist[:len(self._cells)].sum(axis=1) > 0
+        codes = np.unique(self._cell_codes[populated,
+                          DIMENSIONS.index(dimension)])
+        return sorted((self._labels[dimension][c] for c in codes.tolist()), key=str)
+
+    def _select(self, filters):
+        # Cells inside the slice: each filtered dimension takes one of its listed values
+        selected = np.ones(len(self._cells), dtype=bool)
+        for dimension, values in (filters or {}).items():
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Unknown cube dimension '{dimension}'.")
+            if isinstance(values, str) or not np.iterable(values):
+                values = [values]
+            codes = [self._codes[dimension][v]
+                     for v in values if v in self._codes[dimension]]
+            selected &= np.isin(
+                self._cell_codes[:, DIMENSIONS.index(dimension)], codes)
+        return np.flatnonzero(selected)
+
+    def _measures(self, hist):
+        values = np.array(self._values[1:], dtype=np.float64)
+        scored = hist[:, 1:len(self._values)]
+        scored_risks = scored.sum(axis=1)
+        total = scored @ values
+        present = scored > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(scored_risks > 0, total / scored_risks, np.nan)
+        maximum = np.where(present, values, -
+                           np.inf).max(axis=1, initial=-np.inf)
+        return {'risks': hist.sum(axis=1), 'scored_risks': scored_risks, 'total_score': total,
+                'mean_score': mean, 'max_score': np.where(scored_risks > 0, maximum, np.nan)}
+
+    def summary(self, filters=None):
+        """Measures of one slice, e.g. summary({'status': 'Production', 'category': 'Model Risk'}).
+
+        filters maps dimensions to a value or a list of values; dimensions
+        left out are not constrained.
+        """
+        cells = self._select(filters)
+        hist = self._hist[cells, :len(self._values)].sum(axis=0, keepdims=True)
+        return {name: values[0].item() for name, values in self._measures(hist).items()}
+
+    def drill_down(self, by, filters=None):
+        """Measures of a slice broken down by one dimension or a list of them.
+
+        Returns a DataFrame with a column per dimension in by, then MEASURES,
+        with one row per combination that has risks in the slice.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        for dimension in by:
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Unknown cube dimension '{dimension}'.")
+        cells = self._select(filters)
+        hist = self._hist[cells, :len(self._values)]
+        cells, hist = cells[hist.sum(axis=1) > 0], hist[hist.sum(axis=1) > 0]
+        keys = self._cell_codes[cells][:, [DIMENSIONS.index(d) for d in by]]
+        groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+        grouped = np.zeros((len(groups), hist.shape[1]), dtype=np.int64)
+        np.add.at(grouped, inverse.ravel(), hist)
+        frame = pd.DataFrame({d: [self._labels[d][c] for c in groups[:, i].tolist()]
+                              for i, d in enumerate(by)}, columns=by)
+        for name, values in self._measures(grouped).items():
+            frame[name] = values
+        return frame.sort_values(by, key=lambda labels: labels.astype(str), ignore_index=True)
@@ -0,0 +1,244 @@
+"""Near-duplicate detection for risk hazard descriptions.
+
+Each description is reduced to its set of word shingles (runs of
+shingle_size words, common words dropped) and a MinHash signature: for each
+of num_perm random orderings of all shingles, the lowest-ranked shingle the
+description contains. Two signatures agree in a position with probability
+equal to the Jaccard similarity of the shingle sets. Signatures are cut into
+bands, and descriptions sharing a whole band land in the same bucket
+(locality-sensitive hashing). Only pairs that share a bucket are compared, so
+the pass is close to linear in the number of risks rather than quadratic.
+Pairs whose estimated similarity reaches the threshold are joined into
+groups, and each group becomes a merge suggestion. Nothing is merged
+automatically. Usage as a command line tool:
+
+    python risk_dedup.py --db risk_register.db --threshold 0.6 --out suggestions.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from text_index import word_codes
+
+
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_NUM_PERM = 128
+# Words too common to tell two hazards apart
+STOP_WORDS = frozenset("""a an and are as at be by can could due for from has have in into is it its
+    of on or over than that the their this to under was which while with within without""".split())
+# Buckets larger than this contribute pairs with their first member only
+MAX_BUCKET = 100
+
+
+def shingles(texts, shingle_size=1):
+    """Distinct shingles of each text, as (text number, shingle code) arrays sorted by text."""
+    parents, codes, words = word_codes(texts)
+    kept = ~np.array([w in STOP_WORDS for w in words], dtype=bool)[codes]
+    parents, codes = parents[kept], codes[kept]
+    if shingle_size > 1 and len(codes):
+        # A shingle starts at every word followed by shingle_size - 1 words of the same text
+        last = len(codes) - shingle_size + 1
+        starts = np.flatnonzero(parents[:last] == parents[shingle_size - 1:])
+        keys = np.zeros(len(starts), dtype=np.int64)
+        for offset in range(shingle_size):
+            keys = keys * len(words) + codes[starts + offset]
+        parents, codes = parents[starts], keys
+    codes = pd.factorize(codes)[0].astype(np.int64)
+    order = np.lexsort((codes, parents))
+    parents, codes = parents[order], codes[order]
+    distinct = np.ones(len(codes), dtype=bool)
+    distinct[1:] = (parents[1:] != parents[:-1]) | (codes[1:] != codes[:-1])
+    return parents[distinct], codes[distinct]
+
+
+def minhash_signatures(texts, num_perm=DEFAULT_NUM_PERM, shingle_size=1, seed=0):
+    """MinHash signature of every text, shape (len(texts), num_perm).
+
+    Texts without shingles get a row of the maximum value, which matches
+    nothing, and a False entry in the returned mask of texts with shingles.
+    """
+    parents, codes = shingles(texts, shingle_size)
+    signatures = np.full((len(texts), num_perm),
+                         np.iinfo(np.uint32).max, dtype=np.uint32)
+    has_shingles = np.zeros(len(texts), dtype=bool)
+    if not len(codes):
+        return signatures, has_shingles
+    docs, starts = np.unique(parents, return_index=True)
+    has_shingles[docs] = True
+    rng = np.random.default_rng(seed)
+    n_shingles = int(codes.max()) + 1
+    for i in range(num_perm):
+        # A random rank per shingle stands in for a random ordering of all shingles
+        rank = rng.integers(0, np.iinfo(np.uint32).max,
+                            n_shingles, dtype=np.uint32)
+        signatures[docs, i] = np.minimum.reduceat(rank[codes], starts)
+    return signatures, has_shingles
+
+
+def lsh_bands(num_perm, threshold):
+    """(bands, rows) for LSH: the highest collision threshold (1/bands)^(1/rows) not above threshold."""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def _bucket_pairs(keys):
+    # Pairs of positions with equal keys; large buckets are paired with their first member
+    codes = pd.factorize(keys)[0]
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(codes)) + 1]
+    sizes = np.diff(np.r_[starts, len(codes)])
+    start = np.repeat(starts, sizes)
+    size = np.repeat(sizes, sizes)
+    rank = np.arange(len(codes)) - start
+    large = (size > MAX_BUCKET) & (rank > 0)
+    pairs = [np.stack([order[start[large]], order[large]])]
+    small = np.flatnonzero((size > 1) & (size <= MAX_BUCKET))
+    offset = 1
+    while len(small):
+        small = small[rank[small] + offset < size[small]]
+        pairs.append(np.stack([order[small], order[small + offset]]))
+        offset += 1
+    return np.concatenate(pairs, axis=1)
+
+
+def candidate_pairs(signatures, has_shingles, bands, rows):
+    """Distinct (i, j) pairs with i < j that share at least one LSH band."""
+    docs = np.flatnonzero(has_shingles)
+    found = []
+    for band in range(bands):
+        block = signatures[docs, band *
+                           rows:(band + 1) * rows].astype(np.uint64)
+        key = np.zeros(len(docs), dtype=np.uint64)
+        for column in block.T:
+            # Order-sensitive mix of the band's values; collisions are removed by verification
+            key = (key * np.uint64(0x100000001B3)) ^ column
+        found.append(docs[_bucket_pairs(key)])
+    pairs = np.concatenate(found, axis=1)
+    pairs = np.sort(pairs, axis=0)
+    unique = pd.unique(pairs[0] * np.int64(len(signatures)) + pairs[1])
+    return np.stack(np.divmod(unique, len(signatures)))
+
+
+def estimated_similarity(signatures, first, second, chunk=100000):
+    """Share of equal signature positions, an estimate of each pair's Jaccard similarity."""
+    similarity = np.empty(len(first))
+    for start in range(0, len(first), chunk):
+        stop = start + chunk
+        similarity[start:stop] = (signatures[first[start:stop]] ==
+                                  signatures[second[start:stop]]).mean(axis=1)
+    return similarity
+
+
+def connected_groups(n, first, second):
+    """Group label (the smallest member) of each of n items, joining every pair."""
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[first], labels[second])
+        before = labels.copy()
+        np.minimum.at(labels, first, low)
+        np.minimum.at(labels, second, low)
+        # Pointer jumping: follow labels to their own label until they settle
+        labels = labels[labels]
+        if np.array_equal(labels, before):
+            return labels
+
+
+def _similar_pairs(signatures, has_shingles, threshold):
+    bands, rows = lsh_bands(signatures.shape[1], threshold)
+    first, second = candidate_pairs(signatures, has_shingles, bands, rows)
+    similarity = estimated_similarity(signatures, first, second)
+    similar = similarity >= threshold
+    return first[similar], second[similar], similarity[similar]
+
+
+def near_duplicates(texts, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, shingle_size=1, seed=0):
+    """Pairs of texts whose estimated Jaccard similarity is at least threshold.
+
+    Returns (first, second, similarity) arrays, with first < second.
+    """
+    signatures, has_shingles = minhash_signatures(
+        texts, num_perm, shingle_size, seed)
+    return _similar_pairs(signatures, has_shingles, threshold)
+
+
+def merge_suggestions(register, threshold=DEFAULT_THRESHOLD, same_model=False, num_perm=DEFAULT_NUM_PERM,
+                      shingle_size=1, seed=0):
+    """Groups of risks with near-duplicate hazard descriptions, one row per risk.
+
+    In each group the first registered risk is suggested to be kept and the
+    others to be merged into it; similarity is the estimated similarity of
+    each risk's description to the kept one. With same_model only risks of
+    the same model are grouped.
+    """
+    risks = register.risks
+    texts = risks.column('hazard_description')
+    signatures, has_shingles = minhash_signatures(
+        texts, num_perm, shingle_size, seed)
+    first, second, _ = _similar_pairs(signatures, has_shingles, threshold)
+    if same_model:
+        model_ids = risks.column('model_id')
+        same = model_ids[first] == model_ids[second]
+        first, second = first[same], second[same]
+    columns = ['group', 'action', 'risk_id', 'model_id', 'risk_type', 'hazard_description',
+               'composite_risk_score', 'similarity']
+    if not len(first):
+        return pd.DataFrame(columns=columns)
+    labels = connected_groups(len(risks), first, second)
+    members = np.flatnonzero(np.bincount(
+        labels, minlength=len(risks))[labels] > 1)
+    # Positions are in register order, so a group's label is its first registered risk
+    keep = labels[members]
+    risk_ids = risks.column('risk_id')
+    frame = pd.DataFrame({
+        'group': pd.factorize(keep)[0] + 1,
+        'action': np.where(members == keep, "Keep",
+                           [f"Merge into risk {r}" for r in risk_ids[keep].tolist()]),
+        'risk_id': risk_ids[members], 'model_id': risks.column('model_id')[members],
+        'risk_type': risks.column('risk_type')[members],
+        'hazard_description': texts[members],
+        'composite_risk_score': risks.column('composite_risk_score')[members],
+        'similarity': np.round(estimated_similarity(signatures, members, keep), 2),
+    }, columns=columns)
+    return frame.sort_values(['group', 'risk_id'], ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Suggest merges of risks with near-duplicate hazard descriptions.")
+    parser.add_argument("--db", required=True,
+                        help="SQLite register (see QULAB_REGISTER_DB)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="minimum estimated Jaccard similarity of two descriptions")
+    parser.add_argument("--same-model", action="store_true",
+                        help="only group risks of the same model")
+    parser.add_argument("--shingle-size", type=int, default=1,
+                        help="words per shingle (2 compares word pairs, i.e. word order)")
+    parser.add_argument("--out", help="CSV file for the suggestions")
+    args = parser.parse_args(argv)
+
+    from register_backend import SQLiteBackend
+    from register_store import RegisterStore
+    register = RegisterStore()
+    backend = SQLiteBackend(args.db)
+    register.attach_backend(backend)
+    suggestions = merge_suggestions(register, args.threshold, args.same_model,
+                                    shingle_size=args.shingle_size)
+    merges = int((suggestions['action'] != "Keep").sum())
+    print(f"{merges} of {len(register.risks)} risks could be merged into "
+          f"{suggestions['group'].nunique() if merges else 0} kept risks.")
+    if args.out:
+        suggestions.to_csv(args.out, index=False)
+    else:
+        print(suggestions.to_string(index=False))
+    backend.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
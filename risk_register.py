@@ -0,0 +1,723 @@
+"""The register's workflow operations without a user interface.
+
+RiskRegister runs the operations of the app's pages (registering models,
+risks and controls, scoring, responses, monitoring updates, imports,
+snapshots and queries) on a RegisterStore built by build_register_store. It
+reports what it did as events rather than on-screen messages: every listener
+passed to subscribe() is called as listener(level, event, message, details),
+where level is "info", "success", "warning" or "error", event names what
+happened (e.g. "risk_added"), message is the text the app shows and details
+holds the IDs and counts involved. Without listeners nothing is formatted
+for display, so batch jobs run at full speed. utils.py is the Streamlit
+adapter: it shows each event as a message. Usage as a command line tool,
+re-scoring risks from a nightly monitoring export:
+
+    python risk_register.py --db risk_register.db --scores monitoring_scores.csv
+"""
+import argparse
+import collections
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from drift_detector import DriftDetector
+from drift_ingest import DriftIngestor, apply_score_updates
+from full_register import FullRegisterView
+from register_import import DEFAULT_CHUNK_SIZE, RegisterImporter, read_chunks
+from register_snapshot import restore_snapshot, save_snapshot
+from register_store import RegisterStore
+from residual_risk import ResidualRisk
+from risk_cube import RiskCube
+from risk_dedup import merge_suggestions
+from risk_simulation import simulate_portfolio, simulation_inputs
+from risk_taxonomy import AI_RISK_TAXONOMY, compile_taxonomy
+from score_history import ScoreHistory
+from text_index import TextIndex
+from top_risks import TopRisks
+
+
+def build_register_store(backend=None, snapshot=None):
+    """A RegisterStore with its derived views, loaded from backend (or an empty register from snapshot)."""
+    register = RegisterStore()
+    # Derived views subscribe before the backend loads so they see every row;
+    # residual scores come first, as the full register reads them
+    register.residual = ResidualRisk(register)
+    register.full_register = FullRegisterView(register, register.residual)
+    register.top_risks = TopRisks(register.full_register)
+    register.cube = RiskCube(register, compile_taxonomy(AI_RISK_TAXONOMY))
+    register.text_index = TextIndex(register)
+    if backend is not None:
+        register.attach_backend(backend)
+    register.snapshot_taxonomy = None
+    if snapshot and all(table.empty for table in register.tables()):
+        register.snapshot_taxonomy = restore_snapshot(
+            register, snapshot).taxonomy
+    # Scores loaded from the backend are the baseline of the history
+    register.history = ScoreHistory(register)
+    return register
+
+
+class RiskRegister:
+    """Workflow operations on one register, reported through event listeners.
+
+    Several RiskRegister objects may share one store (one per app session);
+    each has its own taxonomy and listeners.
+    """
+
+    def __init__(self, store, taxonomy=None):
+        self.store = store
+        self.taxonomy = taxonomy or getattr(
+            store, 'snapshot_taxonomy', None) or AI_RISK_TAXONOMY
+        self._listeners = []
+
+    @classmethod
+    def open(cls, path=None, snapshot=None):
+        """A register kept in the SQLite file at path (in memory without one)."""
+        from register_backend import SQLiteBackend
+        return cls(build_register_store(SQLiteBackend(path) if path else None, snapshot))
+
+    def close(self):
+        if self.store.backend is not None:
+            self.store.backend.close()
+
+    def subscribe(self, listener):
+        """Call listener(level, event, message, details) for every event."""
+        self._listeners.append(listener)
+
+    def _emit(self, level, event, message, **details):
+        # message is a callable so nothing is formatted when no one listens
+        if self._listeners:
+            text = message()
+            for listener in self._listeners:
+                listener(level, event, text, details)
+
+    def _compiled_taxonomy(self):
+        return compile_taxonomy(self.taxonomy)
+
+    # Reads
+
+    def table_frame(self, name):
+        with self.store.read():
+            # Materialized lazily by the register store and cached until the next
+            # write, so all sessions share one copy
+            return self.store.table(name).to_frame()
+
+    def row_count(self, name):
+        """Rows of a table, or of the full register ('full_register'), without building a frame."""
+        with self.store.read():
+            if name == 'full_register':
+                return len(self.store.full_register)
+            return len(self.store.table(name))
+
+    def versioned_frame(self, name):
+        """A register table plus the row_version of each row, read atomically.
+
+        Forms keep the versions they were rendered with and pass them back as
+        expected_versions, so edits made meanwhile by another session are not
+        overwritten.
+        """
+        with self.store.read():
+            table = self.store.table(name)
+            return table.to_frame().assign(row_version=table.row_versions(np.arange(len(table))))
+
+    def model_risks_frame(self, model_id, risk_type):
+        with self.store.read():
+            # Served from the (model_id, risk_type) index instead of a boolean-mask scan
+            positions = self.store.risks.lookup(
+                "model_risk_type", (model_id, risk_type))
+            return self.store.risks.to_frame().iloc[positions]
+
+    def full_register_frame(self):
+        with self.store.read():
+            # Maintained incrementally as models, risks and controls change
+            return self.store.full_register.to_frame()
+
+    def top_risks_frame(self, k=5, by=None, value=None, score='composite_risk_score'):
+        """The k highest-scoring risks as full register rows, or None if the register is empty.
+
+        by is None for the whole register, or 'model' (value is a model_id),
+        'owner' or 'category'; score is 'composite_risk_score', or
+        'residual_risk_score' to rank risks after their controls.
+        """
+        if not len(self.store.full_register):
+            self._emit("warning", "register_empty",
+                       lambda: "Full risk register is empty. Cannot identify top risks.")
+            return None
+        # The trackers are shared by every session, so selection runs under the write lock
+        with self.store.transaction():
+            top_risks = self.store.top_risks
+            top_risks.set_taxonomy(self._compiled_taxonomy())
+            if by == 'model':
+                value = self.store.models.position(value)
+            frame = top_risks.top_frame(k, by, value, score)
+        self._emit("success", "top_risks_identified",
+                   lambda: f"Top {k} risks identified.", k=k)
+        return frame
+
+    def residual_summary(self):
+        """Total composite and residual score per broad risk category."""
+        with self.store.read():
+            return self.store.residual.portfolio_summary(self._compiled_taxonomy())
+
+    def search_ids(self, query, table='risks', **equals):
+        """IDs of the rows of a register table whose description matches a full-text query.
+
+        Every word of the query must appear (case-insensitively, as a whole word),
+        "quoted phrases" in order, and a trailing * matches any word with that
+        prefix. equals keeps only rows whose columns have the given values, e.g.
+        search_ids('"data provenance"', model_id=2).
+        """
+        store = self.store.table(table)
+        with self.store.read():
+            positions = self.store.text_index.search(query, table)
+            for column, value in equals.items():
+                positions = positions[store.take(column, positions) == value]
+            return store.take(store.primary_key, positions).tolist()
+
+    def search_frame(self, query, table='risks'):
+        """Rows of a register table whose description matches a full-text query."""
+        store = self.store.table(table)
+        with self.store.read():
+            positions = self.store.text_index.search(query, table)
+            # In the table frames' dtypes, so scores show as whole numbers
+            return pd.DataFrame({c: store.frame_values(c, store.take(c, positions)) for c in store.columns},
+                                columns=store.columns)
+
+    def risk_cube(self):
+        """The shared risk cube, grouping risks by this register's taxonomy."""
+        cube = self.store.cube
+        taxonomy = self._compiled_taxonomy()
+        if cube.taxonomy is not taxonomy:
+            # The cube is shared by every session, so regrouping runs under the write lock
+            with self.store.transaction():
+                cube.set_taxonomy(taxonomy)
+        return cube
+
+    def cube_frame(self, by, filters=None):
+        """Risk counts and composite score total, mean and maximum of a slice, broken down by `by`.
+
+        by is one of 'status', 'owner', 'use_case' and 'category' (broad risk
+        category) or a list of them; filters maps dimensions to the values kept.
+        """
+        cube = self.risk_cube()
+        with self.store.read():
+            return cube.drill_down(by, filters)
+
+    def cube_summary(self, filters=None):
+        cube = self.risk_cube()
+        with self.store.read():
+            return cube.summary(filters)
+
+    def score_trajectory(self, risk_id):
+        with self.store.read():
+            # Served from the history's per-risk index, without replaying the log
+            return self.store.history.score_trajectory(risk_id)
+
+    def score_changes(self):
+        with self.store.read():
+            return self.store.history.changes()
+
+    def as_of(self, timestamp):
+        """Models, risks and controls frames as they were at a time."""
+        with self.store.read():
+            return self.store.history.as_of(timestamp)
+
+    # Models, risks and controls
+
+    def add_model(self, model_name, use_case, description, owner, status="In Development"):
+        with self.store.transaction():
+            # IDs come from the shared register, so concurrent sessions never collide
+            model_id = self.store.next_id("models")
+            self.store.models.append({
+                "model_id": model_id,
+                "model_name": model_name,
+                "use_case": use_case,
+                "description": description,
+                "owner": owner,
+                "status": status
+            })
+        self._emit("success", "model_added",
+                   lambda: f"Model '{model_name}' (ID: {model_id}) added successfully.", model_id=model_id)
+        return model_id
+
+    def add_risk(self, model_id, risk_type, hazard_description, likelihood_score=None, magnitude_score=None):
+        with self.store.transaction():
+            risk_id = self.store.next_id("risks")
+            self.store.risks.append({
+                "risk_id": risk_id,
+                "model_id": model_id,
+                "risk_type": risk_type,
+                "hazard_description": hazard_description,
+                "likelihood_score": likelihood_score,
+                "magnitude_score": magnitude_score,
+                "composite_risk_score": None
+            })
+        self._emit("info", "risk_added",
+                   lambda: f"Risk '{hazard_description}' (ID: {risk_id}) added for model {model_id}.",
+                   risk_id=risk_id, model_id=model_id)
+        return risk_id
+
+    def assign_risk_scores(self, risk_id, likelihood, magnitude):
+        """Set a risk's likelihood and magnitude; returns False if the risk is not registered."""
+        with self.store.transaction():
+            risks = self.store.risks
+            pos = risks.position(risk_id)
+            if pos is not None:
+                risks.set_many([pos], {'likelihood_score': likelihood,
+                                       'magnitude_score': magnitude})
+        if pos is None:
+            self._emit("warning", "risk_not_found",
+                       lambda: f"Risk ID {risk_id} not found.", risk_id=risk_id)
+            return False
+        self._emit("info", "risk_scored",
+                   lambda: f"Assigned likelihood ({likelihood}) and magnitude ({magnitude}) scores for risk ID {risk_id}.",
+                   risk_id=risk_id)
+        return True
+
+    def calculate_composite_score(self, risk_id):
+        """Composite score (likelihood x magnitude) of a risk, or None if it cannot be calculated."""
+        composite_score = None
+        with self.store.transaction():
+            risks = self.store.risks
+            pos = risks.position(risk_id)
+            if pos is not None:
+                likelihood = risks.get(pos, 'likelihood_score')
+                magnitude = risks.get(pos, 'magnitude_score')
+                if pd.notna(likelihood) and pd.notna(magnitude):
+                    # Scores are whole numbers, stored as floats so a missing one is NaN
+                    composite_score = int(likelihood * magnitude)
+                    risks.set(pos, 'composite_risk_score', composite_score)
+        if pos is None:
+            self._emit("warning", "risk_not_found",
+                       lambda: f"Risk ID {risk_id} not found.", risk_id=risk_id)
+        elif composite_score is None:
+            self._emit("warning", "scores_missing",
+                       lambda: f"Likelihood or magnitude scores missing for risk ID {risk_id}. Cannot calculate composite score.",
+                       risk_id=risk_id)
+        else:
+            self._emit("success", "composite_calculated",
+                       lambda: f"Calculated composite risk score ({composite_score}) for risk ID {risk_id}.",
+                       risk_id=risk_id)
+        return composite_score
+
+    def _check_versions(self, table, positions, ids, expected_versions, label):
+        # Mask of rows still at the version a form was rendered with; reports the others
+        if expected_versions is None:
+            return np.ones(len(positions), dtype=bool)
+        current = np.full(len(positions), -1, dtype=np.int64)
+        found = positions >= 0
+        current[found] = table.row_versions(positions[found])
+        unchanged = current == np.asarray(expected_versions, dtype=np.int64)
+        stale = [ids[i] for i in np.flatnonzero(found & ~unchanged)]
+        if stale:
+            self._emit("warning", "stale_rows",
+                       lambda: f"{label} ID(s) {stale} were changed in another session after this form was loaded and were not overwritten. Review the latest values and submit again.",
+                       ids=stale)
+        return unchanged | ~found
+
+    def assign_risk_scores_many(self, risk_ids, likelihoods, magnitudes, expected_versions=None):
+        """Score many risks at once; returns how many were updated.
+
+        With expected_versions (see versioned_frame), risks written since the
+        caller read them are left alone.
+        """
+        with self.store.transaction():
+            risks = self.store.risks
+            positions = risks.positions(risk_ids)
+            found = positions >= 0
+            # Optimistic concurrency: skip rows written since the caller read them
+            apply = found & self._check_versions(
+                risks, positions, risk_ids, expected_versions, "Risk")
+            risks.set_many(positions[apply], {
+                'likelihood_score': np.asarray(likelihoods, dtype=np.float64)[apply],
+                'magnitude_score': np.asarray(magnitudes, dtype=np.float64)[apply],
+            })
+        updated = int(apply.sum())
+        if updated:
+            self._emit("info", "risks_scored",
+                       lambda: f"Assigned likelihood and magnitude scores for {updated} risk(s).", count=updated)
+        if not found.all():
+            missing = [risk_ids[i] for i in np.flatnonzero(~found)]
+            self._emit("warning", "risk_not_found",
+                       lambda: f"Risk ID(s) {missing} not found.", ids=missing)
+        return updated
+
+    def calculate_composite_scores_all(self, risk_ids=None):
+        """Composite scores of every risk (or of risk_ids) with both scores; returns how many were calculated."""
+        with self.store.transaction():
+            risks = self.store.risks
+            if risk_ids is None:
+                positions = np.arange(len(risks))
+            else:
+                positions = risks.positions(risk_ids)
+                positions = positions[positions >= 0]
+            # Likelihood x magnitude over the whole column; NaN wherever a score is missing
+            composite = risks.take('likelihood_score', positions) * \
+                risks.take('magnitude_score', positions)
+            ready = np.flatnonzero(~np.isnan(composite))
+            risks.set_many(positions[ready], {
+                           'composite_risk_score': composite[ready]})
+            total = len(positions)
+        if len(ready):
+            self._emit("success", "composites_calculated",
+                       lambda: f"Calculated composite risk scores for {len(ready)} risk(s).", count=len(ready))
+        if len(ready) < total:
+            self._emit("warning", "scores_missing",
+                       lambda: f"Likelihood or magnitude scores missing for {total - len(ready)} risk(s). Cannot calculate their composite scores.",
+                       count=total - len(ready))
+        return len(ready)
+
+    def _check_scored_risk(self, model_id, risk_type, hazard_description, likelihood, magnitude):
+        # Operations writing several rows check the risk first: a failed
+        # transaction would leave the rows written before it in memory
+        self.store.risks.validate_row({
+            "risk_id": 0, "model_id": model_id, "risk_type": risk_type,
+            "hazard_description": hazard_description,
+            "likelihood_score": likelihood, "magnitude_score": magnitude})
+
+    def add_adversarial_risk(self, model_id, attack_type, description, likelihood, magnitude):
+        self._check_scored_risk(model_id, "Model Risk",
+                                f"{attack_type}: {description}", likelihood, magnitude)
+        with self.store.transaction():
+            risk_id = self.add_risk(
+                model_id, "Model Risk", f"{attack_type}: {description}")
+            self.assign_risk_scores(risk_id, likelihood, magnitude)
+            self.calculate_composite_score(risk_id)
+        self._emit("success", "adversarial_risk_added",
+                   lambda: f"Adversarial risk '{attack_type}' (ID: {risk_id}) added and scored for model {model_id}.",
+                   risk_id=risk_id, model_id=model_id)
+        return risk_id
+
+    def add_supply_chain_risk(self, model_name, model_use_case, model_description, model_owner, model_status,
+                              risk_type, hazard_description, likelihood, magnitude):
+        """Add a scored risk to the model named model_name, registering the model first if needed."""
+        self._check_scored_risk(
+            0, risk_type, hazard_description, likelihood, magnitude)
+        with self.store.transaction():
+            positions = self.store.models.lookup("model_name", (model_name,))
+            if positions:
+                model_id = int(self.store.models.get(
+                    positions[0], 'model_id'))
+                self._emit("info", "model_exists",
+                           lambda: f"Model '{model_name}' (ID: {model_id}) already exists. Using existing model_id.",
+                           model_id=model_id)
+            else:
+                # The first write: append() rejects an invalid model before storing it
+                model_id = self.add_model(
+                    model_name, model_use_case, model_description, model_owner, model_status)
+            risk_id = self.add_risk(model_id, risk_type, hazard_description)
+            self.assign_risk_scores(risk_id, likelihood, magnitude)
+            self.calculate_composite_score(risk_id)
+        self._emit("success", "supply_chain_risk_added",
+                   lambda: f"Supply chain/data provenance risk '{hazard_description}' (ID: {risk_id}) added and scored for model {model_id}.",
+                   risk_id=risk_id, model_id=model_id)
+        return model_id, risk_id
+
+    def add_control(self, risk_id, control_description):
+        with self.store.transaction():
+            control_id = self.store.next_id("controls")
+            self.store.controls.append({
+                "control_id": control_id,
+                "risk_id": risk_id,
+                "control_description": control_description,
+                "effectiveness_score": None,
+                "risk_response": None
+            })
+        self._emit("success", "control_added",
+                   lambda: f"Control '{control_description}' (ID: {control_id}) added for risk ID {risk_id}.",
+                   control_id=control_id, risk_id=risk_id)
+        return control_id
+
+    def add_rows(self, table, columns):
+        """Add many models, risks or controls given as column arrays; returns their IDs.
+
+        IDs are assigned by the register; the other columns may be left out.
+        A batch the schema rejects adds no rows.
+        """
+        store = self.store.table(table)
+        n = len(next(iter(columns.values()))) if columns else 0
+        with self.store.transaction():
+            start = self.store.next_id(table)
+            ids = np.arange(start, start + n, dtype=np.int64)
+            store.extend({**columns, store.primary_key: ids})
+        self._emit("success", "rows_added",
+                   lambda: f"Added {n} row(s) to the {table} register.", table=table, count=n)
+        return ids.tolist()
+
+    def assign_risk_response(self, control_id, effectiveness_score, risk_response):
+        """Set a control's effectiveness and risk response; returns False if the control is not registered."""
+        with self.store.transaction():
+            controls = self.store.controls
+            pos = controls.position(control_id)
+            if pos is not None:
+                controls.set_many([pos], {'effectiveness_score': effectiveness_score,
+                                          'risk_response': risk_response})
+        if pos is None:
+            self._emit("warning", "control_not_found",
+                       lambda: f"Control ID {control_id} not found.", control_id=control_id)
+            return False
+        self._emit("info", "response_assigned",
+                   lambda: f"Assigned effectiveness score ({effectiveness_score}) and risk response ('{risk_response}') for control ID {control_id}.",
+                   control_id=control_id)
+        return True
+
+    def assign_risk_responses_many(self, control_ids, effectiveness_scores, risk_responses, expected_versions=None):
+        """Set many controls' effectiveness and risk response; returns how many were updated."""
+        with self.store.transaction():
+            controls = self.store.controls
+            positions = controls.positions(control_ids)
+            found = positions >= 0
+            apply = found & self._check_versions(
+                controls, positions, control_ids, expected_versions, "Control")
+            controls.set_many(positions[apply], {
+                'effectiveness_score': np.asarray(effectiveness_scores, dtype=np.float64)[apply],
+                'risk_response': np.asarray(risk_responses, dtype=object)[apply],
+            })
+        updated = int(apply.sum())
+        if updated:
+            self._emit("info", "responses_assigned",
+                       lambda: f"Assigned effectiveness scores and risk responses for {updated} control(s).",
+                       count=updated)
+        if not found.all():
+            missing = [control_ids[i] for i in np.flatnonzero(~found)]
+            self._emit("warning", "control_not_found",
+                       lambda: f"Control ID(s) {missing} not found.", ids=missing)
+        return updated
+
+    # Monitoring
+
+    def record_drift_alert(self, model_id, risk_type, hazard_description_if_new, likelihood, magnitude):
+        """Rescore the model's risk of risk_type, or add it; returns the risk ID."""
+        with self.store.transaction(), self.store.history.source("drift alert"):
+            positions = self.store.risks.lookup(
+                "model_risk_type", (model_id, risk_type))
+            if positions:
+                risk_id = int(self.store.risks.get(positions[0], 'risk_id'))
+                self._emit("info", "drift_risk_updating",
+                           lambda: f"Updating existing risk ID {risk_id} for '{risk_type}' (model ID: {int(model_id)}).",
+                           risk_id=risk_id)
+                self.assign_risk_scores(risk_id, likelihood, magnitude)
+            else:
+                self._emit("info", "drift_risk_adding",
+                           lambda: f"Adding new risk '{risk_type}' for model ID: {int(model_id)}.", model_id=model_id)
+                risk_id = self.add_risk(model_id, risk_type,
+                                        hazard_description_if_new, likelihood, magnitude)
+            self.calculate_composite_score(risk_id)
+        self._emit("warning", "drift_alert_processed",
+                   lambda: "Data drift alert processed and risk assessment updated to reflect the new operational reality.",
+                   risk_id=risk_id)
+        return risk_id
+
+    def update_from_monitoring(self, model_id, risk_type, likelihood, magnitude):
+        """Rescore the model's risk of risk_type; returns its ID, or None if there is none."""
+        risk_id = None
+        with self.store.transaction(), self.store.history.source("monitoring"):
+            positions = self.store.risks.lookup(
+                "model_risk_type", (model_id, risk_type))
+            if positions:
+                risk_id = int(self.store.risks.get(positions[0], 'risk_id'))
+                self._emit("info", "monitoring_risk_updating",
+                           lambda: f"Updating risk assessment for risk ID {risk_id} ('{risk_type}') for model ID {int(model_id)}.",
+                           risk_id=risk_id)
+                self.assign_risk_scores(risk_id, likelihood, magnitude)
+                self.calculate_composite_score(risk_id)
+            else:
+                self._emit("warning", "risk_not_found",
+                           lambda: f"Risk type '{risk_type}' not found for model ID {int(model_id)}. No update performed.",
+                           model_id=model_id)
+        self._emit("success", "monitoring_update_recorded",
+                   lambda: "Risk assessment formally updated based on monitoring feedback.", risk_id=risk_id)
+        return risk_id
+
+    def update_from_monitoring_many(self, model_ids, risk_types, likelihoods, magnitudes=None):
+        """Bulk form of update_from_monitoring; magnitudes None keeps the assessed magnitudes.
+
+        Returns the number of risks updated.
+        """
+        with self.store.history.source("monitoring"):
+            updated, _ = apply_score_updates(self.store, model_ids, risk_types,
+                                             likelihoods, magnitudes)
+        if updated:
+            self._emit("success", "monitoring_updates_recorded",
+                       lambda: f"Risk assessment updated for {updated} risk(s) based on monitoring feedback.",
+                       count=updated)
+        if updated < len(model_ids):
+            self._emit("warning", "risk_not_found",
+                       lambda: f"{len(model_ids) - updated} model/risk type pair(s) not found. No update performed for them.",
+                       count=len(model_ids) - updated)
+        return updated
+
+    def ingest_drift_alerts(self, lines, window_seconds=60.0):
+        """Ingest JSONL drift alerts (see drift_ingest.py); returns the IngestStats."""
+        ingestor = DriftIngestor(
+            self.store, self.taxonomy, window_seconds=window_seconds)
+        with self.store.history.source("drift feed"):
+            stats = ingestor.run(lines)
+        self._emit("success", "drift_alerts_ingested",
+                   lambda: f"Drift alert stream processed: {stats.summary()}.", stats=stats)
+        for reason, count in stats.rejections.most_common():
+            self._emit("warning", "drift_alerts_rejected",
+                       lambda: f"{count} alert(s) rejected: {reason}.", reason=reason, count=count)
+        return stats
+
+    def detect_feature_drift(self, reference_file, current_file, features=None, bins=10):
+        """A DriftDetector fed with a reference and a current sample, or None if the check fails."""
+        reference_chunks = read_chunks(reference_file)
+        first = next(reference_chunks, None)
+        if first is None:
+            self._emit("warning", "reference_empty",
+                       lambda: "The reference sample is empty.")
+            return None
+        if features is None:
+            features = list(first.select_dtypes('number').columns)
+        detector = DriftDetector(features, bins)
+        try:
+            detector.update(first, 'reference')
+            detector.update_many(reference_chunks, 'reference')
+            detector.update_many(read_chunks(current_file), 'current')
+        except (KeyError, ValueError) as e:
+            self._emit("error", "drift_check_failed",
+                       lambda: f"Drift check failed: {e}")
+            return None
+        unmeasured = detector.unmeasured()
+        if len(unmeasured) == len(features):
+            # An empty sample is no evidence of drift, so there is no likelihood to apply
+            self._emit("warning", "drift_unmeasured",
+                       lambda: "The samples have no values for the checked features. No drift likelihood computed.")
+            return None
+        if unmeasured:
+            self._emit("warning", "drift_features_skipped",
+                       lambda: f"Skipped feature(s) without values in one of the samples: {', '.join(unmeasured)}.",
+                       features=unmeasured)
+        return detector
+
+    # Bulk operations
+
+    def import_files(self, models_file=None, risks_file=None, controls_file=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Import inventory files (see register_import.py); returns one ImportReport per file."""
+        importer = RegisterImporter(self.store, self.taxonomy, chunk_size)
+        try:
+            with self.store.history.source("bulk import"):
+                reports = importer.import_files(
+                    models_file, risks_file, controls_file)
+        except (ValueError, ImportError) as e:
+            self._emit("error", "import_failed",
+                       lambda: f"Import failed: {e}")
+            return []
+        for report in reports:
+            self._emit("warning" if report.rows_rejected else "success", "file_imported",
+                       report.summary, report=report)
+        return reports
+
+    def save_snapshot(self, path, format="arrow"):
+        """Write the register and taxonomy to a snapshot directory; returns the manifest, or None on failure."""
+        start = time.perf_counter()
+        try:
+            manifest = save_snapshot(self.store, path, self.taxonomy, format)
+        except (ValueError, ImportError, OSError) as e:
+            self._emit("error", "snapshot_failed",
+                       lambda: f"Snapshot failed: {e}")
+            return None
+        rows = {name: table['rows']
+                for name, table in manifest['tables'].items()}
+        self._emit("success", "snapshot_saved",
+                   lambda: f"Saved {rows['models']} models, {rows['risks']} risks and {rows['controls']} controls "
+                           f"to '{path}' in {time.perf_counter() - start:.2f}s.", path=path)
+        return manifest
+
+    def restore_snapshot(self, path):
+        """Replace the register's rows (and taxonomy) with a snapshot's; returns the Snapshot, or None on failure."""
+        start = time.perf_counter()
+        try:
+            with self.store.history.source("snapshot restore"):
+                snapshot = restore_snapshot(self.store, path)
+        except (ValueError, ImportError, OSError, KeyError) as e:
+            self._emit("error", "restore_failed",
+                       lambda: f"Restore failed: {e}")
+            return None
+        if snapshot.taxonomy:
+            self.taxonomy = snapshot.taxonomy
+        store = self.store
+        self._emit("success", "snapshot_restored",
+                   lambda: f"Restored {len(store.models)} models, {len(store.risks)} risks and "
+                           f"{len(store.controls)} controls from '{path}' in {time.perf_counter() - start:.2f}s.",
+                   path=path)
+        return snapshot
+
+    def simulate_losses(self, by='category', max_trials=100000, confidence=0.99, tolerance=0.02,
+                        seed=None, use_controls=True, workers=None):
+        """Monte Carlo portfolio loss simulation (see risk_simulation.py), or None without scored risks."""
+        with self.store.read():
+            # The simulation works on its own copy of the scores, so the register is not held
+            inputs = simulation_inputs(
+                self.store, by, self._compiled_taxonomy(), use_controls)
+        if not len(inputs):
+            self._emit("warning", "nothing_to_simulate",
+                       lambda: "No risks with both likelihood and magnitude scores to simulate.")
+            return None
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1)
+        result = simulate_portfolio(inputs, max_trials, seed, workers,
+                                    confidence=confidence, tolerance=tolerance)
+        self._emit("success", "losses_simulated",
+                   lambda: f"Simulated {result.trials:,} years of losses in {result.seconds:.1f}s.", result=result)
+        return result
+
+    def suggest_merges(self, threshold=0.6, same_model=False):
+        """Merge suggestions for near-duplicate risks (see risk_dedup.py)."""
+        with self.store.read():
+            suggestions = merge_suggestions(self.store, threshold, same_model)
+        merges = int((suggestions['action'] != "Keep").sum())
+        if merges:
+            self._emit("success", "duplicates_found",
+                       lambda: f"{merges} risk(s) look like near-duplicates of {suggestions['group'].nunique()} other risk(s).",
+                       count=merges)
+        else:
+            self._emit("info", "no_duplicates",
+                       lambda: "No near-duplicate risks found.")
+        return suggestions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Re-score risks from a monitoring export without the app.")
+    parser.add_argument("--db", required=True,
+                        help="SQLite register (see QULAB_REGISTER_DB)")
+    parser.add_argument("--scores", required=True,
+                        help="CSV or Parquet file with model_id, risk_type, likelihood_score and optionally "
+                             "magnitude_score; each row rescores that model's risk of that type")
+    parser.add_argument("--verbose", action="store_true",
+                        help="print every event, not just warnings and errors")
+    args = parser.parse_args(argv)
+
+    register = RiskRegister.open(args.db)
+    events = collections.Counter()
+
+    def report(level, event, message, details):
+        events[event] += 1
+        if args.verbose or level in ("warning", "error"):
+            print(f"{level}: {message}")
+
+    register.subscribe(report)
+    start = time.perf_counter()
+    rows = updated = 0
+    for chunk in read_chunks(args.scores):
+        magnitudes = chunk['magnitude_score'].to_numpy(
+            dtype=np.float64) if 'magnitude_score' in chunk else None
+        updated += register.update_from_monitoring_many(chunk['model_id'].astype(np.int64).tolist(),
+                                                        chunk['risk_type'].astype(
+                                                            str).tolist(),
+                                                        chunk['likelihood_score'].to_numpy(
+                                                            dtype=np.float64),
+                                                        magnitudes)
+        rows += len(chunk)
+    print(f"Re-scored {updated} risk(s) from {rows} score row(s) in {time.perf_counter() - start:.2f}s "
+          f"({events['risk_not_found']} warning(s)).")
+    register.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,310 @@
+"""Monte Carlo simulation of annual AI risk losses across the register.
+
+Each scored risk is a compound Poisson loss: its likelihood score sets the
+expected number of loss events per year and its magnitude score the median
+loss of an event, with lognormal spread around it. Scores between the
+anchors are interpolated, so coalesced or averaged scores work too.
+Optionally each loss is scaled by the risk's residual factor (residual /
+composite score), i.e. simulated after its controls.
+
+Trials run in batches. With several workers the batches go to a process
+pool; batch i always draws from the i-th child of the seed, and batches are
+consumed in order, so a seed gives the same result for any number of
+workers. Simulation stops early once the confidence interval of the
+portfolio VaR is narrower than `tolerance` (relative to the VaR).
+
+Usage as a command line tool:
+
+    python risk_simulation.py --db risk_register.db --by category --trials 200000 --seed 7
+"""
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# Expected loss events per year, by likelihood score (1=Rarely ... 5=Frequently)
+EVENTS_PER_YEAR = {1: 0.01, 2: 0.05, 3: 0.2, 4: 0.5, 5: 1.0}
+# Median loss of one event, by magnitude score (1=Minor ... 5=Catastrophic)
+MEDIAN_LOSS = {1: 1e4, 2: 1e5, 3: 1e6, 4: 1e7, 5: 5e7}
+# Lognormal spread of event losses around the median
+LOSS_SIGMA = 1.0
+GROUP_DIMENSIONS = ['model', 'owner', 'category']
+# Groups beyond this many (by expected loss) are reported together as "Other"
+MAX_GROUPS = 50
+DEFAULT_BATCH_SIZE = 2000
+# Batches are cut so one holds about this many loss events, bounding worker memory
+EVENTS_PER_BATCH = 2000000
+# Normal quantile of the 95% interval used for early stopping
+_Z95 = 1.96
+
+
+def _interpolate(scores, anchors):
+    # Log-linear between the anchor scores, clamped to the 1-5 scale
+    keys = np.array(sorted(anchors), dtype=np.float64)
+    values = np.log([anchors[k] for k in sorted(anchors)])
+    return np.exp(np.interp(np.clip(scores, keys[0], keys[-1]), keys, values))
+
+
+class SimulationInputs:
+    """Per-risk loss parameters and group codes, independent of the register."""
+
+    def __init__(self, likelihood_scores, magnitude_scores, groups, control_factors=None):
+        likelihood = np.asarray(likelihood_scores, dtype=np.float64)
+        magnitude = np.asarray(magnitude_scores, dtype=np.float64)
+        groups = pd.Series(groups, dtype=object).fillna("Unassigned")
+        scored = ~(np.isnan(likelihood) | np.isnan(magnitude))
+        self.unscored = int((~scored).sum())
+        self.frequency = _interpolate(likelihood[scored], EVENTS_PER_YEAR)
+        self.log_median = np.log(_interpolate(magnitude[scored], MEDIAN_LOSS))
+        factors = np.ones(len(likelihood)) if control_factors is None else \
+            np.nan_to_num(np.asarray(control_factors,
+                          dtype=np.float64), nan=1.0)
+        self.factor = factors[scored]
+        expected = self.frequency * \
+            np.exp(self.log_median + LOSS_SIGMA ** 2 / 2) * self.factor
+        # Largest groups by expected loss keep their own column
+        totals = pd.Series(expected).groupby(
+            groups[scored].to_numpy()).sum().sort_values(ascending=False)
+        kept = list(totals.index[:MAX_GROUPS])
+        if len(totals) > MAX_GROUPS:
+            kept.append("Other")
+        codes = pd.Categorical(groups[scored], categories=kept[:MAX_GROUPS]).codes.astype(
+            np.int64)
+        self.group_codes = np.where(codes < 0, len(kept) - 1, codes)
+        self.group_names = kept
+        self.group_risks = np.bincount(
+            self.group_codes, minlength=len(kept))
+        self.group_expected = np.bincount(
+            self.group_codes, weights=expected, minlength=len(kept))
+
+    def __len__(self):
+        return len(self.frequency)
+
+
+def simulation_inputs(register, by='category', taxonomy=None, use_controls=True):
+    """SimulationInputs for the risks of a register, grouped by model, owner or broad category."""
+    if by not in GROUP_DIMENSIONS:
+        raise ValueError(f"Unknown grouping '{by}'.")
+    risks, models = register.risks, register.models
+    model_positions = models.positions(risks.column('model_id'))
+    known = model_positions >= 0
+    if by == 'category':
+        groups = np.array([None] * len(risks), dtype=object) if taxonomy is None else \
+            np.asarray(taxonomy.categorize(
+                risks.column('risk_type')), dtype=object)
+    else:
+        column = 'model_name' if by == 'model' else 'owner'
+        groups = np.full(len(risks), None, dtype=object)
+        groups[known] = models.column(column)[model_positions[known]]
+    factors = None
+    if use_controls and getattr(register, 'residual', None) is not None:
+        composite = risks.column('composite_risk_score')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factors = np.where(
+                composite > 0, register.residual.residual() / composite, 1.0)
+    return SimulationInputs(risks.column('likelihood_score'), risks.column('magnitude_score'),
+                            groups, factors)
+
+
+def simulate_batch(inputs, seed, trials):
+    """Portfolio and per-group losses of `trials` simulated years: ((trials,), (trials, groups))."""
+    rng = np.random.default_rng(seed)
+    groups = len(inputs.group_names)
+    # Events per risk over the whole batch, then spread uniformly over its trials
+    counts = rng.poisson(inputs.frequency * trials)
+    risk = np.repeat(np.arange(len(inputs)), counts)
+    trial = rng.integers(0, trials, len(risk))
+    spread = rng.standard_normal(len(risk), dtype=np.float32)
+    loss = np.exp(inputs.log_median[risk] + LOSS_SIGMA *
+                  spread) * inputs.factor[risk]
+    by_group = np.bincount(trial * groups + inputs.group_codes[risk], weights=loss,
+                           minlength=trials * groups).reshape(trials, groups)
+    return by_group.sum(axis=1), by_group.astype(np.float32)
+
+
+_worker_inputs = None
+
+
+def _init_worker(inputs):
+    global _worker_inputs
+    _worker_inputs = inputs
+
+
+def _run_batch(seed, trials):
+    return simulate_batch(_worker_inputs, seed, trials)
+
+
+def value_at_risk(losses, confidence):
+    return float(np.quantile(losses, confidence)) if len(losses) else 0.0
+
+
+def expected_shortfall(losses, confidence):
+    """Mean loss in the worst (1 - confidence) share of years."""
+    if not len(losses):
+        return 0.0
+    var = np.quantile(losses, confidence)
+    return float(losses[losses >= var].mean())
+
+
+def var_interval(losses, confidence, z=_Z95):
+    """Distribution-free confidence interval of the VaR, from order statistics."""
+    n = len(losses)
+    spread = z * np.sqrt(n * confidence * (1 - confidence))
+    low = int(max(np.floor(n * confidence - spread), 0))
+    high = int(min(np.ceil(n * confidence + spread), n - 1))
+    ordered = np.partition(losses, [low, high])
+    return float(ordered[low]), float(ordered[high])
+
+
+class SimulationResult:
+    """Simulated annual losses of the portfolio and of each group."""
+
+    def __init__(self, inputs, losses, group_losses, confidence, converged, interval, seconds):
+        self.inputs = inputs
+        self.losses = losses
+        self.group_losses = group_losses
+        self.confidence = confidence
+        self.converged = converged
+        self.interval = interval
+        self.seconds = seconds
+
+    @property
+    def trials(self):
+        return len(self.losses)
+
+    @property
+    def expected_loss(self):
+        return float(self.losses.mean()) if self.trials else 0.0
+
+    @property
+    def var(self):
+        return value_at_risk(self.losses, self.confidence)
+
+    @property
+    def expected_shortfall(self):
+        return expected_shortfall(self.losses, self.confidence)
+
+    def summary(self):
+        """Expected loss, VaR and expected shortfall per group, largest expected loss first."""
+        rows = []
+        for i, name in enumerate(self.inputs.group_names):
+            losses = self.group_losses[:, i].astype(np.float64)
+            rows.append({'group': name, 'risks': int(self.inputs.group_risks[i]),
+                         'expected_loss': float(losses.mean()) if self.trials else 0.0,
+                         'var': value_at_risk(losses, self.confidence),
+                         'expected_shortfall': expected_shortfall(losses, self.confidence)})
+        frame = pd.DataFrame(
+            rows, columns=['group', 'risks', 'expected_loss', 'var', 'expected_shortfall'])
+        return frame.sort_values('expected_loss', ascending=False, kind='stable').reset_index(drop=True)
+
+    def describe(self):
+        level = f"{self.confidence:.1%}"
+        status = "converged" if self.converged else "stopped at the trial limit"
+        return (f"{self.trials:,} trials in {self.seconds:.2f}s ({status}): expected loss {self.expected_loss:,.0f}, "
+                f"VaR {level} {self.var:,.0f}, expected shortfall {self.expected_shortfall:,.0f}")
+
+
+def simulate_portfolio(inputs, max_trials=100000, seed=None, workers=1, batch_size=None,
+                       confidence=0.99, tolerance=0.02, min_trials=5000):
+    """Simulate annual losses until the VaR interval is within tolerance or max_trials is reached.
+
+    workers > 1 runs batches in a process pool. tolerance is the width of
+    the 95% confidence interval of the VaR relative to the VaR; None always
+    runs max_trials. batch_size defaults to about EVENTS_PER_BATCH events
+    per batch, at most DEFAULT_BATCH_SIZE trials.
+    """
+    started = time.perf_counter()
+    if batch_size is None:
+        events_per_trial = max(float(inputs.frequency.sum()), 1.0)
+        batch_size = int(
+            np.clip(EVENTS_PER_BATCH / events_per_trial, 100, DEFAULT_BATCH_SIZE))
+    n_batches = max(1, -(-max_trials // batch_size))
+    seeds = np.random.SeedSequence(seed).spawn(n_batches)
+    sizes = [min(batch_size, max_trials - i * batch_size)
+             for i in range(n_batches)]
+    losses, group_losses = [], []
+    converged, interval = False, (0.0, 0.0)
+
+    def consume(result):
+        nonlocal converged, interval
+        losses.append(result[0])
+        group_losses.append(result[1])
+        done = sum(len(batch) for batch in losses)
+        if tolerance is None or done < min_trials:
+            return False
+        total = np.concatenate(losses)
+        interval = var_interval(total, confidence, _Z95)
+        var = value_at_risk(total, confidence)
+        converged = var > 0 and (interval[1] - interval[0]) / var <= tolerance
+        return converged
+
+    if workers <= 1 or not len(inputs):
+        for child, size in zip(seeds, sizes):
+            if consume(simulate_batch(inputs, child, size)):
+                break
+    else:
+        # Spawned workers do not inherit the app's threads or locks
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                                    initargs=(inputs,)) as pool:
+            # Keep a window of batches in flight and consume them in batch order
+            pending = {}
+            next_batch = 0
+            for i in range(n_batches):
+                while next_batch < n_batches and len(pending) < 2 * workers:
+                    pending[next_batch] = pool.submit(
+                        _run_batch, seeds[next_batch], sizes[next_batch])
+                    next_batch += 1
+                if consume(pending.pop(i).result()):
+                    for future in pending.values():
+                        future.cancel()
+                    break
+    all_losses = np.concatenate(losses)
+    if tolerance is None or not converged:
+        interval = var_interval(all_losses, confidence, _Z95)
+    return SimulationResult(inputs, all_losses, np.concatenate(group_losses), confidence,
+                            converged, interval, time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simulate annual AI risk losses for the register.")
+    parser.add_argument("--db", required=True,
+                        help="SQLite register (see QULAB_REGISTER_DB)")
+    parser.add_argument("--by", choices=GROUP_DIMENSIONS, default="category")
+    parser.add_argument("--trials", type=int, default=100000,
+                        help="maximum number of simulated years")
+    parser.add_argument("--confidence", type=float, default=0.99)
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="relative VaR confidence interval width to stop at")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--gross", action="store_true",
+                        help="ignore controls (simulate composite, not residual, risk)")
+    args = parser.parse_args(argv)
+
+    from register_backend import SQLiteBackend
+    from register_store import RegisterStore
+    from residual_risk import ResidualRisk
+    from risk_taxonomy import AI_RISK_TAXONOMY, compile_taxonomy
+    register = RegisterStore()
+    register.residual = ResidualRisk(register)
+    backend = SQLiteBackend(args.db)
+    register.attach_backend(backend)
+    inputs = simulation_inputs(register, args.by, compile_taxonomy(AI_RISK_TAXONOMY),
+                               use_controls=not args.gross)
+    result = simulate_portfolio(inputs, args.trials, args.seed, args.workers,
+                                confidence=args.confidence, tolerance=args.tolerance)
+    print(result.describe())
+    print(result.summary().to_string(index=False))
+    backend.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
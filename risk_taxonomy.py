@@ -0,0 +1,70 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+
+# The bank's AI risk taxonomy: broad category -> risk types
+AI_RISK_TAXONOMY = {
+    "Data Risk": ["Data Quality", "Data Privacy", "Data Drift", "Data Poisoning", "Data Bias", "Data Provenance"],
+    "Model Risk": ["Algorithmic Bias", "Fairness", "Explainability", "Robustness", "Performance Degradation", "Adversarial Attacks", "Concept Drift", "Model Interpretability"],
+    "System Risk": ["Security Vulnerability", "Integration Issues", "Infrastructure Failure", "Access Control"],
+    "Human Risk": ["Operator Error", "Misuse", "Lack of Oversight", "Ethical Misalignment"],
+    "Organizational Risk": ["Regulatory Non-Compliance", "Reputational Damage", "Lack of Governance", "Third-Party Dependency"]
+}
+
+
+class TaxonomyIndex:
+    """AI_RISK_TAXONOMY compiled into an inverted index: risk type -> broad category.
+
+    Risk types and broad categories are numbered once, so mapping a column of
+    risk types to categories is a categorical encode plus an integer lookup.
+    """
+
+    def __init__(self, taxonomy):
+        self.categories = list(taxonomy.keys())
+        category_map = {}
+        for category, types in taxonomy.items():
+            for t in types:
+                category_map[t] = category
+        # Also map broad categories to themselves
+        for category in taxonomy.keys():
+            category_map[category] = category
+        self.category_map = category_map
+        self.labels = list(category_map.keys())
+        self.category_dtype = pd.CategoricalDtype(self.categories)
+        self.risk_type_dtype = pd.CategoricalDtype(self.labels)
+        category_codes = {category: code for code,
+                          category in enumerate(self.categories)}
+        self._label_category = np.array(
+            [category_codes[category_map[label]] for label in self.labels], dtype=np.int64)
+
+    def category_of(self, risk_type):
+        return self.category_map.get(risk_type)
+
+    def category_codes(self, risk_types):
+        """Broad category code per risk type; -1 where the type is not in the taxonomy."""
+        # get_indexer marks unknown and missing types with -1, as Categorical codes
+        # would, without pandas' warning about values outside the categories
+        label_codes = self.risk_type_dtype.categories.get_indexer(
+            np.asarray(risk_types, dtype=object))
+        return np.where(label_codes >= 0, self._label_category[label_codes], -1)
+
+    def categorize(self, risk_types):
+        """Broad categories of a column of risk types as a Categorical."""
+        return pd.Categorical.from_codes(self.category_codes(risk_types), dtype=self.category_dtype)
+
+    def category_counts(self, risk_types):
+        """Number of risks per broad category, in taxonomy order."""
+        codes = self.category_codes(risk_types)
+        return np.bincount(codes[codes >= 0], minlength=len(self.categories))
+
+
+@functools.lru_cache(maxsize=8)
+def _compile(frozen_taxonomy):
+    return TaxonomyIndex({category: list(types) for category, types in frozen_taxonomy})
+
+
+def compile_taxonomy(taxonomy):
+    """Cached TaxonomyIndex for a taxonomy dict; recompiled only when its content changes."""
+    return _compile(tuple((category, tuple(types)) for category, types in taxonomy.items()))
@@ -0,0 +1,268 @@
+import bisect
+import contextlib
+import datetime
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from register_store import ColumnStore
+
+
+# Columns whose changes are recorded, per register table
+TRACKED_COLUMNS = {
+    'risks': ['likelihood_score', 'magnitude_score', 'composite_risk_score'],
+    'controls': ['effectiveness_score', 'risk_response'],
+}
+# Text columns are logged as codes into the history's string table
+_TEXT_COLUMNS = {'risk_response'}
+_TABLES = ['models', 'risks', 'controls']
+_FIELDS = [c for columns in TRACKED_COLUMNS.values() for c in columns]
+
+_LOG_COLUMNS = ['timestamp', 'table', 'entity_id', 'position',
+                'field', 'old_value', 'new_value', 'source']
+_LOG_DTYPES = {'timestamp': np.int64, 'table': np.int64, 'entity_id': np.int64, 'position': np.int64,
+               'field': np.int64, 'old_value': np.float64, 'new_value': np.float64, 'source': np.int64}
+
+
+def _nanoseconds(timestamp):
+    # Log times are integer nanoseconds since the epoch (UTC)
+    if isinstance(timestamp, (datetime.datetime, np.datetime64)):
+        return pd.Timestamp(timestamp).as_unit('ns').value
+    return int(round(timestamp * 1e9))
+
+
+class _Snapshot:
+    def __init__(self, seq, timestamp, values):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.values = values
+
+
+class ScoreHistory:
+    """Append-only log of every score and response change in the register.
+
+    Each change is one numeric log row (time, table, entity, field, old and
+    new value, source). The log is indexed by entity, so a risk's trajectory
+    is a hash lookup, and snapshots of all tracked values are taken every
+    `snapshot_interval` changes (or every register-size changes, whichever is
+    larger), so reconstructing the register as of a time replays at most one
+    snapshot interval of the log. The history starts over when the register
+    tables are cleared.
+    """
+
+    def __init__(self, register, snapshot_interval=10000):
+        self.register = register
+        self.snapshot_interval = snapshot_interval
+        self.log = ColumnStore("score_history", _LOG_COLUMNS, _LOG_DTYPES)
+        self.log.add_index("entity", ["table", "entity_id"])
+        # Current encoded value of every tracked cell, to know the old value of an update
+        self._current = {name: ColumnStore(f"{name}_tracked", columns, {c: np.float64 for c in columns})
+                         for name, columns in TRACKED_COLUMNS.items()}
+        self._strings = []
+        self._string_codes = {}
+        self._local = threading.local()
+        self._reset()
+        for name in _TABLES:
+            register.table(name).subscribe(self._on_write)
+
+    def _reset(self):
+        self.log.clear()
+        self._last_time = 0
+        # Table size after each insert, for which rows existed at a given time
+        self._sizes = {name: ([], []) for name in _TABLES}
+        self._snapshots = []
+        for name, current in self._current.items():
+            current.clear()
+            table = self.register.table(name)
+            if len(table):
+                current.extend({c: self._encode(c, table.column(c))
+                                for c in current.columns})
+        now = self._now()
+        for name in _TABLES:
+            self._record_size(name, now)
+        self._snapshot(now)
+
+    def _now(self):
+        # Integer nanoseconds, so times read back from changes() match the log
+        # exactly; they never go backwards, so the log can be searched by time
+        self._last_time = max(self._last_time, time.time_ns())
+        return self._last_time
+
+    def _code(self, text):
+        if text not in self._string_codes:
+            self._string_codes[text] = len(self._strings)
+            self._strings.append(text)
+        return self._string_codes[text]
+
+    def _encode(self, column, values):
+        if column not in _TEXT_COLUMNS:
+            return np.asarray(values, dtype=np.float64)
+        return np.array([np.nan if v is None else self._code(v) for v in values], dtype=np.float64)
+
+    def _decode(self, column, values):
+        if column not in _TEXT_COLUMNS:
+            return values
+        return np.array([None if np.isnan(v) else self._strings[int(v)] for v in values], dtype=object)
+
+    @contextlib.contextmanager
+    def source(self, label):
+        """Attribute the changes made inside the block to label (default "user")."""
+        previous = getattr(self._local, 'source', "user")
+        self._local.source = label
+        try:
+            yield
+        finally:
+            self._local.source = previous
+
+    def _record_size(self, name, now):
+        times, sizes = self._sizes[name]
+        times.append(now)
+        sizes.append(len(self.register.table(name)))
+
+    def _on_write(self, store, kind, positions, columns):
+        if kind == "clear":
+            self._reset()
+            return
+        now = self._now()
+        if kind == "insert":
+            self._record_size(store.name, now)
+        current = self._current.get(store.name)
+        if current is None:
+            return
+        if kind == "insert":
+            new = {c: self._encode(c, store.column(c)[positions])
+                   for c in current.columns}
+            current.extend(new)
+            changes = [(c, positions, np.full(len(positions), np.nan), new[c])
+                       for c in current.columns]
+        else:
+            changes = []
+            for c in current.columns:
+                if c not in columns:
+                    continue
+                old = current.column(c)[positions]
+                new = self._encode(c, store.column(c)[positions])
+                changed = ~((old == new) | (np.isnan(old) & np.isnan(new)))
+                if changed.any():
+                    current.set_many(positions[changed], {c: new[changed]})
+                    changes.append(
+                        (c, positions[changed], old[changed], new[changed]))
+        self._append(store, now, changes)
+
+    def _append(self, store, now, changes):
+        table = _TABLES.index(store.name)
+        source = self._code(getattr(self._local, 'source', "user"))
+        for column, positions, old, new in changes:
+            # Nothing to record for a row inserted without a value
+            logged = ~(np.isnan(old) & np.isnan(new))
+            if not logged.any():
+                continue
+            positions = positions[logged]
+            n = len(positions)
+            self.log.extend({
+                'timestamp': np.full(n, now), 'table': np.full(n, table),
+                'entity_id': store.column(store.primary_key)[positions], 'position': positions,
+                'field': np.full(n, _FIELDS.index(column)),
+                'old_value': old[logged], 'new_value': new[logged], 'source': np.full(n, source)})
+        rows = sum(len(current) for current in self._current.values())
+        if len(self.log) - self._snapshots[-1].seq >= max(self.snapshot_interval, rows):
+            self._snapshot(now)
+
+    def _snapshot(self, now):
+        self._snapshots.append(_Snapshot(
+            len(self.log), now, {name: {c: current.column(c).copy() for c in current.columns}
+                                 for name, current in self._current.items()}))
+
+    def __len__(self):
+        return len(self.log)
+
+    def _changes_frame(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        fields = self.log.column('field')[rows]
+        old = self.log.column('old_value')[rows]
+        new = self.log.column('new_value')[rows]
+        old_values = old.astype(object)
+        new_values = new.astype(object)
+        for column in _TEXT_COLUMNS:
+            text = fields == _FIELDS.index(column)
+            old_values[text] = self._decode(column, old[text])
+            new_values[text] = self._decode(column, new[text])
+        old_values[pd.isna(old_values)] = None
+        new_values[pd.isna(new_values)] = None
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(self.log.column('timestamp')[rows], unit='ns'),
+            'table': [_TABLES[t] for t in self.log.column('table')[rows].tolist()],
+            'entity_id': self.log.column('entity_id')[rows],
+            'field': [_FIELDS[f] for f in fields.tolist()],
+            'old_value': old_values, 'new_value': new_values,
+            'source': [self._strings[s] for s in self.log.column('source')[rows].tolist()],
+        })
+
+    def changes(self):
+        """The whole log as a DataFrame, oldest change first."""
+        return self._changes_frame(np.arange(len(self.log)))
+
+    def trajectory(self, entity_id, table='risks'):
+        """Every recorded change of one risk (or control), oldest first."""
+        rows = self.log.lookup("entity", (_TABLES.index(table), entity_id))
+        return self._changes_frame(rows)
+
+    def score_trajectory(self, risk_id):
+        """The tracked scores of a risk after each of its changes, one row per change time."""
+        changes = self.trajectory(risk_id)
+        columns = TRACKED_COLUMNS['risks']
+        if changes.empty:
+            return pd.DataFrame(columns=['timestamp'] + columns)
+        changes['new_value'] = pd.to_numeric(changes['new_value'])
+        wide = changes.pivot_table(index='timestamp', columns='field', values='new_value',
+                                   aggfunc='last', dropna=False)
+        return wide.reindex(columns=columns).ffill().reset_index().rename_axis(columns=None)
+
+    def _size_at(self, name, timestamp):
+        times, sizes = self._sizes[name]
+        i = bisect.bisect_right(times, timestamp)
+        return sizes[i - 1] if i else 0
+
+    def as_of(self, timestamp):
+        """The register tables as they were at a time (seconds since the epoch or a Timestamp).
+
+        Returns a dict of 'models', 'risks' and 'controls' DataFrames. Rows
+        are those registered by then, with the scores and responses they had;
+        a timestamp taken from changes() includes the change made at it.
+        """
+        timestamp = _nanoseconds(timestamp)
+        i = bisect.bisect_right(
+            [s.timestamp for s in self._snapshots], timestamp)
+        if i == 0:
+            # Before the history began the register is as it was at the first snapshot
+            i, timestamp = 1, self._snapshots[0].timestamp
+        snapshot = self._snapshots[i - 1]
+        end = int(np.searchsorted(self.log.column(
+            'timestamp'), timestamp, side='right'))
+        replay = np.arange(snapshot.seq, max(end, snapshot.seq))
+        frames = {}
+        for name in _TABLES:
+            size = self._size_at(name, timestamp)
+            frame = self.register.table(name).page(0, size)
+            if name in self._current:
+                table_rows = replay[self.log.column(
+                    'table')[replay] == _TABLES.index(name)]
+                for column in self._current[name].columns:
+                    values = np.full(size, np.nan)
+                    base = snapshot.values[name][column][:size]
+                    values[:len(base)] = base
+                    rows = table_rows[self.log.column(
+                        'field')[table_rows] == _FIELDS.index(column)]
+                    positions = self.log.column('position')[rows]
+                    # Apply the last change of each cell in the replayed range
+                    last = len(positions) - 1 - \
+                        np.unique(positions[::-1], return_index=True)[1]
+                    keep = positions[last] < size
+                    values[positions[last][keep]] = self.log.column(
+                        'new_value')[rows[last][keep]]
+                    frame[column] = self.register.table(name).frame_values(
+                        column, self._decode(column, values))
+            frames[name] = frame
+        return frames
@@ -0,0 +1,39 @@
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from risk_register import RiskRegister
+
+APP = os.path.join(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def _app(monkeypatch, tmp_path, allow_clear):
+    path = str(tmp_path / "register.db")
+    register = RiskRegister.open(path)
+    register.add_model("Credit Score Predictor", "Credit", "", "Retail")
+    register.close()
+    monkeypatch.setenv("QULAB_REGISTER_DB", path)
+    if allow_clear:
+        monkeypatch.setenv("QULAB_ALLOW_CLEAR", "1")
+    else:
+        monkeypatch.delenv("QULAB_ALLOW_CLEAR", raising=False)
+    return AppTest.from_file(APP, default_timeout=60).run(), path
+
+
+def test_initialize_keeps_the_stored_register(monkeypatch, tmp_path):
+    app, path = _app(monkeypatch, tmp_path, allow_clear=False)
+    app.button(key="init_system_btn").click().run()
+    assert len(app.session_state.risk_register.models) == 1
+    assert not any(b.key == "clear_register_btn" for b in app.button)
+    assert len(RiskRegister.open(path).store.models) == 1
+
+
+def test_clearing_the_register_needs_confirmation(monkeypatch, tmp_path):
+    app, path = _app(monkeypatch, tmp_path, allow_clear=True)
+    app.button(key="init_system_btn").click().run()
+    assert app.button(key="clear_register_btn").disabled
+    app.checkbox(key="confirm_clear_register").check().run()
+    app.button(key="clear_register_btn").click().run()
+    assert len(app.session_state.risk_register.models) == 0
+    assert len(RiskRegister.open(path).store.models) == 0
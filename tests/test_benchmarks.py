@@ -0,0 +1,58 @@
+"""Performance regression tests of the utils operations, on the harness of benchmarks/bench_utils.py.
+
+Single-row operations must cost the same on a register 50 times larger and
+must not allocate in proportion to it. With BENCH_BASELINE set to the --json
+output of an earlier bench_utils.py run (same machine, --sizes 1000,50000),
+every operation is also checked against that run's times and peaks.
+"""
+import json
+import os
+import warnings
+
+import pytest
+
+import bench_utils
+
+SMALL, LARGE = 1000, 50000
+SINGLE_ROW = ["add_ai_model_st", "add_ai_risk_st", "assign_risk_scores_st", "calculate_composite_risk_score_st",
+              "get_full_risk_register_st + _df", "identify_top_risks_st (10)", "simulate_data_drift_alert_st",
+              "update_risk_assessment_from_monitoring_st"]
+# Allocations of a single-row operation, whatever the register size
+MAX_SINGLE_ROW_PEAK = 256 * 1024
+
+
+@pytest.fixture(scope="module")
+def results():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return {n: bench_utils.bench(n, 5, SINGLE_ROW)[1] for n in (SMALL, LARGE)}
+
+
+@pytest.mark.parametrize("name", SINGLE_ROW)
+def test_single_row_operations_do_not_scale_with_the_register(results, name):
+    small, large = results[SMALL][name], results[LARGE][name]
+    # Slack for cache effects and timer noise, far below the 50x of a table scan
+    assert large["seconds"] <= 3 * \
+        small["seconds"] + bench_utils.MIN_TIME_CHANGE
+    assert large["peak_bytes"] <= MAX_SINGLE_ROW_PEAK
+
+
+@pytest.mark.skipif("BENCH_BASELINE" not in os.environ, reason="set BENCH_BASELINE to compare with a saved run")
+def test_no_regression_against_baseline(results):
+    with open(os.environ["BENCH_BASELINE"]) as f:
+        baseline = json.load(f)["results"]
+    failures = bench_utils.regressions({str(n): r for n, r in results.items()}, baseline,
+                                       time_tolerance=0.5, memory_tolerance=0.25)
+    assert not failures, "\n".join(failures)
+
+
+def test_regressions_reports_slower_and_larger_operations():
+    baseline = {"1000": {"fast": {"seconds": 0.010, "peak_bytes": 10_000_000},
+                         "lean": {"seconds": 0.010, "peak_bytes": 10_000_000}}}
+    now = {"1000": {"fast": {"seconds": 0.030, "peak_bytes": 10_000_000},
+                    "lean": {"seconds": 0.0101, "peak_bytes": 20_000_000},
+                    "new": {"seconds": 1.0, "peak_bytes": 1}}}
+    failures = bench_utils.regressions(now, baseline, 0.5, 0.25)
+    assert len(failures) == 2
+    assert failures[0].startswith("fast at 1000 risks took 30.00 ms")
+    assert failures[1].startswith("lean at 1000 risks peaked at 20.0 MB")
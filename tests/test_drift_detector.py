@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from drift_detector import DriftDetector
+
+
+def _detector(current):
+    rng = np.random.default_rng(0)
+    detector = DriftDetector(["income", "age"])
+    detector.update(pd.DataFrame({"income": rng.normal(size=1000), "age": rng.normal(size=1000)}),
+                    'reference')
+    detector.update(current, 'current')
+    return detector
+
+
+def test_an_empty_current_sample_has_no_likelihood():
+    detector = _detector(pd.DataFrame({"income": [], "age": []}))
+    assert detector.unmeasured() == ["income", "age"]
+    assert detector.report()['likelihood_score'].isna().all()
+    assert detector.likelihood() is None
+
+
+def test_a_feature_without_values_is_skipped():
+    rng = np.random.default_rng(1)
+    detector = _detector(pd.DataFrame(
+        {"income": rng.normal(size=1000), "age": np.nan}))
+    assert detector.unmeasured() == ["age"]
+    # The measured feature did not drift, so the missing one must not read as drift
+    assert detector.likelihood() <= 2
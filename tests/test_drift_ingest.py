@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from drift_ingest import DriftIngestor, apply_score_updates
+from register_backend import SQLiteBackend
+from register_store import RegisterStore
+from risk_register import RiskRegister
+
+
+def _register(path):
+    register = RiskRegister(RegisterStore(SQLiteBackend(path)))
+    model_id = register.add_model(
+        "Credit Score Predictor", "Credit", "", "Retail")
+    register.add_risk(model_id, "Data Drift", "Income shift", 1, 1)
+    return register.store
+
+
+def _alert(**fields):
+    return json.dumps({"model_id": 1, "risk_type": "Data Drift", "likelihood": 5, "magnitude": 5, **fields})
+
+
+def test_an_alert_with_a_non_text_description_is_rejected(tmp_path):
+    store = _register(str(tmp_path / "register.db"))
+    ingestor = DriftIngestor(store)
+    stats = ingestor.run([_alert(), _alert(risk_type="Concept Drift", hazard_description=42),
+                          _alert(risk_type="Concept Drift", hazard_description="Label shift")])
+    assert stats.rejections == {"malformed alert": 1}
+    assert (stats.risks_updated, stats.risks_created) == (1, 1)
+    assert store.risks.to_frame()['hazard_description'].tolist() == [
+        "Income shift", "Label shift"]
+
+
+def test_a_rejected_batch_updates_nothing(tmp_path):
+    path = str(tmp_path / "register.db")
+    store = _register(path)
+    with pytest.raises(ValueError):
+        apply_score_updates(store, [1, 1], ["Data Drift", "Concept Drift"], [5, 5], [5, 5],
+                            ["Income shift", 42])
+    assert store.risks.to_frame()['likelihood_score'].tolist() == [1]
+    store.backend.close()
+    reopened = RegisterStore(SQLiteBackend(path))
+    assert reopened.risks.to_frame()['likelihood_score'].tolist() == [1]
@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from full_register import FullRegisterView
+from register_backend import SQLiteBackend
+from residual_risk import ResidualRisk
+from risk_register import RiskRegister, build_register_store
+
+
+def _register(backend=None):
+    return RiskRegister(build_register_store(backend))
+
+
+def _merged(store):
+    # The full register as the original pd.merge calls built it
+    models = store.models.to_frame()
+    risks = store.risks.to_frame()
+    controls = store.controls.to_frame()
+    return models.merge(risks, on='model_id', how='left').merge(controls, on='risk_id', how='left')
+
+
+def test_failed_supply_chain_risk_leaves_memory_and_database_alike(tmp_path):
+    path = str(tmp_path / "register.db")
+    register = _register(SQLiteBackend(path))
+    with pytest.raises(ValueError):
+        register.add_supply_chain_risk("Fraud Detection System", "Fraud", "", "Fraud Unit", "In Production",
+                                       "Data Provenance", "Unverified vendor data", likelihood=7, magnitude=3)
+    with pytest.raises(ValueError):
+        register.add_supply_chain_risk("Fraud Detection System", "Fraud", "", "Fraud Unit", "Not a status",
+                                       "Data Provenance", "Unverified vendor data", likelihood=3, magnitude=3)
+    with pytest.raises(ValueError):
+        register.add_adversarial_risk(1, "Evasion", "Perturbed inputs", 3, 0)
+    assert (len(register.store.models), len(register.store.risks)) == (0, 0)
+
+    model_id, risk_id = register.add_supply_chain_risk("Fraud Detection System", "Fraud", "", "Fraud Unit",
+                                                       "In Production", "Data Provenance", "Unverified vendor data", 3, 4)
+    register.store.backend.close()
+    reopened = _register(SQLiteBackend(path))
+    assert reopened.table_frame("models")['model_id'].tolist() == [model_id]
+    assert reopened.table_frame("risks")['risk_id'].tolist() == [risk_id]
+    assert reopened.table_frame(
+        "risks")['composite_risk_score'].tolist() == [12]
+
+
+def test_registers_sharing_a_database_take_distinct_ids(tmp_path):
+    path = str(tmp_path / "register.db")
+    first, second = RiskRegister.open(path), RiskRegister.open(path)
+    assert first.add_model("Credit Score Predictor",
+                           "Credit", "", "Retail") == 1
+    assert second.add_model("Fraud Detection System",
+                            "Fraud", "", "Fraud Unit") == 2
+    first.close()
+    second.close()
+    reopened = RiskRegister.open(path)
+    assert reopened.table_frame("models")['model_name'].tolist() == [
+        "Credit Score Predictor", "Fraud Detection System"]
+
+
+def test_next_id_follows_inserts_and_clear():
+    register = _register()
+    store = register.store
+    assert store.next_id("risks") == 1
+    model_id = register.add_model(
+        "Credit Score Predictor", "Credit", "", "Retail")
+    register.add_rows("risks", {"model_id": [model_id] * 3, "risk_type": ["Data Drift"] * 3,
+                                "hazard_description": ["a", "b", "c"]})
+    assert store.next_id("risks") == 4
+    with pytest.raises(KeyError):
+        store.risks.extend({"risk_id": np.array(
+            [10, 3]), "model_id": np.array([1, 1])})
+    assert store.next_id("risks") == 4
+    store.clear()
+    assert store.next_id("risks") == 1
+
+
+def test_risks_and_controls_registered_before_their_parent_are_joined():
+    register = _register()
+    store = register.store
+    store.controls.append({"control_id": 1, "risk_id": 1, "control_description": "Retrain monthly",
+                           "effectiveness_score": 5, "risk_response": "Mitigate"})
+    store.risks.append({"risk_id": 1, "model_id": 1, "risk_type": "Data Drift", "hazard_description": "Income shift",
+                        "likelihood_score": 4, "magnitude_score": 5, "composite_risk_score": 20})
+    assert register.full_register_frame().empty
+    register.add_model("Credit Score Predictor", "Credit", "", "Retail")
+
+    frame = register.full_register_frame()
+    assert frame['hazard_description'].tolist() == ["Income shift"]
+    assert frame['control_description'].tolist() == ["Retrain monthly"]
+    assert len(frame) == len(_merged(store))
+    # A fully effective mitigating control removes 80% of the risk
+    assert store.residual.residual().tolist() == [4.0]
+    assert frame['residual_risk_score'].tolist() == [4.0]
+    assert register.top_risks_frame(1)['hazard_description'].tolist() == [
+        "Income shift"]
+    assert register.cube_summary()['risks'] == 1
+
+
+def test_orphan_joins_match_a_rebuild():
+    register = _register()
+    store = register.store
+    rng = np.random.default_rng(0)
+    # Parents and children interleaved in random order, half the children first
+    for i in rng.permutation(30).tolist():
+        model_id, risk_id = i // 3 + 1, i + 1
+        if i % 2:
+            store.models.append(
+                {"model_id": 100 + risk_id, "model_name": f"Spare {risk_id}"})
+        store.controls.append({"control_id": risk_id, "risk_id": risk_id, "control_description": f"Control {risk_id}",
+                               "effectiveness_score": 3, "risk_response": "Transfer"})
+        store.risks.append({"risk_id": risk_id, "model_id": model_id, "risk_type": "Data Drift",
+                            "hazard_description": f"Hazard {risk_id}", "likelihood_score": 3,
+                            "magnitude_score": 3, "composite_risk_score": 9})
+    for model_id in rng.permutation(10).tolist():
+        store.models.append(
+            {"model_id": model_id + 1, "model_name": f"Model {model_id + 1}"})
+
+    rebuilt = ResidualRisk(store)
+    assert np.array_equal(store.residual.residual(), rebuilt.residual())
+    incremental = store.full_register.to_frame().sort_values(
+        ['model_name', 'hazard_description']).reset_index(drop=True)
+    fresh = FullRegisterView(store, rebuilt).to_frame().sort_values(
+        ['model_name', 'hazard_description']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(incremental, fresh)
+    assert len(incremental) == len(_merged(store))
+
+
+def test_as_of_a_change_time_includes_that_change():
+    register = _register()
+    model_id = register.add_model(
+        "Credit Score Predictor", "Credit", "", "Retail")
+    risk_ids = [register.add_risk(
+        model_id, "Data Drift", f"Hazard {i}", 1, 1) for i in range(5)]
+    for i in range(200):
+        risk_id, likelihood = risk_ids[i % 5], i % 5 + 1
+        register.assign_risk_scores(risk_id, likelihood, 2)
+        changed_at = register.score_changes()['timestamp'].iloc[-1]
+        risks = register.as_of(changed_at)['risks'].set_index('risk_id')
+        assert risks.loc[risk_id, 'likelihood_score'] == likelihood
+
+
+def test_as_of_before_a_change_excludes_it():
+    register = _register()
+    model_id = register.add_model(
+        "Credit Score Predictor", "Credit", "", "Retail")
+    risk_id = register.add_risk(model_id, "Data Drift", "Income shift", 2, 2)
+    register.assign_risk_scores(risk_id, 5, 2)
+    changed_at = register.score_changes()['timestamp'].iloc[-1]
+    before = register.as_of(changed_at - pd.Timedelta(1, unit='ns'))['risks']
+    assert before['likelihood_score'].tolist() == [2]
+
+
+def test_composite_scores_are_whole_numbers():
+    register = _register()
+    model_id = register.add_model(
+        "Credit Score Predictor", "Credit", "", "Retail")
+    risk_id = register.add_risk(model_id, "Data Drift", "Income shift", 3, 4)
+    messages = []
+    register.subscribe(lambda level, event, message,
+                       details: messages.append(message))
+    assert register.calculate_composite_score(risk_id) == 12
+    assert "(12)" in messages[-1]
+    control_id = register.add_control(risk_id, "Retrain monthly")
+    register.assign_risk_response(control_id, 4, "Mitigate")
+    frame = register.full_register_frame()
+    assert str(frame['effectiveness_score'].dtype) == "Int8"
+    assert str(frame['composite_risk_score'].dtype) == "UInt8"
+    assert str(register.top_risks_frame(1)['likelihood_score'].dtype) == "Int8"
+
+
+def test_row_counts_match_the_frames():
+    register = _register()
+    model_id = register.add_model(
+        "Credit Score Predictor", "Credit", "", "Retail")
+    register.add_model("Fraud Detection System", "Fraud", "", "Fraud Unit")
+    risk_id = register.add_risk(model_id, "Data Drift", "Income shift", 3, 4)
+    register.add_control(risk_id, "Retrain monthly")
+    register.add_control(risk_id, "Monitor PSI")
+    for name in ("models", "risks", "controls"):
+        assert register.row_count(name) == len(register.table_frame(name))
+    assert register.row_count("full_register") == len(
+        register.full_register_frame()) == 3
+
+
+def test_search_frame_returns_matching_rows_as_the_table_frame_does():
+    register = _register()
+    model_id = register.add_model(
+        "Credit Score Predictor", "Credit", "", "Retail")
+    register.add_risk(model_id, "Data Drift", "Income shift", 3, 4)
+    risk_id = register.add_risk(
+        model_id, "Data Quality", "Missing income values", 2, 2)
+    register.add_risk(model_id, "Model Risk", "Adversarial inputs", 4, 5)
+    matches = register.search_frame('"income values"')
+    assert matches['risk_id'].tolist() == [risk_id]
+    assert matches.dtypes.astype(str).equals(
+        register.table_frame("risks").dtypes.astype(str))
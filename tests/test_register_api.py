@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from register_api import ApiError, RegisterApi, _read_request
+from risk_register import RiskRegister, build_register_store
+
+
+@pytest.fixture
+def api():
+    api = RegisterApi(RiskRegister(build_register_store()))
+    status, _ = api.handle("POST", "/models", {}, {"model_name": "Credit Score Predictor",
+                                                   "status": "In Production"})
+    assert status == 201
+    return api
+
+
+def _risk(**fields):
+    return {"model_id": 1, "risk_type": "Data Drift", "hazard_description": "Income shift", **fields}
+
+
+@pytest.mark.parametrize("body, error", [
+    (_risk(model_id=99), "No such model: model_id 99."),
+    (_risk(model_id="abc"), 'No such model: model_id "abc".'),
+    (_risk(model_id=1.5), "No such model: model_id 1.5."),
+    (_risk(risk_type="Not a type"),
+     'Not in the AI risk taxonomy: risk_type "Not a type".'),
+])
+def test_risks_need_a_registered_model_and_a_taxonomy_type(api, body, error):
+    assert api.handle("POST", "/risks", {}, body) == (400, {"error": error})
+    assert len(api.store.risks) == 0
+    status, categories = api.handle("GET", "/categories", {}, None)
+    assert status == 200 and categories == []
+
+
+def test_controls_need_a_registered_risk(api):
+    assert api.handle("POST", "/risks", {}, _risk()) == (201, {"risk_id": 1})
+    status, body = api.handle("POST", "/controls", {},
+                              {"risk_id": 777, "control_description": "Retrain monthly"})
+    assert (status, body) == (400, {"error": "No such risk: risk_id 777."})
+    assert api.handle("POST", "/controls", {}, {"risk_id": 1, "control_description": "Retrain monthly"}) == \
+        (201, {"control_id": 1})
+
+
+def test_a_bulk_write_with_a_bad_row_adds_nothing(api):
+    status, body = api.handle(
+        "POST", "/risks/bulk", {}, [_risk(), _risk(model_id=2)])
+    assert (status, body) == (
+        400, {"error": "No such model: model_id 2 (row 2)."})
+    assert len(api.store.risks) == 0
+
+
+def test_a_batch_answers_each_request(api):
+    status, responses = api.handle("POST", "/batch", {}, [
+        {"method": "POST", "path": "/risks", "body": _risk()},
+        {"method": "POST", "path": "/risks", "body": _risk(model_id=5)},
+    ])
+    assert status == 200
+    assert [r["status"] for r in responses] == [201, 400]
+    assert len(api.store.risks) == 1
+
+
+@pytest.mark.parametrize("k", ["0", "-3"])
+def test_top_risks_need_a_positive_k(api, k):
+    assert api.handle("GET", "/top-risks", {"k": k}, None) == \
+        (400, {"error": "k must be at least 1."})
+
+
+def _read(raw):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await _read_request(reader)
+    return asyncio.run(read())
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_a_bad_content_length_is_a_client_error(length):
+    with pytest.raises(ApiError) as error:
+        _read(
+            f"POST /risks HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode())
+    assert error.value.status == 400
@@ -0,0 +1,94 @@
+import io
+
+from register_import import RegisterImporter
+from risk_register import build_register_store
+
+
+def _csv(text):
+    return io.StringIO(text.strip() + "\n")
+
+
+def _register_with_models(*names):
+    register = build_register_store()
+    for i, name in enumerate(names, start=1):
+        register.models.append(
+            {"model_id": i, "model_name": name, "status": "In Production"})
+    return register
+
+
+def _reasons(report):
+    return dict(zip(report.rejected['row'], report.rejected['reason']))
+
+
+def test_children_of_rejected_rows_are_rejected():
+    register = _register_with_models("Scorer", "Other")
+    importer = RegisterImporter(register)
+    models = importer.import_models(_csv("""
+model_id,model_name,status
+1,Underwriter,In Production
+2,Chatbot,Not a status
+"""))
+    assert models.rows_imported == 1
+    risks = importer.import_risks(_csv("""
+risk_id,model_id,risk_type,hazard_description
+10,2,Data Drift,chatbot misuse
+11,1,Data Drift,income shift
+"""))
+    # Source model 2 was rejected: its risk must not land on register model 2 ("Other")
+    assert _reasons(risks) == {1: "model was rejected in this import"}
+    frame = register.risks.to_frame()
+    assert frame['hazard_description'].tolist() == ["income shift"]
+    assert frame['model_id'].tolist() == [importer.model_ids[1]]
+    controls = importer.import_controls(_csv("""
+risk_id,control_description
+10,Filter prompts
+11,Retrain monthly
+"""))
+    assert _reasons(controls) == {1: "risk was rejected in this import"}
+    assert register.controls.to_frame()['risk_id'].tolist() == [
+        importer.risk_ids[11]]
+
+
+def test_source_ids_never_fall_back_to_register_ids():
+    register = _register_with_models("Scorer", "Other")
+    importer = RegisterImporter(register)
+    report = importer.import_risks(_csv("""
+model_id,risk_type,hazard_description
+2,Data Drift,unlinked
+"""))
+    assert _reasons(report) == {1: "unknown model"}
+    assert len(register.risks) == 0
+
+
+def test_register_ids_and_names_link_to_existing_rows():
+    register = _register_with_models("Scorer", "Other")
+    importer = RegisterImporter(register)
+    report = importer.import_risks(_csv("""
+register_model_id,model_name,risk_type,hazard_description
+2,,Data Drift,by register ID
+,Scorer,Data Drift,by name
+9,,Data Drift,unknown register ID
+abc,,Data Drift,not an ID
+"""))
+    assert _reasons(report) == {3: "unknown model", 4: "unknown model"}
+    assert register.risks.to_frame()['model_id'].tolist() == [2, 1]
+    controls = importer.import_controls(_csv("""
+register_risk_id,control_description
+2,Retrain monthly
+5,Unknown risk
+"""))
+    assert _reasons(controls) == {2: "unknown risk"}
+    assert register.controls.to_frame()['risk_id'].tolist() == [2]
+
+
+def test_numeric_text_columns_are_imported_as_text():
+    register = build_register_store()
+    report = RegisterImporter(register).import_models(_csv("""
+model_name,use_case,owner,status
+Scorer,101,7,In Production
+Chatbot,0102,,
+"""))
+    assert report.rows_imported == 2
+    frame = register.models.to_frame()
+    assert frame['use_case'].tolist() == ["101", "0102"]
+    assert frame['owner'].tolist()[0] == "7"
@@ -0,0 +1,235 @@
+import bisect
+import itertools
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    # Bulk tokenizing falls back to Python's re, several times slower
+    pa = None
+
+
+# Free-text register columns kept in the index, per table
+INDEXED_COLUMNS = {'models': ['description'], 'risks': [
+    'hazard_description'], 'controls': ['control_description']}
+# Words are runs of letters and digits; everything else separates them
+_WORD_RE = re.compile(r"[^\W_]+")
+_SEPARATOR = r"[^\p{L}\p{N}]+"
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+def tokenize(text):
+    """Lower-cased words of a text; None and NaN have none."""
+    return _WORD_RE.findall(text.lower()) if isinstance(text, str) else []
+
+
+def parse_query(query):
+    """The phrases of a query, each a list of words that must appear in sequence.
+
+    Quoted text is one phrase, and so is an unquoted term with punctuation
+    in it ("third-party"). A trailing * makes the last word a prefix.
+    """
+    phrases = []
+    for quoted, bare in _QUERY_RE.findall(query or ""):
+        text = quoted or bare
+        words = tokenize(text)
+        if words and text.rstrip().endswith('*'):
+            words[-1] += '*'
+        if words:
+            phrases.append(words)
+    return phrases
+
+
+def word_codes(texts):
+    """Every word occurrence of texts as (text number, word code) arrays, plus the words coded."""
+    if pa is not None:
+        parts = pc.split_pattern_regex(pc.utf8_lower(
+            pa.array(texts, type=pa.large_string(), from_pandas=True)), _SEPARATOR)
+        words = pc.list_flatten(parts)
+        nonempty = pc.not_equal(words, "")
+        parents = pc.filter(pc.list_parent_indices(parts), nonempty)
+        encoded = pc.dictionary_encode(pc.filter(words, nonempty))
+        return (parents.to_numpy().astype(np.int64), encoded.indices.to_numpy().astype(np.int64),
+                encoded.dictionary.to_pylist())
+    tokens = [tokenize(text) for text in texts]
+    parents = np.repeat(np.arange(len(tokens)), [len(t) for t in tokens])
+    codes, words = pd.factorize(
+        np.array(list(itertools.chain.from_iterable(tokens)), dtype=object))
+    return parents, codes.astype(np.int64), words.tolist()
+
+
+def _matches(word, token):
+    return token.startswith(word[:-1]) if word.endswith('*') else token == word
+
+
+def _has_phrase(tokens, words):
+    n = len(words)
+    return any(all(_matches(w, t) for w, t in zip(words, tokens[i:i + n]))
+               for i in range(len(tokens) - n + 1))
+
+
+class _ColumnIndex:
+    """Postings (sorted row positions per word) of one text column."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._texts = []
+        self._postings = {}
+        # Rows added since a word's postings were last merged, merged on first use
+        self._pending = {}
+        self._vocabulary = None
+
+    def _word_rows(self, rows, texts):
+        # Sorted distinct rows per word; rows come in ascending order
+        parents, codes, vocabulary = word_codes(texts)
+        if not len(codes):
+            return {}
+        order = np.argsort(codes, kind='stable')
+        codes, docs = codes[order], np.asarray(
+            rows, dtype=np.int64)[parents[order]]
+        keep = np.ones(len(docs), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (docs[1:] != docs[:-1])
+        codes, docs = codes[keep], docs[keep]
+        bounds = np.flatnonzero(np.diff(codes)) + 1
+        return dict(zip((vocabulary[c] for c in codes[np.r_[0, bounds]].tolist()), np.split(docs, bounds)))
+
+    def insert(self, rows, texts):
+        self._texts.extend(texts)
+        self.add(rows, texts)
+
+    def add(self, rows, texts):
+        with self._lock:
+            for word, docs in self._word_rows(rows, texts).items():
+                if word not in self._postings and word not in self._pending:
+                    self._vocabulary = None
+                self._pending.setdefault(word, []).append(docs)
+
+    def update(self, rows, texts):
+        order = np.argsort(rows)
+        rows, texts = rows[order], [texts[i] for i in order.tolist()]
+        old = [self._texts[row] for row in rows.tolist()]
+        removed = self._word_rows(rows, old)
+        with self._lock:
+            for word, docs in removed.items():
+                postings = self._merged(word)
+                self._postings[word] = np.delete(
+                    postings, np.searchsorted(postings, docs))
+        for row, text in zip(rows.tolist(), texts):
+            self._texts[row] = text
+        self.add(rows, texts)
+
+    def _merged(self, word):
+        pending = self._pending.pop(word, None)
+        postings = self._postings.get(word, _EMPTY)
+        if pending:
+            chunks = [postings] + pending
+            postings = np.concatenate(chunks)
+            # Inserts only ever append higher rows; updates need a sort
+            if any(len(a) and len(b) and b[0] <= a[-1] for a, b in zip(chunks, chunks[1:])):
+                postings = np.unique(postings)
+            self._postings[word] = postings
+        return postings
+
+    def rows(self, word):
+        """Sorted rows containing a word, or a word starting with it if it ends in *."""
+        with self._lock:
+            if not word.endswith('*'):
+                return self._merged(word)
+            if self._vocabulary is None:
+                self._vocabulary = sorted(
+                    self._postings.keys() | self._pending.keys())
+            prefix = word[:-1]
+            start = bisect.bisect_left(self._vocabulary, prefix)
+            stop = bisect.bisect_left(self._vocabulary, prefix + '\U0010ffff')
+            parts = [self._merged(w) for w in self._vocabulary[start:stop]]
+        if len(parts) < 2:
+            return parts[0] if parts else _EMPTY
+        # Union of many postings by marking rows, without sorting them
+        found = np.zeros(len(self._texts), dtype=bool)
+        for part in parts:
+            found[part] = True
+        return np.flatnonzero(found)
+
+    def search(self, phrases):
+        # Rarest word first: each step keeps the candidates found in the next postings
+        postings = sorted((self.rows(word)
+                          for words in phrases for word in words), key=len)
+        result = postings[0]
+        for rows in postings[1:]:
+            if not len(result):
+                break
+            found = np.minimum(np.searchsorted(rows, result), len(rows) - 1)
+            result = result[rows[found] == result] if len(rows) else _EMPTY
+        for words in phrases:
+            if len(words) > 1 and len(result):
+                # Postings hold no word positions: check word order in the candidate rows only
+                result = result[np.fromiter((_has_phrase(tokenize(self._texts[row]), words)
+                                             for row in result.tolist()), dtype=bool, count=len(result))]
+        return result
+
+
+class TextIndex:
+    """Inverted index over the register's free-text columns (INDEXED_COLUMNS).
+
+    Every word of a hazard, control or model description maps to the sorted
+    positions of the rows containing it, so a query is a few dictionary
+    lookups and sorted-array intersections rather than a substring scan of
+    every row. Queries match whole words case-insensitively: "drift" does
+    not match "drifting" unless written "drift*", and quoted phrases must
+    appear in order. The index follows inserts and edits of the indexed
+    columns through register events.
+    """
+
+    def __init__(self, register):
+        self.register = register
+        self._columns = {(table, column): _ColumnIndex() for table, columns in INDEXED_COLUMNS.items()
+                         for column in columns}
+        for table in INDEXED_COLUMNS:
+            self.rebuild(table)
+            register.table(table).subscribe(self._on_write)
+
+    def rebuild(self, table):
+        """Re-index every row of one table."""
+        store = self.register.table(table)
+        for column in INDEXED_COLUMNS[table]:
+            index = self._columns[(table, column)]
+            index.clear()
+            if len(store):
+                index.insert(np.arange(len(store)),
+                             store.column(column).tolist())
+
+    def _on_write(self, store, kind, positions, columns):
+        if kind == "clear":
+            self.rebuild(store.name)
+            return
+        for column in INDEXED_COLUMNS[store.name]:
+            if kind == "insert":
+                self._columns[(store.name, column)].insert(
+                    positions, store.column(column)[positions].tolist())
+            elif column in columns:
+                self._columns[(store.name, column)].update(
+                    positions, store.column(column)[positions].tolist())
+
+    def search(self, query, table='risks', column=None):
+        """Sorted positions of the rows of table whose text matches every phrase of the query.
+
+        Searches the table's indexed columns (or just column); see
+        parse_query for the query syntax. An empty query matches no rows.
+        """
+        if table not in INDEXED_COLUMNS:
+            raise ValueError(f"Table '{table}' has no indexed text columns.")
+        phrases = parse_query(query)
+        if not phrases:
+            return _EMPTY
+        columns = [column] if column else INDEXED_COLUMNS[table]
+        found = [self._columns[(table, c)].search(phrases) for c in columns]
+        return found[0] if len(found) == 1 else np.unique(np.concatenate(found))
@@ -0,0 +1,189 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+
+from full_register import FULL_REGISTER_COLUMNS
+
+
+SCORE_COLUMN = 'composite_risk_score'
+# Full register columns risks can be ranked by
+SCORE_COLUMNS = ['composite_risk_score', 'residual_risk_score']
+# Query dimensions and the full register column that defines each group
+GROUP_COLUMNS = {'model': 'model_pos',
+                 'owner': 'owner', 'category': 'risk_type'}
+
+
+class _TopK:
+    """The highest-scoring rows of one group, ordered by (-score, row)."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = []
+        self.members = {}
+        # Scored rows of the group exist that are not kept in entries
+        self.truncated = False
+        self.dirty = True
+
+    def offer(self, row, score):
+        if self.dirty:
+            return
+        if row in self.members:
+            self.entries.remove((-self.members.pop(row), row))
+            if self.truncated:
+                # A row below the cut-off may now belong in the top; rescan lazily
+                self.dirty = True
+                return
+        if np.isnan(score):
+            return
+        entry = (-score, row)
+        if len(self.entries) < self.capacity:
+            bisect.insort(self.entries, entry)
+            self.members[row] = score
+        elif entry < self.entries[-1]:
+            bisect.insort(self.entries, entry)
+            self.members[row] = score
+            _, dropped = self.entries.pop()
+            del self.members[dropped]
+            self.truncated = True
+        else:
+            self.truncated = True
+
+    def recompute(self, rows, scores):
+        scored = ~np.isnan(scores)
+        rows, scores = rows[scored], scores[scored]
+        if len(rows) > self.capacity:
+            # Partial selection: only the cut-off score needs an O(N) pass
+            kth = np.argpartition(-scores, self.capacity -
+                                  1)[self.capacity - 1]
+            threshold = scores[kth]
+            above = scores > threshold
+            tied = np.flatnonzero(scores == threshold)[
+                :self.capacity - int(above.sum())]
+            keep = np.concatenate([np.flatnonzero(above), tied])
+            rows, scores = rows[keep], scores[keep]
+            self.truncated = True
+        else:
+            self.truncated = False
+        order = np.lexsort((rows, -scores))
+        self.entries = [
+            (-s, r) for s, r in zip(scores[order].tolist(), rows[order].tolist())]
+        self.members = {r: -s for s, r in self.entries}
+        self.dirty = False
+
+
+class TopRisks:
+    """Top-K rows of the full register by composite (or residual) score, kept current as scores change.
+
+    Keeps the best `capacity` rows overall and, once queried, per model, owner
+    or broad risk category, for each score ranked by. Score changes are applied in O(log K); a full
+    partial-selection pass happens only when a kept row drops out of a
+    truncated top list or a larger K is asked for.
+    """
+
+    BULK_THRESHOLD = 1024
+
+    def __init__(self, full_register, taxonomy=None, capacity=16):
+        self.view = full_register
+        self.rows = full_register.rows
+        self.capacity = capacity
+        self._taxonomy = None
+        self._trackers = {}
+        if taxonomy is not None:
+            self.set_taxonomy(taxonomy)
+        self.rows.subscribe(self._on_rows)
+
+    def set_taxonomy(self, taxonomy):
+        """Group risks by broad category using a compiled TaxonomyIndex."""
+        if taxonomy is self._taxonomy:
+            return
+        self._taxonomy = taxonomy
+        for key, tracker in self._trackers.items():
+            if key[0] == 'category':
+                tracker.dirty = True
+
+    def _group_key(self, by, row):
+        value = self.rows.get(row, GROUP_COLUMNS[by])
+        if by == 'category':
+            return self._taxonomy.category_of(value) if self._taxonomy else None
+        if by == 'model':
+            return int(value)
+        return value
+
+    def _on_rows(self, store, kind, positions, columns):
+        if kind == "clear":
+            for tracker in self._trackers.values():
+                tracker.dirty = True
+            return
+        if kind == "update" and columns is not None:
+            regrouped = {by for by, column in GROUP_COLUMNS.items()
+                         if column in columns}
+            for key, tracker in self._trackers.items():
+                if key[0] in regrouped:
+                    tracker.dirty = True
+            rescored = [c for c in SCORE_COLUMNS if c in columns]
+            if not rescored and not regrouped:
+                return
+        else:
+            regrouped, rescored = set(), SCORE_COLUMNS
+        trackers = [(key, tracker) for key, tracker in self._trackers.items()
+                    if key[2] in rescored or key[0] in regrouped]
+        if len(positions) > self.BULK_THRESHOLD:
+            # One vectorized rescan beats offering a large batch row by row
+            for _, tracker in trackers:
+                tracker.dirty = True
+            return
+        scores = {c: self.rows.column(c) for c in SCORE_COLUMNS}
+        for row in positions.tolist():
+            for (by, value, score), tracker in trackers:
+                if by is None or self._group_key(by, row) == value:
+                    tracker.offer(row, scores[score][row])
+
+    def _group_rows(self, by, value):
+        if by is None:
+            return np.arange(len(self.rows))
+        column = self.rows.column(GROUP_COLUMNS[by])
+        if by == 'category':
+            if self._taxonomy is None or value not in self._taxonomy.categories:
+                return np.arange(0)
+            code = self._taxonomy.categories.index(value)
+            return np.flatnonzero(self._taxonomy.category_codes(column) == code)
+        return np.flatnonzero(column == value)
+
+    def top(self, k, by=None, value=None, score=SCORE_COLUMN):
+        """Row positions of the k highest scores, optionally within one group.
+
+        by is None (whole register), 'model' (value is the model's row
+        position), 'owner' or 'category' (broad risk category); score is
+        one of SCORE_COLUMNS.
+        """
+        if by is not None and by not in GROUP_COLUMNS:
+            raise ValueError(f"Unknown top-K dimension '{by}'.")
+        if score not in SCORE_COLUMNS:
+            raise ValueError(f"Cannot rank risks by '{score}'.")
+        key = (by, value, score)
+        tracker = self._trackers.get(key)
+        if tracker is None:
+            tracker = self._trackers[key] = _TopK(self.capacity)
+        if k > tracker.capacity:
+            tracker.capacity = max(k, 2 * tracker.capacity)
+            tracker.dirty = True
+        if tracker.dirty:
+            rows = self._group_rows(by, value)
+            tracker.recompute(rows, self.rows.column(score)[rows])
+        return np.array([row for _, row in tracker.entries[:k]], dtype=np.int64)
+
+    def top_frame(self, k, by=None, value=None, score=SCORE_COLUMN):
+        """The top rows as full register columns; unscored rows fill up a short list."""
+        rows = self.top(k, by, value, score)
+        if len(rows) < k:
+            # Same as sort_values(na_position='last').head(k)
+            group = self._group_rows(by, value)
+            unscored = group[np.isnan(self.rows.column(score)[group])]
+            # In register order, i.e. by model, risk and control
+            order = np.lexsort(tuple(self.rows.column(c)[unscored]
+                                     for c in ('control_pos', 'risk_pos', 'model_pos')))
+            rows = np.concatenate(
+                [rows, unscored[order][:k - len(rows)]])
+        return pd.DataFrame({c: self.view.frame_values(c, self.rows.column(c)[rows]) for c in FULL_REGISTER_COLUMNS},
+                            columns=FULL_REGISTER_COLUMNS)
@@ -1,287 +1,515 @@
+import io
+import os
+
+import numpy as np
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
+from chart_cache import FigureCache
+from register_backend import SQLiteBackend
+from register_import import DEFAULT_CHUNK_SIZE
+from register_view import DEFAULT_PAGE_SIZE, PAGE_SIZES, FrameSource, RegisterView
+from risk_cube import DIMENSIONS as CUBE_DIMENSIONS
+from risk_register import RiskRegister, build_register_store
+from risk_taxonomy import AI_RISK_TAXONOMY, compile_taxonomy
+
+
+# Rendered charts shared by all sessions; unchanged distributions are not re-plotted
+_chart_cache = FigureCache(maxsize=32)
+
+# Set QULAB_REGISTER_DB to a file path to keep the register in SQLite across
+# restarts; otherwise the register lives in memory only.
+REGISTER_DB_ENV = "QULAB_REGISTER_DB"
+# All sessions work on one shared register unless QULAB_SHARED_REGISTER=0, in
+# which case each session gets a register of its own.
+SHARED_REGISTER_ENV = "QULAB_SHARED_REGISTER"
+# Set QULAB_REGISTER_SNAPSHOT to a snapshot directory (see register_snapshot.py)
+# to open an otherwise empty register from it.
+REGISTER_SNAPSHOT_ENV = "QULAB_REGISTER_SNAPSHOT"
+# Set QULAB_ALLOW_CLEAR=1 to offer the confirmed "Clear Register" action on the
+# welcome page, which deletes the register for all sessions and in SQLite.
+ALLOW_CLEAR_ENV = "QULAB_ALLOW_CLEAR"
+
+
+@st.cache_resource
+def _get_register_backend(path):
+    return SQLiteBackend(path)
+
+
+def _build_risk_register(path):
+    return build_register_store(_get_register_backend(path) if path else None,
+                                os.environ.get(REGISTER_SNAPSHOT_ENV))
+
+
+@st.cache_resource
+def _get_shared_register(path):
+    # One register per process; sessions hold only a reference to it
+    return _build_risk_register(path)
+
+
+def _new_risk_register():
+    path = os.environ.get(REGISTER_DB_ENV)
+    if os.environ.get(SHARED_REGISTER_ENV, "1") != "0":
+        return _get_shared_register(path)
+    return _build_risk_register(path)
 
 
 def initialize_session_state():
-    if 'ai_models_df' not in st.session_state:
-        st.session_state.ai_models_df = pd.DataFrame(
-            columns=["model_id", "model_name", "use_case", "description", "owner", "status"])
-        st.session_state.ai_risks_df = pd.DataFrame(
-            columns=["risk_id", "model_id", "risk_type", "hazard_description", "likelihood_score", "magnitude_score", "composite_risk_score"])
-        st.session_state.ai_controls_df = pd.DataFrame(
-            columns=["control_id", "risk_id", "control_description", "effectiveness_score", "risk_response"])
-        st.session_state.model_id_counter = 0
-        st.session_state.risk_id_counter = 0
-        st.session_state.control_id_counter = 0
+    if 'risk_register' not in st.session_state:
+        st.session_state.risk_register = _new_risk_register()
         st.session_state.current_step = 1  # Start at step 1
 
     if 'AI_RISK_TAXONOMY' not in st.session_state:
+        taxonomy = st.session_state.risk_register.snapshot_taxonomy or AI_RISK_TAXONOMY
         st.session_state.AI_RISK_TAXONOMY = {
-            "Data Risk": ["Data Quality", "Data Privacy", "Data Drift", "Data Poisoning", "Data Bias", "Data Provenance"],
-            "Model Risk": ["Algorithmic Bias", "Fairness", "Explainability", "Robustness", "Performance Degradation", "Adversarial Attacks", "Concept Drift", "Model Interpretability"],
-            "System Risk": ["Security Vulnerability", "Integration Issues", "Infrastructure Failure", "Access Control"],
-            "Human Risk": ["Operator Error", "Misuse", "Lack of Oversight", "Ethical Misalignment"],
-            "Organizational Risk": ["Regulatory Non-Compliance", "Reputational Damage", "Lack of Governance", "Third-Party Dependency"]
-        }
+            category: list(types) for category, types in taxonomy.items()}
 
     # Set display options (optional, as st.dataframe handles much of this)
     pd.set_option('display.max_columns', None)
     pd.set_option('display.width', 1000)
 
 
+def _show_event(level, event, message, details):
+    # Each engine event becomes the matching Streamlit message (st.info, st.warning, ...)
+    getattr(st, level)(message)
+
+
+def _engine():
+    """The session's register as a RiskRegister reporting through Streamlit messages."""
+    engine = RiskRegister(st.session_state.risk_register,
+                          st.session_state.AI_RISK_TAXONOMY)
+    engine.subscribe(_show_event)
+    return engine
+
+
+def _read_table(name):
+    return _engine().table_frame(name)
+
+
+def get_ai_models_df():
+    return _read_table("models")
+
+
+def get_ai_risks_df():
+    return _read_table("risks")
+
+
+def get_ai_controls_df():
+    return _read_table("controls")
+
+
+def get_row_count(table_name):
+    """Rows of 'models', 'risks', 'controls' or 'full_register'; cheaper than len() of its frame."""
+    return _engine().row_count(table_name)
+
+
+def get_versioned_df(table_name):
+    """A register table plus the row_version of each row, read atomically.
+
+    Forms keep the versions they were rendered with and pass them back as
+    expected_versions, so edits made meanwhile by another session are not
+    overwritten.
+    """
+    return _engine().versioned_frame(table_name)
+
+
+def get_model_risks_df(model_id, risk_type):
+    return _engine().model_risks_frame(model_id, risk_type)
+
+
 def initialize_risk_management_system_st():
-    st.session_state.ai_models_df = pd.DataFrame(
-        columns=["model_id", "model_name", "use_case", "description", "owner", "status"])
-    st.session_state.ai_risks_df = pd.DataFrame(
-        columns=["risk_id", "model_id", "risk_type", "hazard_description", "likelihood_score", "magnitude_score", "composite_risk_score"])
-    st.session_state.ai_controls_df = pd.DataFrame(
-        columns=["control_id", "risk_id", "control_description", "effectiveness_score", "risk_response"])
-    st.session_state.model_id_counter = 0
-    st.session_state.risk_id_counter = 0
-    st.session_state.control_id_counter = 0
+    # Reattaches to the shared (or stored) register rather than wiping it; a
+    # private in-memory register starts empty
+    st.session_state.risk_register = _new_risk_register()
+
+
+def clear_register_allowed():
+    return os.environ.get(ALLOW_CLEAR_ENV) == "1"
+
+
+def clear_register_st():
+    """Delete every model, risk and control, for all sessions and in the database."""
+    st.session_state.risk_register.clear()
 
 
 def add_ai_model_st(model_name, use_case, description, owner, status="In Development"):
-    st.session_state.model_id_counter += 1
-    new_model = {
-        "model_id": st.session_state.model_id_counter,
-        "model_name": model_name,
-        "use_case": use_case,
-        "description": description,
-        "owner": owner,
-        "status": status
-    }
-    st.session_state.ai_models_df = pd.concat(
-        [st.session_state.ai_models_df, pd.DataFrame([new_model])], ignore_index=True)
-    st.success(
-        f"Model '{model_name}' (ID: {st.session_state.model_id_counter}) added successfully.")
     # Return new model ID for linking risks
-    return st.session_state.model_id_counter
+    return _engine().add_model(model_name, use_case, description, owner, status)
 
 
 def add_ai_risk_st(model_id, risk_type, hazard_description, likelihood_score=None, magnitude_score=None):
-    st.session_state.risk_id_counter += 1
-    new_risk = {
-        "risk_id": st.session_state.risk_id_counter,
-        "model_id": model_id,
-        "risk_type": risk_type,
-        "hazard_description": hazard_description,
-        "likelihood_score": likelihood_score,
-        "magnitude_score": magnitude_score,
-        "composite_risk_score": None
-    }
-    st.session_state.ai_risks_df = pd.concat(
-        [st.session_state.ai_risks_df, pd.DataFrame([new_risk])], ignore_index=True)
-    st.info(
-        f"Risk '{hazard_description}' (ID: {st.session_state.risk_id_counter}) added for model {model_id}.")
-    return st.session_state.risk_id_counter
+    return _engine().add_risk(model_id, risk_type, hazard_description, likelihood_score, magnitude_score)
 
 
 def assign_risk_scores_st(risk_id, likelihood, magnitude):
-    if risk_id in st.session_state.ai_risks_df['risk_id'].values:
-        st.session_state.ai_risks_df.loc[st.session_state.ai_risks_df['risk_id']
-                                         == risk_id, 'likelihood_score'] = likelihood
-        st.session_state.ai_risks_df.loc[st.session_state.ai_risks_df['risk_id']
-                                         == risk_id, 'magnitude_score'] = magnitude
-        st.info(
-            f"Assigned likelihood ({likelihood}) and magnitude ({magnitude}) scores for risk ID {risk_id}.")
-    else:
-        st.warning(f"Risk ID {risk_id} not found.")
+    _engine().assign_risk_scores(risk_id, likelihood, magnitude)
 
 
 def calculate_composite_risk_score_st(risk_id):
-    if risk_id in st.session_state.ai_risks_df['risk_id'].values:
-        likelihood = st.session_state.ai_risks_df.loc[st.session_state.ai_risks_df['risk_id']
-                                                      == risk_id, 'likelihood_score'].iloc[0]
-        magnitude = st.session_state.ai_risks_df.loc[st.session_state.ai_risks_df['risk_id']
-                                                     == risk_id, 'magnitude_score'].iloc[0]
-        if pd.notna(likelihood) and pd.notna(magnitude):
-            composite_score = likelihood * magnitude
-            st.session_state.ai_risks_df.loc[st.session_state.ai_risks_df['risk_id']
-                                             == risk_id, 'composite_risk_score'] = composite_score
-            st.success(
-                f"Calculated composite risk score ({composite_score}) for risk ID {risk_id}.")
-        else:
-            st.warning(
-                f"Likelihood or magnitude scores missing for risk ID {risk_id}. Cannot calculate composite score.")
-    else:
-        st.warning(f"Risk ID {risk_id} not found.")
+    _engine().calculate_composite_score(risk_id)
+
+
+def assign_risk_scores_many(risk_ids, likelihoods, magnitudes, expected_versions=None):
+    return _engine().assign_risk_scores_many(risk_ids, likelihoods, magnitudes, expected_versions)
+
+
+def calculate_composite_scores_all():
+    return _engine().calculate_composite_scores_all()
 
 
 def add_adversarial_risk_st(model_id, attack_type, description, likelihood, magnitude):
-    risk_type = "Model Risk"
-    new_risk_id = add_ai_risk_st(
-        model_id, risk_type, f"{attack_type}: {description}")
-    assign_risk_scores_st(new_risk_id, likelihood, magnitude)
-    calculate_composite_risk_score_st(new_risk_id)
-    st.success(
-        f"Adversarial risk '{attack_type}' (ID: {new_risk_id}) added and scored for model {model_id}.")
-    return new_risk_id
+    return _engine().add_adversarial_risk(model_id, attack_type, description, likelihood, magnitude)
 
 
 def add_supply_chain_risk_st(model_name, model_use_case, model_description, model_owner, model_status, risk_type, hazard_description, likelihood, magnitude):
-    existing_model = st.session_state.ai_models_df[st.session_state.ai_models_df['model_name'] == model_name]
-    if not existing_model.empty:
-        model_id = existing_model['model_id'].iloc[0]
-        st.info(
-            f"Model '{model_name}' (ID: {int(model_id)}) already exists. Using existing model_id.")
-    else:
-        model_id = add_ai_model_st(
-            model_name, model_use_case, model_description, model_owner, model_status)
-
-    new_risk_id = add_ai_risk_st(model_id, risk_type, hazard_description)
-    assign_risk_scores_st(new_risk_id, likelihood, magnitude)
-    calculate_composite_risk_score_st(new_risk_id)
-    st.success(
-        f"Supply chain/data provenance risk '{hazard_description}' (ID: {new_risk_id}) added and scored for model {model_id}.")
-    return model_id, new_risk_id
+    return _engine().add_supply_chain_risk(model_name, model_use_case, model_description, model_owner, model_status,
+                                           risk_type, hazard_description, likelihood, magnitude)
 
 
 def add_ai_control_st(risk_id, control_description):
-    st.session_state.control_id_counter += 1
-    new_control = {
-        "control_id": st.session_state.control_id_counter,
-        "risk_id": risk_id,
-        "control_description": control_description,
-        "effectiveness_score": None,
-        "risk_response": None
-    }
-    st.session_state.ai_controls_df = pd.concat(
-        [st.session_state.ai_controls_df, pd.DataFrame([new_control])], ignore_index=True)
-    st.success(
-        f"Control '{control_description}' (ID: {st.session_state.control_id_counter}) added for risk ID {risk_id}.")
-    return st.session_state.control_id_counter
+    return _engine().add_control(risk_id, control_description)
 
 
 def assign_risk_response_st(control_id, effectiveness_score, risk_response):
-    if control_id in st.session_state.ai_controls_df['control_id'].values:
-        st.session_state.ai_controls_df.loc[st.session_state.ai_controls_df['control_id']
-                                            == control_id, 'effectiveness_score'] = effectiveness_score
-        st.session_state.ai_controls_df.loc[st.session_state.ai_controls_df['control_id']
-                                            == control_id, 'risk_response'] = risk_response
-        st.info(
-            f"Assigned effectiveness score ({effectiveness_score}) and risk response ('{risk_response}') for control ID {control_id}.")
+    _engine().assign_risk_response(control_id, effectiveness_score, risk_response)
+
+
+def assign_risk_responses_many(control_ids, effectiveness_scores, risk_responses, expected_versions=None):
+    return _engine().assign_risk_responses_many(control_ids, effectiveness_scores, risk_responses,
+                                                expected_versions)
+
+
+def import_register_files_st(models_file=None, risks_file=None, controls_file=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    return _engine().import_files(models_file, risks_file, controls_file, chunk_size)
+
+
+def save_register_snapshot_st(path, format="arrow"):
+    return _engine().save_snapshot(path, format)
+
+
+def restore_register_snapshot_st(path):
+    engine = _engine()
+    snapshot = engine.restore_snapshot(path)
+    # A restored snapshot brings its taxonomy with it
+    st.session_state.AI_RISK_TAXONOMY = engine.taxonomy
+    return snapshot
+
+
+def get_full_risk_register_df():
+    return _engine().full_register_frame()
+
+
+def _register_view(key, source):
+    # Views are per session; their cached query results follow the shared table's version
+    views = st.session_state.setdefault('register_views', {})
+    view = views.get(key)
+    if view is None or view.source is not source:
+        view = views[key] = RegisterView(source)
+    return view
+
+
+def show_register_st(table, key, columns=None, equals=None, page_size=DEFAULT_PAGE_SIZE):
+    """Paginated view of a register table with filtering, sorting and column choice.
+
+    table is 'models', 'risks', 'controls', 'full_register' or a DataFrame.
+    equals fixes filters the user cannot remove ({column: allowed values}).
+    Filtering and sorting run on the register's columns and only the rows of
+    the current page are sent to the browser.
+    """
+    register = st.session_state.risk_register
+    if isinstance(table, pd.DataFrame):
+        source = FrameSource(table)
+    elif table == 'full_register':
+        source = register.full_register
     else:
-        st.warning(f"Control ID {control_id} not found.")
+        source = register.table(table)
+    view = _register_view(key, source)
+    all_columns = view.columns
+
+    equals = dict(equals or {})
+    contains, ranges = {}, {}
+    with st.expander("Filter, sort and choose columns"):
+        shown = st.multiselect("Columns", all_columns, default=columns or all_columns,
+                               key=f"{key}_columns") or all_columns
+        search = st.text_input(
+            "Search text columns", key=f"{key}_search").strip()
+        col1, col2 = st.columns(2)
+        filter_column = col1.selectbox("Filter by", [None] + all_columns, key=f"{key}_filter_column",
+                                       format_func=lambda c: "(no filter)" if c is None else c)
+        sort_by = col2.selectbox("Sort by", [None] + all_columns, key=f"{key}_sort_by",
+                                 format_func=lambda c: "(register order)" if c is None else c)
+        if filter_column is not None:
+            with register.read():
+                numeric = view.is_numeric(filter_column)
+                options = None if numeric else view.distinct(filter_column)
+            if numeric:
+                low = col1.number_input(
+                    "Minimum", value=None, key=f"{key}_filter_min")
+                high = col1.number_input(
+                    "Maximum", value=None, key=f"{key}_filter_max")
+                if low is not None or high is not None:
+                    ranges[filter_column] = (low, high)
+            elif options is not None:
+                selected = col1.multiselect(
+                    "Values", options, key=f"{key}_filter_values")
+                if selected:
+                    # Narrows, but never widens, a filter fixed by the page
+                    fixed = equals.get(filter_column)
+                    equals[filter_column] = [
+                        v for v in selected if fixed is None or v in fixed]
+            else:
+                contains[filter_column] = col1.text_input(
+                    "Contains", key=f"{key}_filter_text").strip()
+        descending = col2.checkbox("Descending", key=f"{key}_descending")
+
+    with register.read():
+        positions = view.query(search, equals, contains, ranges, sort_by, not descending,
+                               search_columns=shown)
+        total = len(positions)
+        size = st.session_state.get(f"{key}_page_size", page_size)
+        pages = max(1, -(-total // size))
+        # A narrower filter can leave the remembered page past the end
+        if st.session_state.get(f"{key}_page", 1) > pages:
+            st.session_state[f"{key}_page"] = pages
+        number = st.session_state.get(f"{key}_page", 1)
+        frame = view.page(positions, number - 1, size, shown)
+        unfiltered = len(source)
+    st.dataframe(frame, width='stretch')
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    start = (number - 1) * size
+    caption = f"Rows {start + 1 if total else 0:,}-{start + len(frame):,} of {total:,}"
+    if total != unfiltered:
+        caption += f" (filtered from {unfiltered:,})"
+    col1.caption(caption)
+    col2.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 0,
+                   key=f"{key}_page_size")
+    col3.number_input(f"Page (of {pages:,})", min_value=1,
+                      max_value=pages, step=1, key=f"{key}_page")
+    return total
 
 
 def get_full_risk_register_st():
-    merged_df = pd.merge(st.session_state.ai_models_df,
-                         st.session_state.ai_risks_df, on='model_id', how='left')
-    full_register_df = pd.merge(
-        merged_df, st.session_state.ai_controls_df, on='risk_id', how='left')
-    selected_columns = [
-        'model_name', 'use_case', 'description', 'owner', 'status',
-        'risk_type', 'hazard_description', 'likelihood_score', 'magnitude_score', 'composite_risk_score',
-        'control_description', 'effectiveness_score', 'risk_response'
-    ]
-    full_register_df = full_register_df[selected_columns]
-    full_register_df = full_register_df.rename(
-        columns={'description': 'model_description'})
-    st.session_state.full_risk_register_df = full_register_df
+    st.session_state.full_risk_register_generated = True
     st.success("Comprehensive AI Model Risk Register generated.")
 
 
-def identify_top_risks_st(num_top_risks=5):
-    if 'full_risk_register_df' not in st.session_state or st.session_state.full_risk_register_df.empty:
+def identify_top_risks_st(num_top_risks=5, by=None, value=None, score='composite_risk_score'):
+    # by: None for the whole register, or 'model' (value is a model_id), 'owner' or 'category'
+    # score: 'composite_risk_score', or 'residual_risk_score' to rank risks after their controls
+    if not st.session_state.get('full_risk_register_generated', False):
         get_full_risk_register_st()  # Ensure full register is generated if not present
-    if not st.session_state.full_risk_register_df.empty:
-        df_sorted = st.session_state.full_risk_register_df.sort_values(
-            by='composite_risk_score', ascending=False, na_position='last')
-        top_risks = df_sorted.head(num_top_risks)
+    top_risks = _engine().top_risks_frame(num_top_risks, by, value, score)
+    if top_risks is not None:
         st.session_state.top_risks_df = top_risks
-        st.success(f"Top {num_top_risks} risks identified.")
+        # Pages show the query's current result, not this frame, so later edits show up
+        st.session_state.top_risks_query = (num_top_risks, by, value, score)
+
+
+def get_top_risks_df(num_top_risks=None):
+    """Current top risks for the last query of identify_top_risks_st, or None if there was none.
+
+    With num_top_risks, the top risks of the whole register by composite
+    score are shown when no query was made yet.
+    """
+    query = st.session_state.get('top_risks_query')
+    if query is None:
+        if num_top_risks is None:
+            return None
+        query = (num_top_risks, None, None, 'composite_risk_score')
+    # Read from the live top-risk view without repeating identify_top_risks_st's messages
+    return RiskRegister(st.session_state.risk_register,
+                        st.session_state.AI_RISK_TAXONOMY).top_risks_frame(*query)
+
+
+def get_residual_risk_summary_df():
+    """Total composite and residual score per broad risk category."""
+    return _engine().residual_summary()
+
+
+def simulate_portfolio_losses_st(by='category', max_trials=100000, confidence=0.99, tolerance=0.02,
+                                 seed=None, use_controls=True, workers=None):
+    result = _engine().simulate_losses(by, max_trials, confidence,
+                                       tolerance, seed, use_controls, workers)
+    if result is not None:
+        st.session_state.loss_simulation = result
+    return result
+
+
+def suggest_risk_merges_st(threshold=0.6, same_model=False):
+    suggestions = _engine().suggest_merges(threshold, same_model)
+    st.session_state.merge_suggestions = suggestions
+    return suggestions
+
+
+def _render_risk_distribution_png(risk_counts):
+    # Plotting libraries are the slowest imports in the app; load them only when a chart is drawn
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.barplot(x='Broad Risk Category', y='Number of Risks',
+                data=risk_counts, palette='viridis', ax=ax)
+    ax.set_title('Distribution of AI Risks by Broad Category')
+    ax.set_xlabel('Broad Risk Category')
+    ax.set_ylabel('Number of Risks')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def search_register_ids(query, table='risks', **equals):
+    """IDs of the rows of a register table whose description matches a full-text query.
+
+    Every word of the query must appear (case-insensitively, as a whole word),
+    "quoted phrases" in order, and a trailing * matches any word with that
+    prefix. equals keeps only rows whose columns have the given values, e.g.
+    search_register_ids('"data provenance"', model_id=2).
+    """
+    return _engine().search_ids(query, table, **equals)
+
+
+def show_text_search_st(key, tables=('risks', 'controls', 'models')):
+    """Search box over hazard, control and model descriptions, with the matches in a register table."""
+    labels = {'risks': "Risks (hazard descriptions)", 'controls': "Controls (control descriptions)",
+              'models': "Models (model descriptions)"}
+    col1, col2 = st.columns([2, 1])
+    query = col1.text_input("Search descriptions", key=f"{key}_query",
+                            help='Matches whole words in any case. Use "quotes" for a phrase and * for a prefix, '
+                                 'e.g. "data provenance" or adversar*.').strip()
+    table = col2.selectbox("In", list(tables), format_func=labels.get,
+                           key=f"{key}_table")
+    if not query:
+        return None
+    matches = _engine().search_frame(query, table)
+    if matches.empty:
+        st.info(f"No {table} match '{query}'.")
     else:
-        st.warning("Full risk register is empty. Cannot identify top risks.")
+        show_register_st(matches, key=f"{key}_results")
+    return len(matches)
+
+
+def _risk_cube():
+    return _engine().risk_cube()
+
+
+def get_risk_cube_df(by, filters=None):
+    """Risk counts and composite score total, mean and maximum of a slice, broken down by `by`.
+
+    by is one of 'status', 'owner', 'use_case' and 'category' (broad risk
+    category) or a list of them; filters maps dimensions to the values kept.
+    """
+    return _engine().cube_frame(by, filters)
+
+
+def get_risk_cube_summary(filters=None):
+    return _engine().cube_summary(filters)
+
+
+def show_risk_cube_st(key):
+    """Slice-and-drill-down table over model status, owner, use case and broad category."""
+    register = st.session_state.risk_register
+    cube = _risk_cube()
+    names = {'status': "Model Status", 'owner': "Owner",
+             'use_case': "Use Case", 'category': "Broad Risk Category"}
+    with register.read():
+        options = {d: cube.labels(d) for d in CUBE_DIMENSIONS}
+    if not options['category']:
+        st.info("No risks identified yet to break down.")
+        return None
+    by = st.multiselect("Break Down By", CUBE_DIMENSIONS, default=['category'], format_func=names.get,
+                        key=f"{key}_by")
+    columns = st.columns(len(CUBE_DIMENSIONS))
+    filters = {}
+    for column, dimension in zip(columns, CUBE_DIMENSIONS):
+        selected = column.multiselect(
+            names[dimension], options[dimension], key=f"{key}_{dimension}")
+        if selected:
+            filters[dimension] = selected
+    with register.read():
+        summary = cube.summary(filters)
+        frame = cube.drill_down(by, filters) if by else None
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Risks in Slice", f"{summary['risks']:,}")
+    col2.metric("Total Composite Score", f"{summary['total_score']:,.0f}")
+    col3.metric("Highest Composite Score",
+                "-" if np.isnan(summary['max_score']) else f"{summary['max_score']:g}")
+    if frame is not None:
+        st.dataframe(frame.rename(columns={
+            **names, 'risks': "Risks", 'scored_risks': "Scored Risks", 'total_score': "Total Score",
+            'mean_score': "Mean Score", 'max_score': "Max Score"}), hide_index=True, width='stretch')
+    return summary
 
 
 def plot_risk_distribution_by_type_st():
-    if not st.session_state.ai_risks_df.empty:
-        category_map = {}
-        for category, types in st.session_state.AI_RISK_TAXONOMY.items():
-            for t in types:
-                category_map[t] = category
-
-        # Also map broad categories to themselves
-        for category in st.session_state.AI_RISK_TAXONOMY.keys():
-            category_map[category] = category
-
-        # Ensure 'risk_type' column exists and map to broad categories
-        if 'risk_type' in st.session_state.ai_risks_df.columns:
-            # Create a temporary copy to add 'broad_risk_category' for plotting without modifying the original df directly
-            temp_risks_df = st.session_state.ai_risks_df.copy()
-            temp_risks_df['broad_risk_category'] = temp_risks_df['risk_type'].map(
-                category_map)
-
-            # Filter out rows where broad_risk_category could not be mapped (NaN)
-            temp_risks_df = temp_risks_df.dropna(
-                subset=['broad_risk_category'])
-
-            if not temp_risks_df.empty:
-                risk_counts = temp_risks_df['broad_risk_category'].value_counts(
-                ).reset_index()
-                risk_counts.columns = [
-                    'Broad Risk Category', 'Number of Risks']
-
-                fig, ax = plt.subplots(figsize=(10, 6))
-                sns.barplot(x='Broad Risk Category', y='Number of Risks',
-                            data=risk_counts, palette='viridis', ax=ax)
-                ax.set_title('Distribution of AI Risks by Broad Category')
-                ax.set_xlabel('Broad Risk Category')
-                ax.set_ylabel('Number of Risks')
-                plt.xticks(rotation=45, ha='right')
-                plt.tight_layout()
-                st.pyplot(fig)
-                plt.close(fig)
-                st.caption(
-                    "This visualization provides Sarah with a high-level understanding of where QuantFinance Bank's AI risks are concentrated.")
-            else:
-                st.warning(
-                    "No risks found with identifiable broad categories to plot distribution.")
+    register = st.session_state.risk_register
+    if len(register.risks):
+        # Read from the pre-aggregated cube: no scan of the risks table
+        taxonomy = compile_taxonomy(st.session_state.AI_RISK_TAXONOMY)
+        by_category = get_risk_cube_df(
+            'category').set_index('category')['risks']
+        counts = by_category.reindex(
+            taxonomy.categories, fill_value=0).to_numpy()
+
+        if counts.any():
+            order = [i for i in np.argsort(-counts, kind='stable')
+                     if counts[i] > 0]
+            risk_counts = pd.DataFrame({
+                'Broad Risk Category': [taxonomy.categories[i] for i in order],
+                'Number of Risks': counts[order]})
+
+            theme = st.get_option("theme.base") or "light"
+            key = FigureCache.key("risk_distribution", risk_counts['Broad Risk Category'].tolist(),
+                                  risk_counts['Number of Risks'].tolist(), theme, "viridis")
+            png = _chart_cache.get_or_render(
+                key, lambda: _render_risk_distribution_png(risk_counts))
+            st.image(png)
+            st.caption(
+                "This visualization provides Sarah with a high-level understanding of where QuantFinance Bank's AI risks are concentrated.")
         else:
             st.warning(
-                "No 'risk_type' column found in AI risks data to plot distribution.")
+                "No risks found with identifiable broad categories to plot distribution.")
     else:
         st.warning("No risks identified yet to plot distribution.")
 
 
 def simulate_data_drift_alert_st(model_id, risk_type_to_update, hazard_description_if_new, new_likelihood, new_magnitude):
-    existing_risk_row = st.session_state.ai_risks_df[(st.session_state.ai_risks_df['model_id'] == model_id) & (
-        st.session_state.ai_risks_df['risk_type'] == risk_type_to_update)]
-
-    if not existing_risk_row.empty:
-        risk_id = existing_risk_row['risk_id'].iloc[0]
-        st.info(
-            f"Updating existing risk ID {int(risk_id)} for '{risk_type_to_update}' (model ID: {int(model_id)}).")
-        assign_risk_scores_st(risk_id, new_likelihood, new_magnitude)
-        calculate_composite_risk_score_st(risk_id)
-    else:
-        st.info(
-            f"Adding new risk '{risk_type_to_update}' for model ID: {int(model_id)}.")
-        risk_id = add_ai_risk_st(model_id, risk_type_to_update,
-                                 hazard_description_if_new, new_likelihood, new_magnitude)
-        calculate_composite_risk_score_st(risk_id)
-    st.warning(
-        "Data drift alert processed and risk assessment updated to reflect the new operational reality.")
-    return risk_id
+    return _engine().record_drift_alert(model_id, risk_type_to_update, hazard_description_if_new,
+                                        new_likelihood, new_magnitude)
 
 
 def update_risk_assessment_from_monitoring_st(model_id, target_risk_type, updated_likelihood, updated_magnitude):
-    target_risk_row = st.session_state.ai_risks_df[(st.session_state.ai_risks_df['model_id'] == model_id) & (
-        st.session_state.ai_risks_df['risk_type'] == target_risk_type)]
-
-    if not target_risk_row.empty:
-        risk_id = target_risk_row['risk_id'].iloc[0]
-        st.info(
-            f"Updating risk assessment for risk ID {int(risk_id)} ('{target_risk_type}') for model ID {int(model_id)}.")
-        assign_risk_scores_st(risk_id, updated_likelihood, updated_magnitude)
-        calculate_composite_risk_score_st(risk_id)
-    else:
-        st.warning(
-            f"Risk type '{target_risk_type}' not found for model ID {int(model_id)}. No update performed.")
-    st.success("Risk assessment formally updated based on monitoring feedback.")
+    _engine().update_from_monitoring(model_id, target_risk_type,
+                                     updated_likelihood, updated_magnitude)
+
+
+def update_risk_assessments_from_monitoring_many(model_ids, target_risk_types, updated_likelihoods, updated_magnitudes=None):
+    # Bulk form of update_risk_assessment_from_monitoring_st; magnitudes None keeps the assessed magnitudes
+    return _engine().update_from_monitoring_many(model_ids, target_risk_types, updated_likelihoods,
+                                                 updated_magnitudes)
+
+
+def detect_feature_drift_st(reference_file, current_file, features=None, bins=10):
+    return _engine().detect_feature_drift(reference_file, current_file, features, bins)
+
+
+def ingest_drift_alerts_st(lines, window_seconds=60.0):
+    return _engine().ingest_drift_alerts(lines, window_seconds)
+
+
+def get_risk_score_trajectory_df(risk_id):
+    return _engine().score_trajectory(risk_id)
+
+
+def get_score_changes_df():
+    return _engine().score_changes()
+
+
+def get_register_as_of(timestamp):
+    """Models, risks and controls frames as they were at a time."""
+    return _engine().as_of(timestamp)
 
 
 def restart_workflow():